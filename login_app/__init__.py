@@ -31,6 +31,10 @@ def create_app():
     # Certifique-se de que login_app/config.py tem a classe Config
     app.config.from_object("login_app.config.Config")
 
+    # JSON das respostas: orjson (se instalado) e datas em ISO-8601
+    from .serialization import init_app as init_json
+    init_json(app)
+
     # HTTPS correto atrás de proxy (Render)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     app.config["PREFERRED_URL_SCHEME"] = "https"
@@ -109,6 +113,9 @@ def create_app():
         # não interfere nas imagens nem em arquivos estáticos
         if request.path.startswith("/uploads/") or request.path.startswith("/static/"):
             return resp
+        # rotas com política própria (ex.: /api/posts com ETag) mantêm a delas
+        if "Cache-Control" in resp.headers:
+            return resp
         resp.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
         resp.headers["Pragma"] = "no-cache"
         resp.headers["Expires"] = "0"
@@ -144,6 +151,7 @@ def create_app():
         # ⚠️ IMPORT RELATIVO (dentro do pacote)
         from .models import user  # noqa: F401
         from .models import post  # noqa: F401
+        from .models import article  # noqa: F401
 
     # ==============================
     # Blueprints (imports RELATIVOS + registro seguro)
@@ -176,6 +184,58 @@ def create_app():
     except Exception as e:
         app.logger.info(f"[chat_api] não registrado (opcional): {e}")
 
+    # ==============================
+    # Esquema dos bancos (idempotente)
+    # ==============================
+    # Esquema do banco de artigos (chave por posição, colunas de agrupamento)
+    try:
+        from .article_store import ensure_schema
+        ensure_schema(app)
+    except Exception as e:
+        app.logger.warning(f"[articles] schema não verificado: {e}")
+
+    # Índice FTS5 da busca de posts (cria/reindexa na primeira vez; idempotente)
+    try:
+        from . import post_search
+        post_search.ensure_schema(app)
+        app.cli.add_command(post_search.reindex_command)
+    except Exception as e:
+        app.logger.warning(f"[posts] índice de busca não verificado: {e}")
+
+    # author_id dos posts (coluna/índice em bancos antigos + preenchimento por `autor`)
+    try:
+        from .post_authors import ensure_schema as ensure_post_authors
+        ensure_post_authors(app)
+    except Exception as e:
+        app.logger.warning(f"[posts] author_id não verificado: {e}")
+
+    # Versão da coleção de posts (ETag/304 do /api/posts), mantida por triggers
+    try:
+        from .post_version import ensure_schema as ensure_post_version
+        ensure_post_version(app)
+    except Exception as e:
+        app.logger.warning(f"[posts] versão da coleção não verificada: {e}")
+
+    # ==============================
+    # Registro de feeds (feeds.yaml)
+    # ==============================
+    # Compila já na partida: arquivo inválido derruba o boot em vez de
+    # aparecer só no primeiro request.
+    from .feed_registry import current as _feed_registry
+    _feed_registry()
+
+    # ==============================
+    # Ingestão RSS em background (um líder eleito entre os workers)
+    # ==============================
+    # Inicia no primeiro request para não rodar em comandos do Flask CLI.
+    @app.before_request
+    def _start_rss_ingest():
+        try:
+            from .rss_ingest import start_in_worker
+            start_in_worker(app)
+        except Exception as e:
+            app.logger.warning(f"[rss_ingest] não iniciado: {e}")
+
     # ==============================
     # uploads + (opcional) blueprint de mídia
     # ==============================
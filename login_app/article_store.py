@@ -0,0 +1,316 @@
+# login_app/article_store.py
+"""
+Persistência das notícias coletadas (RSS / NewsAPI) no bind "articles".
+
+- `upsert_articles`: grava itens normalizados, deduplicando pela URL canônica
+  dentro de cada posição (category, sub, region) — a mesma URL em outro
+  feed/preset ganha uma linha lá também — e agrupa quase-duplicatas (mesma
+  história em fontes diferentes, ver story_clusters).
+- `list_timeline`: timeline por categoria/sub com paginação por cursor (keyset),
+  sem OFFSET: cada página é uma busca direta no índice (category, sub, published_at, id).
+  Por padrão mostra um representante por história, com `alsoCoveredBy`.
+"""
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import logging
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, or_, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm import aliased
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from . import db, story_clusters
+from .models.article import Article
+from .utils.urls import url_key
+
+log = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 50
+# com filtro (ex.: ?q=), lê no máximo isto de linhas por página antes de devolver
+MAX_FILTER_SCAN = 2000
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def _parse_dt(value) -> Optional[dt.datetime]:
+    """ISO-8601 (RSS/NewsAPI) → datetime UTC ingênuo (como gravado no SQLite)."""
+    if not value:
+        return None
+    try:
+        d = dt.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if d.tzinfo is not None:
+        d = d.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return d
+
+
+# ==============================================================
+# 🔑 Cursor opaco (published_at, id)
+# ==============================================================
+
+def encode_cursor(published_at: dt.datetime, article_id: int) -> str:
+    raw = f"{published_at.isoformat()}|{article_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[dt.datetime, int]]:
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + pad).decode("utf-8")
+        ts, _, aid = raw.partition("|")
+        return dt.datetime.fromisoformat(ts), int(aid)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# ==============================================================
+# 🧱 Esquema (bancos antigos)
+# ==============================================================
+
+def _url_key_unique(conn) -> Optional[Tuple[str, str]]:
+    """(nome, origem) do índice único só sobre url_key, se o banco ainda tiver."""
+    for row in conn.execute(text("PRAGMA index_list(articles)")):
+        name, unique, origin = row[1], row[2], row[3]
+        if not unique:
+            continue
+        cols = [c[2] for c in conn.execute(text(f'PRAGMA index_info("{name}")'))]
+        if cols == ["url_key"]:
+            return name, origin
+    return None
+
+
+def _drop_url_key_unique(engine) -> None:
+    """
+    Bancos antigos têm url_key UNIQUE na tabela inteira. Índice criado à parte
+    sai com DROP INDEX; restrição da própria tabela (origem "u") só sai
+    recriando a tabela — copia as linhas para uma nova com o esquema atual.
+    """
+    with engine.begin() as conn:
+        found = _url_key_unique(conn)
+        if found is None:
+            return
+        name, origin = found
+        if origin == "c":
+            conn.execute(text(f'DROP INDEX "{name}"'))
+            return
+        old_cols = {r[1] for r in conn.execute(text("PRAGMA table_info(articles)"))}
+        cols = ", ".join(c.name for c in Article.__table__.columns if c.name in old_cols)
+        tmp = Article.__table__.to_metadata(db.MetaData(), name="articles_new")
+        conn.execute(text("DROP TABLE IF EXISTS articles_new"))
+        conn.execute(CreateTable(tmp))
+        conn.execute(text(f"INSERT INTO articles_new ({cols}) SELECT {cols} FROM articles"))
+        conn.execute(text("DROP TABLE articles"))
+        conn.execute(text("ALTER TABLE articles_new RENAME TO articles"))
+        log.info("articles: url_key deixou de ser única na tabela inteira (tabela recriada)")
+
+
+def ensure_schema(app) -> None:
+    """
+    Deixa o banco de artigos no esquema atual (idempotente; roda na partida
+    e na ingestão): tabela, chave única por posição e colunas/índice do
+    agrupamento (story_clusters).
+    """
+    with app.app_context():
+        engine = db.engines["articles"]
+        Article.__table__.create(bind=engine, checkfirst=True)
+        try:
+            _drop_url_key_unique(engine)
+        except OperationalError as e:
+            log.warning("articles: migração da chave única adiada (%s)", e)  # outro worker migrando
+        with engine.begin() as conn:
+            for idx in Article.__table__.indexes:
+                if idx.name != "ix_articles_cluster":  # colunas de agrupamento vêm abaixo
+                    conn.execute(CreateIndex(idx, if_not_exists=True))
+    story_clusters.ensure_schema(app)
+
+
+# ==============================================================
+# 💾 Escrita
+# ==============================================================
+
+def upsert_articles(
+    items: Iterable[dict],
+    category: str,
+    sub: str,
+    region: Optional[str] = None,
+    origin: str = "rss",
+) -> int:
+    """
+    Insere os itens ainda não conhecidos nesta posição (pela URL canônica).
+    Aceita o formato do rss_client e o da NewsAPI (source como dict).
+    Retorna quantos artigos novos foram gravados. Falha de banco (ex.:
+    "database is locked") desfaz a transação e é relançada: quem chama não
+    pode tratar o lote como gravado.
+    """
+    batch = {}
+    for it in items:
+        url = (it.get("url") or "").strip()
+        if not url.startswith("http"):
+            continue
+        batch.setdefault(url_key(url), it)
+    if not batch:
+        return 0
+
+    try:
+        existing = {
+            k for (k,) in db.session.query(Article.url_key).filter(
+                Article.url_key.in_(list(batch)),
+                Article.category == category,
+                Article.sub == sub,
+                func.coalesce(Article.region, "") == (region or ""),
+            )
+        }
+        now = _utcnow()
+        fresh: List[Article] = []
+        for key, it in batch.items():
+            if key in existing:
+                continue
+            src = it.get("source")
+            if isinstance(src, dict):
+                src = src.get("name")
+            a = Article(
+                url_key=key,
+                url=it["url"].strip(),
+                title=(it.get("title") or "(sem título)")[:500],
+                image_url=it.get("urlToImage") or None,
+                source=(src or "")[:200],
+                origin=origin,
+                category=category,
+                sub=sub,
+                region=region,
+                published_at=_parse_dt(it.get("publishedAt")) or now,
+                fetched_at=now,
+            )
+            a.description = it.get("description") or None
+            a.content = it.get("content") or None
+            db.session.add(a)
+            fresh.append(a)
+        if fresh:
+            db.session.flush()  # ids para o agrupamento
+            story_clusters.assign(fresh)
+        db.session.commit()
+        return len(fresh)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        story_clusters.discard()
+        log.warning("falha ao gravar artigos (%s/%s): %s", category, sub, e)
+        raise
+
+
+# ==============================================================
+# 📖 Leitura (keyset)
+# ==============================================================
+
+def recent_articles(limit: int = 500) -> List[dict]:
+    """
+    Últimos artigos de todas as categorias (fallback quando a NewsAPI não
+    responde); a mesma URL em várias timelines aparece uma vez só.
+    """
+    rows = (
+        Article.query.order_by(Article.published_at.desc(), Article.id.desc())
+        .limit(max(1, int(limit)))
+        .all()
+    )
+    seen = set()
+    out = []
+    for a in rows:
+        if a.url_key not in seen:
+            seen.add(a.url_key)
+            out.append(a.to_item())
+    return out
+
+
+def _attach_coverage(rows: List[Article], items: List[dict]) -> List[dict]:
+    covered = story_clusters.also_covered(rows)
+    for a, it in zip(rows, items):
+        if a.id in covered:
+            it["alsoCoveredBy"] = covered[a.id]
+    return items
+
+
+def list_timeline(
+    category: str,
+    sub: str,
+    region: Optional[str] = None,
+    limit: int = 24,
+    cursor: Optional[str] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    collapse: bool = True,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retorna (items, next_cursor) em ordem de publicação decrescente.
+    Com `predicate`, percorre o índice em lotes até juntar `limit` itens que
+    passem no filtro (ou ler MAX_FILTER_SCAN linhas); o cursor aponta para a
+    última linha lida, então a próxima página continua de onde parou.
+    Com `collapse`, cada história aparece uma vez (o primeiro artigo do grupo
+    nesta timeline) e as demais fontes vão em `alsoCoveredBy`.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    base = Article.query.filter(Article.category == category, Article.sub == sub)
+    if region:
+        base = base.filter(Article.region == region)
+    if collapse:
+        other = aliased(Article)
+        earlier = [other.cluster_id == Article.cluster_id, other.id < Article.id,
+                   other.category == category, other.sub == sub]
+        if region:
+            earlier.append(other.region == region)
+        base = base.filter(or_(
+            Article.cluster_id.is_(None),
+            Article.cluster_id == Article.id,  # semente do grupo: ninguém antes dela
+            ~exists().where(and_(*earlier)),
+        ))
+
+    pos = None
+    if cursor:
+        pos = decode_cursor(cursor)
+        if pos is None:
+            return [], None
+
+    batch = limit + 1 if predicate is None else limit * 4
+    kept: List[Article] = []
+    items: List[dict] = []
+    scanned = 0
+    last = None
+    while True:
+        q = base
+        if pos is not None:
+            pub, aid = pos
+            q = q.filter(or_(
+                Article.published_at < pub,
+                and_(Article.published_at == pub, Article.id < aid),
+            ))
+        rows = q.order_by(Article.published_at.desc(), Article.id.desc()).limit(batch).all()
+        if predicate is None:
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].published_at, rows[-1].id)
+            items = [a.to_item() for a in rows]
+            return (_attach_coverage(rows, items) if collapse else items), next_cursor
+
+        done = False
+        for a in rows:
+            last = a
+            scanned += 1
+            item = a.to_item()
+            if predicate(item):
+                kept.append(a)
+                items.append(item)
+                if len(items) == limit:
+                    break
+        if len(items) == limit or scanned >= MAX_FILTER_SCAN:
+            done = True
+            next_cursor = encode_cursor(last.published_at, last.id) if last else None
+        elif len(rows) < batch:
+            done = True
+            next_cursor = None  # fim do histórico
+        if done:
+            return (_attach_coverage(kept, items) if collapse else items), next_cursor
+        pos = (last.published_at, last.id)
@@ -0,0 +1,129 @@
+# login_app/benchmarks/bench_feed_parse.py
+"""
+Parser incremental (feed_parser) x feedparser no documento inteiro.
+
+Gera feeds RSS/Atom sintéticos do tamanho de um "/feeds/all" grande e mede,
+para o mesmo `limit`, tempo por parse e pico de memória (tracemalloc).
+Também confere que os dois caminhos produzem os mesmos itens.
+
+    python -m login_app.benchmarks.bench_feed_parse [--items 2000] [--limit 50] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from email.utils import format_datetime
+import datetime as dt
+
+import feedparser
+
+from login_app.feed_parser import StreamingFeedParser
+from login_app.rss_client import _normalize_entries
+
+CHUNK = 16 * 1024
+
+
+def make_rss(n: int) -> bytes:
+    base = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    items = []
+    for i in range(n):
+        pub = format_datetime(base - dt.timedelta(minutes=7 * i))
+        items.append(
+            f"""<item>
+  <title>Notícia {i}: GPU &amp; CPU em teste</title>
+  <link>https://example.com/noticias/{i}</link>
+  <guid isPermaLink="false">id-{i}</guid>
+  <pubDate>{pub}</pubDate>
+  <description><![CDATA[<p>Resumo da notícia <b>{i}</b> com <a href="#">link</a>.</p>{"<p>texto longo.</p>" * 20}]]></description>
+  <media:content url="https://cdn.example.com/img/{i}.jpg" medium="image"/>
+</item>"""
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        "<title>Feed de teste</title><link>https://example.com/</link>"
+        + "".join(items)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def make_atom(n: int) -> bytes:
+    base = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    entries = []
+    for i in range(n):
+        ts = (base - dt.timedelta(minutes=7 * i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        entries.append(
+            f"""<entry>
+  <title>Entrada {i}</title>
+  <link rel="alternate" href="https://example.com/atom/{i}"/>
+  <link rel="enclosure" type="image/png" href="https://cdn.example.com/a/{i}.png"/>
+  <id>urn:example:{i}</id>
+  <updated>{ts}</updated>
+  <summary type="html">&lt;p&gt;Resumo {i}&lt;/p&gt;{"texto " * 80}</summary>
+</entry>"""
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom de teste</title>'
+        + "".join(entries)
+        + "</feed>"
+    ).encode("utf-8")
+
+
+def _chunks(body: bytes):
+    for i in range(0, len(body), CHUNK):
+        yield body[i:i + CHUNK]
+
+
+def parse_full(body: bytes, limit: int):
+    return _normalize_entries(feedparser.parse(body), limit)
+
+
+def parse_stream(body: bytes, limit: int):
+    p = StreamingFeedParser(limit)
+    for chunk in _chunks(body):
+        if p.feed(chunk):
+            break
+    return p.finish()
+
+
+def measure(fn, body: bytes, limit: int, runs: int):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(body, limit)
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn(body, limit)
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    for name, body in (("rss", make_rss(args.items)), ("atom", make_atom(args.items))):
+        full = parse_full(body, args.limit)
+        fast = parse_stream(body, args.limit)
+        same = full == fast
+        print(f"\n{name}: {args.items} itens, {len(body) / 1024:.0f} KB, limit={args.limit}, itens iguais={same}")
+        if not same:
+            for a, b in zip(full, fast):
+                if a != b:
+                    print("  feedparser:", a)
+                    print("  stream:    ", b)
+                    break
+        for label, fn in (("feedparser", parse_full), ("stream", parse_stream)):
+            ms, kb = measure(fn, body, args.limit, args.runs)
+            print(f"  {label:<10}  {ms:9.1f} ms   pico {kb:9.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
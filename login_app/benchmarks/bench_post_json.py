@@ -0,0 +1,122 @@
+# login_app/benchmarks/bench_post_json.py
+"""
+Página de /api/posts: caminho antigo x camada de serialização.
+
+Antigo: objetos ORM (`Post.query`), um `url_for` por post e o provider JSON
+padrão do Flask. Novo: tuplas de POST_COLUMNS, prefixo de /uploads/ resolvido
+uma vez e o FastJSONProvider (orjson, se instalado). Mede o tempo por página
+(consulta + dicts + JSON) e só a etapa de JSON, num banco SQLite temporário.
+
+    python -m login_app.benchmarks.bench_post_json [--posts 2000] [--page-size 50] [--runs 200]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import statistics
+import tempfile
+import time
+
+from flask import Flask, url_for
+from flask.json.provider import DefaultJSONProvider
+
+from login_app import db
+from login_app.models.post import Post
+from login_app.serialization import POST_COLUMNS, FastJSONProvider, orjson, posts_list
+
+
+def make_app(path: str, n: int) -> Flask:
+    app = Flask("bench_post_json")
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_BINDS"] = {"posts": f"sqlite:///{path}"}
+    db.init_app(app)
+    app.add_url_rule("/uploads/<path:filename>", "uploads", lambda filename: "")
+    base = dt.datetime(2025, 1, 1, 12, 0, 0)
+    with app.app_context():
+        db.create_all(bind_key="posts")
+        db.session.add_all(
+            Post(
+                titulo=f"Post {i}: educação e tecnologia",
+                conteudo="Conteúdo do post com alguns parágrafos de texto. " * 12,
+                autor=f"usuario{i % 40}",
+                author_id=i % 40 or None,
+                image_filename=f"{1700000000 + i}_foto.jpg" if i % 3 else None,
+                criado_em=base - dt.timedelta(minutes=i),
+                atualizado_em=base if i % 5 == 0 else None,
+            )
+            for i in range(n)
+        )
+        db.session.commit()
+    return app
+
+
+def old_page(page_size: int):
+    rows = Post.query.order_by(Post.id.desc()).limit(page_size).all()
+    return [
+        {
+            "id": p.id,
+            "titulo": p.titulo,
+            "conteudo": p.conteudo,
+            "autor": p.autor,
+            "image_url": url_for("uploads", filename=p.image_filename, _external=True, _scheme="https")
+            if p.image_filename else None,
+            "criado_em": p.criado_em,
+            "atualizado_em": p.atualizado_em,
+        }
+        for p in rows
+    ]
+
+
+def new_page(page_size: int):
+    rows = db.session.query(*POST_COLUMNS).order_by(Post.id.desc()).limit(page_size).all()
+    return posts_list(rows)
+
+
+def measure(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e6)
+    return statistics.median(times)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--posts", type=int, default=2000)
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--runs", type=int, default=200)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        app = make_app(path, args.posts)
+        old_json = DefaultJSONProvider(app)
+        new_json = FastJSONProvider(app)
+        with app.test_request_context("/api/posts/", base_url="https://exemplo.com.br"):
+            body = {"page": 1, "pages": 1, "total": args.posts}
+            old_items, new_items = old_page(args.page_size), new_page(args.page_size)
+            same_urls = [a["image_url"] for a in old_items] == [b["image_url"] for b in new_items]
+            print(f"{args.posts} posts, página de {args.page_size}, orjson={'sim' if orjson else 'não'}, "
+                  f"image_url iguais={same_urls}")
+
+            cases = (
+                ("antigo", lambda: old_json.dumps({**body, "items": old_page(args.page_size)}),
+                 lambda: old_json.dumps({**body, "items": old_items})),
+                ("novo", lambda: new_json.dumps({**body, "items": new_page(args.page_size)}),
+                 lambda: new_json.dumps({**body, "items": new_items})),
+            )
+            print(f"  {'caminho':<8}  {'página (µs)':>12}  {'só JSON (µs)':>13}  {'bytes':>7}")
+            for label, full, only_json in cases:
+                db.session.expunge_all()
+                page_us = measure(full, args.runs)
+                json_us = measure(only_json, args.runs)
+                print(f"  {label:<8}  {page_us:12.0f}  {json_us:13.0f}  {len(only_json()):7d}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
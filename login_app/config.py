@@ -8,7 +8,8 @@ class Config:
     # SQLAlchemy (exemplo)
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:////data/app.db")
     SQLALCHEMY_BINDS = {
-        "posts": os.getenv("POSTS_DB_URL", "sqlite:////data/posts.db")
+        "posts": os.getenv("POSTS_DB_URL", "sqlite:////data/posts.db"),
+        "articles": os.getenv("ARTICLES_DB_URL", "sqlite:////data/articles.db"),
     }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
@@ -43,9 +44,13 @@ class Config:
     # segundo banco (postagens)
     POSTS_DATABASE_URI = "sqlite:////data/posts.db"
 
-    # dicionário de binds: o SQLAlchemy usa isso para identificar o segundo banco
+    # terceiro banco (histórico de notícias RSS/NewsAPI)
+    ARTICLES_DATABASE_URI = os.getenv("ARTICLES_DB_URL", "sqlite:////data/articles.db")
+
+    # dicionário de binds: o SQLAlchemy usa isso para identificar os bancos extras
     SQLALCHEMY_BINDS = {
-        "posts": POSTS_DATABASE_URI
+        "posts": POSTS_DATABASE_URI,
+        "articles": ARTICLES_DATABASE_URI,
     }
 
     # configurações gerais
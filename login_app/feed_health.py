@@ -0,0 +1,224 @@
+# login_app/feed_health.py
+"""
+Saúde dos feeds, poll adaptativo e circuit breaker.
+
+Por feed (tabela feed_health, compartilhada entre processos):
+- EWMA de itens novos por poll e da latência, falhas consecutivas;
+- intervalo adaptativo: parte do `poll_interval` do registro e encolhe para
+  feeds que sempre trazem novidade (até 1/4) ou cresce para os parados (até
+  RSS_POLL_MAX_INTERVAL); `TARGET_NEW` novos por poll mantém o intervalo base;
+- falha: backoff exponencial sobre o intervalo base.
+
+Por host (tabela host_breaker): RSS_BREAKER_THRESHOLD falhas seguidas abrem
+o circuito e ninguém chama o host até o cooldown (que dobra a cada reabertura).
+Depois disso um único poll de teste passa (meio-aberto): sucesso fecha o
+circuito, falha reabre. 404/410 são problema do feed, não do host.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from . import feed_registry, feed_state
+
+EWMA_ALPHA = float(os.getenv("RSS_HEALTH_EWMA_ALPHA", "0.3"))
+TARGET_NEW = float(os.getenv("RSS_POLL_TARGET_NEW", "2"))
+MAX_POLL_INTERVAL = float(os.getenv("RSS_POLL_MAX_INTERVAL", str(6 * 3600)))
+MAX_BACKOFF = float(os.getenv("RSS_POLL_MAX_BACKOFF", str(6 * 3600)))
+BREAKER_THRESHOLD = int(os.getenv("RSS_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("RSS_BREAKER_COOLDOWN", "600"))
+BREAKER_MAX_COOLDOWN = float(os.getenv("RSS_BREAKER_MAX_COOLDOWN", str(6 * 3600)))
+# janela reservada ao poll de teste do circuito meio-aberto (s)
+HALF_OPEN_PROBE = float(os.getenv("RSS_BREAKER_PROBE_WINDOW", "60"))
+
+DEFAULT_POLL_INTERVAL = 300
+_FEED_FAULT_STATUS = (404, 410)
+
+_breaker_lock = threading.Lock()
+
+
+class CircuitOpen(Exception):
+    """Host com circuito aberto: o feed nem foi chamado."""
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def base_interval(url: str) -> float:
+    info = feed_registry.current().by_url.get(url)
+    return float(info.poll_interval) if info else float(DEFAULT_POLL_INTERVAL)
+
+
+def adaptive_interval(base: float, new_ewma: Optional[float]) -> float:
+    """Intervalo proporcional ao inverso da taxa de novidades, com limites."""
+    if new_ewma is None:
+        return base
+    lo = max(feed_registry.MIN_POLL_INTERVAL, base / 4)
+    hi = max(base, MAX_POLL_INTERVAL)
+    return min(hi, max(lo, base * TARGET_NEW / max(new_ewma, 0.05)))
+
+
+def _ewma(prev: Optional[float], value: float) -> float:
+    return value if prev is None else prev + EWMA_ALPHA * (value - prev)
+
+
+# ==============================================================
+# ⚡ Circuit breaker por host
+# ==============================================================
+
+def acquire(url: str) -> bool:
+    """
+    Pode chamar o host deste feed agora? Com o circuito aberto e o cooldown
+    vencido, reserva o poll de teste para quem chegou primeiro (entre todos
+    os processos: a reserva é uma transação só no SQLite).
+    """
+    return feed_state.claim_probe(_host(url), time.time(), HALF_OPEN_PROBE)
+
+
+def _host_result(url: str, error: Optional[str]) -> None:
+    host = _host(url)
+    now = time.time()
+    with _breaker_lock:
+        b = feed_state.all_breakers().get(host) or {"failures": 0, "trips": 0, "open_until": 0.0, "last_error": None}
+        if error is None:
+            if b["failures"] or b["trips"]:
+                feed_state.save_breaker(host, {"failures": 0, "trips": 0, "open_until": 0.0, "last_error": None})
+            return
+        b = {**b, "failures": b["failures"] + 1, "last_error": error}
+        # meio-aberto (já disparou antes) reabre na primeira falha
+        if b["failures"] >= BREAKER_THRESHOLD or b["trips"]:
+            b["trips"] += 1
+            b["failures"] = 0
+            b["open_until"] = now + min(BREAKER_COOLDOWN * 2 ** (b["trips"] - 1), BREAKER_MAX_COOLDOWN)
+        feed_state.save_breaker(host, b)
+
+
+# ==============================================================
+# 🩺 Registro de resultados
+# ==============================================================
+
+def record_success(url: str, new_items: int, latency_ms: float) -> None:
+    now = time.time()
+    h = feed_state.get_health(url) or {}
+    # o primeiro lote é todo "novo" e distorceria a taxa: só conta a partir do
+    # segundo, partindo do alvo (neutro) para o intervalo mudar aos poucos
+    new_ewma = None
+    if h.get("last_ok_at"):
+        prev = h.get("new_ewma")
+        new_ewma = _ewma(TARGET_NEW if prev is None else prev, float(new_items))
+    interval = adaptive_interval(base_interval(url), new_ewma)
+    feed_state.save_health(url, {
+        "polls": (h.get("polls") or 0) + 1,
+        "failures": 0,
+        "new_ewma": new_ewma,
+        "latency_ewma": _ewma(h.get("latency_ewma"), latency_ms),
+        "interval_s": interval,
+        "next_poll_at": now + interval,
+        "last_ok_at": now,
+        "last_poll_at": now,
+        "last_error": None,
+    })
+    _host_result(url, None)
+
+
+def record_failure(url: str, error: str, latency_ms: float, status: Optional[int] = None) -> None:
+    now = time.time()
+    h = feed_state.get_health(url) or {}
+    failures = (h.get("failures") or 0) + 1
+    base = base_interval(url)
+    backoff = min(base * 2 ** (failures - 1), max(base, MAX_BACKOFF))
+    feed_state.save_health(url, {
+        **h,
+        "polls": (h.get("polls") or 0) + 1,
+        "failures": failures,
+        "latency_ewma": _ewma(h.get("latency_ewma"), latency_ms),
+        "interval_s": h.get("interval_s") or base,
+        "next_poll_at": now + backoff,
+        "last_poll_at": now,
+        "last_error": error[:300],
+    })
+    if status not in _FEED_FAULT_STATUS:
+        _host_result(url, error[:300])
+
+
+# ==============================================================
+# 🗓️ Agenda + relatório
+# ==============================================================
+
+def due(urls: Iterable[str], now: Optional[float] = None) -> List[str]:
+    """Feeds cujo próximo poll já venceu e cujo host não está com o circuito aberto."""
+    now = time.time() if now is None else now
+    health = feed_state.all_health()
+    breakers = feed_state.all_breakers()
+    out = []
+    for u in urls:
+        h = health.get(u)
+        if h and (h["next_poll_at"] or 0) > now:
+            continue
+        b = breakers.get(_host(u))
+        if b and b["trips"] and b["open_until"] > now:
+            continue
+        out.append(u)
+    return out
+
+
+def _status(h: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]], now: float) -> str:
+    if b and b["trips"]:
+        return "circuit_open" if b["open_until"] > now else "half_open"
+    if not h or not h["polls"]:
+        return "never_polled"
+    if h["failures"]:
+        return "backoff"
+    return "healthy"
+
+
+def report() -> Dict[str, Any]:
+    """Saúde de todos os feeds do registro e o estado dos circuitos por host."""
+    now = time.time()
+    registry = feed_registry.current()
+    health = feed_state.all_health()
+    breakers = feed_state.all_breakers()
+
+    where: Dict[str, List[str]] = {}
+    for cat, sub, region, info in registry.iter_placements():
+        where.setdefault(info.id, []).append("/".join(p for p in (cat, sub, region) if p))
+
+    feeds = []
+    summary: Dict[str, int] = {}
+    for fid, info in registry.feeds.items():
+        h = health.get(info.url)
+        status = _status(h, breakers.get(_host(info.url)), now)
+        summary[status] = summary.get(status, 0) + 1
+        h = h or {}
+        feeds.append({
+            "id": fid,
+            "url": info.url,
+            "placements": where.get(fid, []),
+            "status": status,
+            "base_interval_s": info.poll_interval,
+            "interval_s": round(h["interval_s"]) if h.get("interval_s") else None,
+            "next_poll_in_s": max(0, int(h["next_poll_at"] - now)) if h.get("next_poll_at") else 0,
+            "new_items_ewma": round(h["new_ewma"], 2) if h.get("new_ewma") is not None else None,
+            "latency_ms_ewma": round(h["latency_ewma"]) if h.get("latency_ewma") is not None else None,
+            "consecutive_failures": h.get("failures") or 0,
+            "polls": h.get("polls") or 0,
+            "last_ok_age_s": int(now - h["last_ok_at"]) if h.get("last_ok_at") else None,
+            "last_error": h.get("last_error"),
+        })
+
+    hosts = {
+        host: {
+            "state": ("open" if b["open_until"] > now else "half_open") if b["trips"] else "closed",
+            "consecutive_failures": b["failures"],
+            "trips": b["trips"],
+            "retry_in_s": max(0, int(b["open_until"] - now)) if b["trips"] else 0,
+            "last_error": b["last_error"],
+        }
+        for host, b in sorted(breakers.items())
+        if b["failures"] or b["trips"]
+    }
+    return {"summary": summary, "feeds": feeds, "hosts": hosts}
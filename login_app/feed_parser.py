@@ -0,0 +1,380 @@
+# login_app/feed_parser.py
+"""
+Parser incremental de RSS 2.0 / RSS 1.0 (RDF) / Atom.
+
+Recebe o documento em pedaços (direto do socket) e para assim que junta
+`limit` itens — o resto do feed nem é baixado. Gera os mesmos dicts do
+caminho com feedparser (title/description/url/urlToImage/publishedAt/source).
+
+Quando o documento não é um feed XML bem-formado (HTML, entidades de HTML,
+encoding que o expat não conhece...), levanta `FeedNotSupported` e quem chamou
+cai para o feedparser, que é tolerante a tudo isso (`normalize_parsed`).
+
+`parse_bytes` junta os dois caminhos para um corpo já baixado; `pack_items` /
+`unpack_items` dão a forma compacta usada entre processos (parse_pool).
+
+Os dois caminhos aceitam `known` ({url: item já normalizado}, vindo do estado
+do feed): entradas repetidas são reaproveitadas sem limpar texto, procurar
+imagem nem converter data de novo.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import html
+import re
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+import feedparser
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+
+_FEED_ROOTS = {"rss", "feed", "RDF"}
+_IMAGE_EXT = re.compile(r"\.(jpe?g|png|gif|webp)$", re.I)
+
+
+class FeedNotSupported(Exception):
+    """Documento que o parser rápido não trata — usar o feedparser."""
+
+
+def clean_text(s: Optional[str]) -> str:
+    if not s:
+        return ""
+    s = html.unescape(s)
+    s = re.sub(r"<.*?>", "", s)         # remove tags HTML
+    s = re.sub(r"\s+", " ", s).strip()  # normaliza espaços
+    return s
+
+
+def _split(tag: str):
+    """'{ns}local' → (ns, local)."""
+    if tag[:1] == "{":
+        ns, _, local = tag[1:].partition("}")
+        return ns, local
+    return "", tag
+
+
+def _parse_date(value: Optional[str]) -> Optional[str]:
+    """RFC 822 (RSS) ou ISO 8601 (Atom) → ISO em UTC, sem frações de segundo."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    d = None
+    try:
+        d = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            d = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if d is None:
+        return None
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=dt.timezone.utc)
+    d = d.astimezone(dt.timezone.utc).replace(microsecond=0)
+    return d.isoformat()
+
+
+def _entry_key(entry: Element) -> str:
+    """URL da entrada (mesma regra de `_entry_to_item`), sem normalizar o resto."""
+    link = guid = None
+    for child in entry:
+        ns, name = _split(child.tag)
+        if ns == MEDIA_NS:
+            continue
+        if name == "link":
+            href = child.get("href")
+            if href is None:
+                link = link or (child.text or "").strip()
+            elif (child.get("rel") or "alternate").lower() == "alternate" and not link:
+                link = href.strip()
+        elif name == "guid" and (child.get("isPermaLink") or "true").lower() == "true":
+            guid = (child.text or "").strip()
+    if not link and guid and guid.startswith("http"):
+        link = guid
+    return link or ""
+
+
+def _entry_to_item(entry: Element, source: str) -> dict:
+    title = desc = summary = content = link = guid = date = updated = None
+    image = None
+    enclosure_image = None
+
+    for child in entry:
+        ns, name = _split(child.tag)
+        text = child.text
+        if ns == MEDIA_NS:
+            if name in ("content", "thumbnail") and not image:
+                image = child.get("url") or None
+            elif name == "group" and not image:
+                for sub in child:
+                    if _split(sub.tag)[1] in ("content", "thumbnail") and sub.get("url"):
+                        image = sub.get("url")
+                        break
+            continue
+        if name == "title":
+            title = text
+        elif name == "description":
+            desc = text
+        elif name == "summary":
+            summary = text
+        elif (ns, name) in ((CONTENT_NS, "encoded"), (ATOM_NS, "content"), ("", "content")) and content is None:
+            content = text
+        elif name == "link":
+            href = child.get("href")
+            if href is None:  # RSS: <link>url</link>
+                link = link or (text or "").strip()
+            else:
+                rel = (child.get("rel") or "alternate").lower()
+                typ = (child.get("type") or "").lower()
+                if rel == "alternate" and not link:
+                    link = href.strip()
+                elif rel == "enclosure" and typ.startswith("image/") and not enclosure_image:
+                    enclosure_image = href
+        elif name == "guid":
+            if (child.get("isPermaLink") or "true").lower() == "true":
+                guid = (text or "").strip()
+        elif name == "enclosure" and not enclosure_image:
+            url = child.get("url") or child.get("href")
+            typ = (child.get("type") or "").lower()
+            if url and (typ.startswith("image/") or _IMAGE_EXT.search(url)):
+                enclosure_image = url
+        elif name in ("pubDate", "published", "issued", "date"):
+            date = date or text
+        elif name in ("updated", "modified"):
+            updated = updated or text
+
+    if not link and guid and guid.startswith("http"):
+        link = guid
+    return {
+        "title": clean_text(title) or "(sem título)",
+        "description": clean_text(desc or summary or content) or None,
+        "url": link or "",
+        "urlToImage": image or enclosure_image,
+        "publishedAt": _parse_date(date) or _parse_date(updated),
+        "source": source,
+    }
+
+
+class StreamingFeedParser:
+    """
+    Uso:
+        p = StreamingFeedParser(limit=50)
+        for chunk in resp.iter_content(16384):
+            if p.feed(chunk):
+                break          # já tem `limit` itens
+        items = p.finish()
+    """
+
+    def __init__(self, limit: int, known: Optional[Mapping[str, object]] = None):
+        self.limit = max(1, int(limit))
+        self.known = known or {}
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._stack: List[str] = []
+        self._root_checked = False
+        self._entries: List[Element] = []
+        self._source: Optional[str] = None
+        self.bytes_read = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Alimenta o parser; True quando já juntou `limit` itens."""
+        if self.done:
+            return True
+        self.bytes_read += len(chunk)
+        try:
+            self._parser.feed(chunk)
+            self._drain()
+        except ParseError as e:
+            raise FeedNotSupported(str(e)) from e
+        return self.done
+
+    def _drain(self) -> None:
+        for event, elem in self._parser.read_events():
+            ns, name = _split(elem.tag)
+            if event == "start":
+                if not self._root_checked:
+                    if name not in _FEED_ROOTS:
+                        raise FeedNotSupported(f"raiz <{name}> não é um feed")
+                    self._root_checked = True
+                self._stack.append(name)
+                continue
+
+            self._stack.pop()
+            parent = self._stack[-1] if self._stack else ""
+            if name in ("item", "entry"):
+                self._entries.append(elem)
+                if len(self._entries) >= self.limit:
+                    self.done = True
+                    return
+            elif name == "title" and self._source is None and parent in ("channel", "feed"):
+                self._source = clean_text(elem.text) or None
+
+    def finish(self) -> List[dict]:
+        """Fecha o parser (se o documento acabou) e devolve os itens normalizados."""
+        if not self.done:
+            try:
+                self._parser.close()
+                self._drain()
+            except ParseError as e:
+                raise FeedNotSupported(str(e)) from e
+        if not self._root_checked:
+            raise FeedNotSupported("documento vazio")
+        source = self._source or "RSS desconhecido"
+        items = []
+        for e in self._entries:
+            key = _entry_key(e) if self.known else ""
+            items.append(self.known[key] if key in self.known else _entry_to_item(e, source))
+        self._entries = []
+        return items
+
+
+# ==============================================================
+# 🐢 Caminho tolerante (feedparser)
+# ==============================================================
+
+def _extract_image(entry: dict) -> Optional[str]:
+    """
+    Tenta encontrar uma imagem representativa no item RSS.
+    Prioridades:
+      - media:content / media:thumbnail
+      - enclosures image/*
+      - links rel="enclosure" / type image/*
+    """
+    try:
+        # media:content
+        if "media_content" in entry and entry.media_content:
+            for media in entry.media_content:
+                url = media.get("url")
+                if url:
+                    return url
+
+        # media:thumbnail
+        if "media_thumbnail" in entry and entry.media_thumbnail:
+            url = entry.media_thumbnail[0].get("url")
+            if url:
+                return url
+
+        # enclosures (com extensões ou type image/*)
+        if "enclosures" in entry and entry.enclosures:
+            for enc in entry.enclosures:
+                url = enc.get("href") or enc.get("url")
+                typ = (enc.get("type") or "").lower()
+                if url and (typ.startswith("image/") or _IMAGE_EXT.search(url)):
+                    return url
+
+        # links com rel=enclosure e type image/*
+        if "links" in entry and entry.links:
+            for l in entry.links:
+                rel = (l.get("rel") or "").lower()
+                typ = (l.get("type") or "").lower()
+                href = l.get("href")
+                if rel == "enclosure" and href and typ.startswith("image/"):
+                    return href
+    except Exception:
+        pass
+    return None
+
+
+def _safe_feed_title(parsed) -> str:
+    """Pega título do feed sem levantar exceção se faltar metadado."""
+    feed_meta = getattr(parsed, "feed", None)
+    if isinstance(feed_meta, dict):
+        return feed_meta.get("title", "RSS desconhecido")
+    return "RSS desconhecido"
+
+
+def normalize_parsed(parsed, limit: int, known: Optional[Mapping[str, object]] = None) -> List[dict]:
+    """Converte as entradas do feedparser nos dicts usados pelo app."""
+    items: List[dict] = []
+    source = _safe_feed_title(parsed)
+    known = known or {}
+
+    for e in getattr(parsed, "entries", [])[:limit]:
+        link = getattr(e, "link", "")
+        if link in known:
+            items.append(known[link])
+            continue
+        title = clean_text(getattr(e, "title", ""))
+        desc = clean_text(getattr(e, "summary", "") or getattr(e, "description", ""))
+        image = _extract_image(e)
+
+        # Data: tenta published_parsed, cai para updated_parsed
+        pub_dt = None
+        tm = getattr(e, "published_parsed", None) or getattr(e, "updated_parsed", None)
+        if tm:
+            pub_dt = dt.datetime(*tm[:6], tzinfo=dt.timezone.utc)
+
+        items.append({
+            "title": title or "(sem título)",
+            "description": desc or None,
+            "url": link,
+            "urlToImage": image,
+            "publishedAt": pub_dt.isoformat() if pub_dt else None,
+            "source": source,
+        })
+    return items
+
+
+def parse_with_feedparser(body: bytes, limit: int, content_type: str = "", url: str = "",
+                          known: Optional[Mapping[str, object]] = None) -> List[dict]:
+    parsed = feedparser.parse(
+        body,
+        response_headers={"content-type": content_type, "content-location": url},
+    )
+    return normalize_parsed(parsed, limit, known)
+
+
+CHUNK_SIZE = 16 * 1024
+
+
+def parse_bytes(body, limit: int, content_type: str = "", url: str = "",
+                known: Optional[Mapping[str, object]] = None) -> Tuple[List[dict], bool]:
+    """
+    Corpo inteiro (bytes ou memoryview) → (items, usou_feedparser).
+    Tenta o parser incremental; se não servir, usa o feedparser.
+    """
+    view = memoryview(body)
+    parser = StreamingFeedParser(limit, known)
+    try:
+        for i in range(0, len(view), CHUNK_SIZE):
+            if parser.feed(view[i:i + CHUNK_SIZE]):
+                break
+        return parser.finish(), False
+    except FeedNotSupported:
+        return parse_with_feedparser(bytes(view), limit, content_type, url, known), True
+
+
+# ==============================================================
+# 📦 Forma compacta (entre processos)
+# ==============================================================
+
+_PACKED_FIELDS = ("title", "description", "url", "urlToImage", "publishedAt")
+
+
+def pack_items(items: List[object]) -> Tuple[str, List[object]]:
+    """
+    (fonte, [tuplas]) — a fonte é a mesma em todos os itens do feed.
+    Itens já conhecidos chegam como a própria URL (str) e passam direto.
+    """
+    source = next((it["source"] for it in items if isinstance(it, dict)), "")
+    return source, [
+        it if isinstance(it, str) else tuple(it[f] for f in _PACKED_FIELDS) for it in items
+    ]
+
+
+def unpack_items(packed: Tuple[str, List[object]], known: Optional[Mapping[str, dict]] = None) -> List[dict]:
+    source, rows = packed
+    known = known or {}
+    out = []
+    for row in rows:
+        if isinstance(row, str):
+            out.append(known[row])
+            continue
+        item = dict(zip(_PACKED_FIELDS, row))
+        item["source"] = source
+        out.append(item)
+    return out
@@ -0,0 +1,297 @@
+# login_app/feed_registry.py
+"""
+Registro de feeds RSS, carregado de um YAML (feeds.yaml) e compilado em
+tabelas planas.
+
+- A árvore aceita sub -> [feeds] e sub -> {região: [feeds]}; na compilação
+  tudo vira chave (categoria, sub, região) -> IDs de feed. A chave com
+  região None junta todas as regiões da sub.
+- Metadados por feed: intervalo de poll, idioma e peso.
+- Validação completa antes de publicar: um arquivo inválido na partida
+  derruba o boot; numa recarga só gera log e o registro anterior continua.
+- Recarga a quente: cada processo confere o mtime do arquivo (no máximo a
+  cada RSS_FEEDS_CHECK_INTERVAL s) e troca o registro inteiro de uma vez —
+  leitores sempre veem uma versão completa, nunca uma mistura.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import yaml
+
+from . import feed_transport
+
+FEEDS_FILE = os.getenv("RSS_FEEDS_FILE", os.path.join(os.path.dirname(__file__), "feeds.yaml"))
+CHECK_INTERVAL = float(os.getenv("RSS_FEEDS_CHECK_INTERVAL", "5"))
+MIN_POLL_INTERVAL = 60
+
+_BUILTIN_DEFAULTS = {"poll_interval": 300, "lang": "pt", "weight": 1.0}
+_FEED_FIELDS = {"id", "url", "poll_interval", "lang", "weight"}
+
+log = logging.getLogger(__name__)
+
+
+class FeedRegistryError(ValueError):
+    """Arquivo de feeds inválido (estrutura, URL ou metadado)."""
+
+
+class FeedInfo:
+    __slots__ = ("id", "url", "poll_interval", "lang", "weight")
+
+    def __init__(self, id: str, url: str, poll_interval: int, lang: str, weight: float):
+        self.id = id
+        self.url = url
+        self.poll_interval = poll_interval
+        self.lang = lang
+        self.weight = weight
+
+    def _key(self) -> tuple:
+        return (self.id, self.url, self.poll_interval, self.lang, self.weight)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FeedInfo) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"FeedInfo({self.id!r}, {self.url!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+Key = Tuple[str, str, Optional[str]]
+
+
+class Registry:
+    """Versão compilada (imutável) do arquivo de feeds."""
+
+    def __init__(self, feeds: Dict[str, FeedInfo], placements: List[Tuple[str, str, Optional[str], str]],
+                 version: str, path: str, mtime: float):
+        self.feeds = feeds
+        self.by_url: Dict[str, FeedInfo] = {f.url: f for f in feeds.values()}
+        self.placements = tuple(placements)  # (categoria, sub, região, feed_id), na ordem do arquivo
+        self.version = version
+        self.path = path
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+        by_key: Dict[Key, List[str]] = {}
+        subs: Dict[str, List[str]] = {}
+        regions: Dict[Tuple[str, str], List[str]] = {}
+        for cat, sub, region, fid in self.placements:
+            subs.setdefault(cat, [])
+            if sub not in subs[cat]:
+                subs[cat].append(sub)
+            if region is not None:
+                regs = regions.setdefault((cat, sub), [])
+                if region not in regs:
+                    regs.append(region)
+                by_key.setdefault((cat, sub, region), []).append(fid)
+            all_ids = by_key.setdefault((cat, sub, None), [])
+            if fid not in all_ids:
+                all_ids.append(fid)
+        self.by_key: Dict[Key, Tuple[str, ...]] = {k: tuple(v) for k, v in by_key.items()}
+        self.subs: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in subs.items()}
+        self.regions: Dict[Tuple[str, str], Tuple[str, ...]] = {k: tuple(v) for k, v in regions.items()}
+
+    def urls(self, category: str, sub: str, region: Optional[str] = None) -> Tuple[str, ...]:
+        """URLs de (categoria, sub[, região]); vazio se a chave não existir."""
+        return tuple(self.feeds[fid].url for fid in self.by_key.get((category, sub, region), ()))
+
+    def iter_placements(self) -> Iterator[Tuple[str, str, Optional[str], FeedInfo]]:
+        for cat, sub, region, fid in self.placements:
+            yield cat, sub, region, self.feeds[fid]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "feeds": len(self.feeds),
+            "categories": len(self.subs),
+            "loaded_at": int(self.loaded_at),
+        }
+
+
+# ==============================================================
+# ✅ Validação + compilação
+# ==============================================================
+
+def _name(value: Any, where: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise FeedRegistryError(f"{where}: nome vazio ou não-texto ({value!r})")
+    name = value.strip().lower()
+    if "/" in name:
+        raise FeedRegistryError(f"{where}: nome não pode conter '/' ({value!r})")
+    return name
+
+
+def _feed(entry: Any, defaults: Dict[str, Any], where: str) -> FeedInfo:
+    if isinstance(entry, str):
+        entry = {"url": entry}
+    if not isinstance(entry, dict):
+        raise FeedRegistryError(f"{where}: feed deve ser URL ou mapa, veio {type(entry).__name__}")
+    extra = set(entry) - _FEED_FIELDS
+    if extra:
+        raise FeedRegistryError(f"{where}: campos desconhecidos {sorted(map(str, extra))}")
+
+    url = str(entry.get("url") or "").strip()
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise FeedRegistryError(f"{where}: URL inválida {url!r}")
+
+    merged = {**defaults, **entry}
+    try:
+        poll = int(merged["poll_interval"])
+        weight = float(merged["weight"])
+    except (TypeError, ValueError):
+        raise FeedRegistryError(f"{where}: poll_interval/weight não numéricos ({url})") from None
+    if poll < MIN_POLL_INTERVAL:
+        raise FeedRegistryError(f"{where}: poll_interval < {MIN_POLL_INTERVAL}s ({url})")
+    if weight <= 0:
+        raise FeedRegistryError(f"{where}: weight deve ser > 0 ({url})")
+    lang = str(merged["lang"] or "").strip().lower()
+    if not lang:
+        raise FeedRegistryError(f"{where}: lang vazio ({url})")
+
+    fid = str(entry.get("id") or hashlib.sha1(url.encode("utf-8")).hexdigest()[:10])
+    return FeedInfo(fid, url, poll, lang, weight)
+
+
+def _feed_list(node: Any, defaults: Dict[str, Any], where: str) -> List[FeedInfo]:
+    if not isinstance(node, list) or not node:
+        raise FeedRegistryError(f"{where}: esperada lista de feeds não vazia")
+    out = [_feed(e, defaults, f"{where}[{i}]") for i, e in enumerate(node)]
+    seen = set()
+    for f in out:
+        if f.url in seen:
+            raise FeedRegistryError(f"{where}: URL repetida {f.url}")
+        seen.add(f.url)
+    return out
+
+
+def compile_tree(data: Any, version: str = "", path: str = "", mtime: float = 0.0) -> Registry:
+    """Valida a árvore (já carregada do YAML) e compila o registro."""
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), dict) or not data["categories"]:
+        raise FeedRegistryError("raiz deve ter 'categories' (mapa não vazio)")
+    raw_defaults = data.get("defaults") or {}
+    if not isinstance(raw_defaults, dict):
+        raise FeedRegistryError(f"'defaults' deve ser um mapa, veio {type(raw_defaults).__name__}")
+    extra = set(raw_defaults) - set(_BUILTIN_DEFAULTS)
+    if extra:
+        raise FeedRegistryError(f"defaults: campos desconhecidos {sorted(map(str, extra))}")
+    defaults = {**_BUILTIN_DEFAULTS, **raw_defaults}
+
+    feeds: Dict[str, FeedInfo] = {}
+    by_url: Dict[str, str] = {}
+    placements: List[Tuple[str, str, Optional[str], str]] = []
+
+    def _add(cat: str, sub: str, region: Optional[str], items: List[FeedInfo], where: str) -> None:
+        for f in items:
+            prev = feeds.get(f.id)
+            if prev is not None and prev != f:
+                raise FeedRegistryError(f"{where}: id {f.id!r} já usado com outros dados ({prev.url})")
+            if by_url.get(f.url, f.id) != f.id:
+                raise FeedRegistryError(f"{where}: {f.url} aparece com ids diferentes")
+            feeds[f.id] = f
+            by_url[f.url] = f.id
+            placements.append((cat, sub, region, f.id))
+
+    for raw_cat, subs in data["categories"].items():
+        cat = _name(raw_cat, "categoria")
+        if not isinstance(subs, dict) or not subs:
+            raise FeedRegistryError(f"{cat}: esperado mapa de subcategorias")
+        for raw_sub, node in subs.items():
+            sub = _name(raw_sub, f"{cat}/sub")
+            where = f"{cat}/{sub}"
+            if isinstance(node, dict):
+                if not node:
+                    raise FeedRegistryError(f"{where}: sem regiões")
+                for raw_region, urls in node.items():
+                    region = _name(raw_region, f"{where}/região")
+                    _add(cat, sub, region, _feed_list(urls, defaults, f"{where}/{region}"), f"{where}/{region}")
+            else:
+                _add(cat, sub, None, _feed_list(node, defaults, where), where)
+
+    return Registry(feeds, placements, version, path, mtime)
+
+
+def load_file(path: str = FEEDS_FILE) -> Registry:
+    """Lê, valida e compila o arquivo. Levanta FeedRegistryError se inválido."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    mtime = os.stat(path).st_mtime
+    try:
+        data = yaml.safe_load(raw)
+    except yaml.YAMLError as e:
+        raise FeedRegistryError(f"YAML inválido em {path}: {e}") from None
+    version = hashlib.sha1(raw).hexdigest()[:12]
+    try:
+        return compile_tree(data, version, path, mtime)
+    except (TypeError, ValueError, AttributeError) as e:
+        # forma inesperada que a validação não previu: vale como arquivo inválido
+        raise FeedRegistryError(f"estrutura inválida em {path}: {e}") from None
+
+
+# ==============================================================
+# 🔄 Registro atual (troca atômica + recarga a quente)
+# ==============================================================
+
+_current: Optional[Registry] = None
+_checked_at = 0.0
+_rejected_mtime: Optional[float] = None  # arquivo inválido já reportado
+_reload_lock = threading.Lock()
+
+
+def _publish(reg: Registry) -> None:
+    global _current
+    feed_transport.register_hosts(f.url for f in reg.feeds.values())
+    _current = reg  # uma única troca de referência: leitores nunca veem meio registro
+
+
+def reload(force: bool = False) -> bool:
+    """
+    Recarrega se o arquivo mudou (ou sempre, com `force`). True se trocou.
+    Erro de validação numa recarga não derruba nada: loga e mantém a versão atual.
+    """
+    global _checked_at, _rejected_mtime
+    with _reload_lock:
+        _checked_at = time.monotonic()
+        cur = _current
+        try:
+            mtime = os.stat(FEEDS_FILE).st_mtime
+        except OSError as e:
+            if cur is None:
+                raise FeedRegistryError(f"arquivo de feeds indisponível: {e}") from None
+            log.warning("arquivo de feeds indisponível (%s); mantendo versão %s", e, cur.version)
+            return False
+        if cur is not None and not force and mtime in (cur.mtime, _rejected_mtime):
+            return False
+        try:
+            reg = load_file(FEEDS_FILE)
+        except FeedRegistryError as e:
+            if cur is None:
+                raise
+            _rejected_mtime = mtime
+            log.error("registro de feeds inválido (%s); mantendo versão %s", e, cur.version)
+            return False
+        if cur is not None and reg.version == cur.version:
+            cur.mtime = reg.mtime
+            return False
+        _publish(reg)
+        log.info("registro de feeds carregado: versão %s, %s feeds", reg.version, len(reg.feeds))
+        return True
+
+
+def current() -> Registry:
+    """Registro em uso; confere o arquivo no máximo a cada CHECK_INTERVAL s."""
+    if _current is None or time.monotonic() - _checked_at >= CHECK_INTERVAL:
+        reload()
+    return _current  # type: ignore[return-value]
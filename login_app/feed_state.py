@@ -0,0 +1,299 @@
+# login_app/feed_state.py
+"""
+Estado por feed RSS compartilhado entre todos os workers do gunicorn.
+
+Guarda, para cada URL de feed, os validadores HTTP (ETag / Last-Modified) e o
+último lote de itens já normalizados, permitindo GET condicional: quando a
+origem responde 304 reaproveitamos os itens sem baixar nem parsear de novo.
+
+O armazenamento é um SQLite no volume persistente (/data), em modo WAL,
+acessível por vários processos sem serviço externo.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .utils.paths import resolve_data_path
+
+STATE_DB_PATH = os.getenv("RSS_STATE_DB", "/data/rss_state.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feed_state (
+    url         TEXT PRIMARY KEY,
+    etag        TEXT,
+    modified    TEXT,
+    items       TEXT,
+    body_bytes  INTEGER NOT NULL DEFAULT 0,
+    parse_ms    INTEGER NOT NULL DEFAULT 0,
+    fetched_at  REAL,
+    checked_at  REAL,
+    seen        BLOB
+);
+CREATE TABLE IF NOT EXISTS feed_counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS feed_health (
+    url           TEXT PRIMARY KEY,
+    polls         INTEGER NOT NULL DEFAULT 0,
+    failures      INTEGER NOT NULL DEFAULT 0,
+    new_ewma      REAL,
+    latency_ewma  REAL,
+    interval_s    REAL,
+    next_poll_at  REAL,
+    last_ok_at    REAL,
+    last_poll_at  REAL,
+    last_error    TEXT
+);
+CREATE TABLE IF NOT EXISTS host_breaker (
+    host        TEXT PRIMARY KEY,
+    failures    INTEGER NOT NULL DEFAULT 0,
+    trips       INTEGER NOT NULL DEFAULT 0,
+    open_until  REAL NOT NULL DEFAULT 0,
+    last_error  TEXT
+);
+"""
+
+_HEALTH_COLS = ("polls", "failures", "new_ewma", "latency_ewma", "interval_s",
+                "next_poll_at", "last_ok_at", "last_poll_at", "last_error")
+_BREAKER_COLS = ("failures", "trips", "open_until", "last_error")
+
+_local = threading.local()
+
+
+def _conn() -> sqlite3.Connection:
+    """Uma conexão por thread/processo (sqlite3 não compartilha entre threads)."""
+    pid = os.getpid()
+    c = getattr(_local, "conn", None)
+    if c is None or getattr(_local, "pid", None) != pid:
+        c = sqlite3.connect(resolve_data_path(STATE_DB_PATH), timeout=10, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.executescript(_SCHEMA)
+        cols = {row[1] for row in c.execute("PRAGMA table_info(feed_state)")}
+        if "seen" not in cols:  # bancos criados antes do seen-set
+            try:
+                c.execute("ALTER TABLE feed_state ADD COLUMN seen BLOB")
+            except sqlite3.OperationalError:
+                pass  # outro processo adicionou ao mesmo tempo
+        _local.conn = c
+        _local.pid = pid
+    return c
+
+
+# ==============================================================
+# 📦 Validadores + itens por feed
+# ==============================================================
+
+def get_state(url: str) -> Optional[Dict[str, Any]]:
+    """Retorna o estado salvo do feed (ou None se nunca foi baixado)."""
+    try:
+        row = _conn().execute(
+            "SELECT etag, modified, items, body_bytes, parse_ms, fetched_at, checked_at "
+            "FROM feed_state WHERE url = ?",
+            (url,),
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if not row:
+        return None
+    etag, modified, items, body_bytes, parse_ms, fetched_at, checked_at = row
+    return {
+        "etag": etag,
+        "modified": modified,
+        "items": json.loads(items) if items else None,
+        "body_bytes": body_bytes or 0,
+        "parse_ms": parse_ms or 0,
+        "fetched_at": fetched_at,
+        "checked_at": checked_at,
+    }
+
+
+def save_state(
+    url: str,
+    etag: Optional[str],
+    modified: Optional[str],
+    items: List[dict],
+    body_bytes: int = 0,
+    parse_ms: int = 0,
+) -> None:
+    """Grava validadores + itens após um download completo (HTTP 200)."""
+    now = time.time()
+    try:
+        _conn().execute(
+            "INSERT INTO feed_state (url, etag, modified, items, body_bytes, parse_ms, fetched_at, checked_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET etag=excluded.etag, modified=excluded.modified, "
+            "items=excluded.items, body_bytes=excluded.body_bytes, parse_ms=excluded.parse_ms, "
+            "fetched_at=excluded.fetched_at, checked_at=excluded.checked_at",
+            (url, etag, modified, json.dumps(items, ensure_ascii=False, separators=(",", ":")),
+             int(body_bytes), int(parse_ms), now, now),
+        )
+    except sqlite3.Error:
+        pass
+
+
+def touch_state(url: str) -> None:
+    """Marca o feed como verificado agora (resposta 304)."""
+    try:
+        _conn().execute("UPDATE feed_state SET checked_at = ? WHERE url = ?", (time.time(), url))
+    except sqlite3.Error:
+        pass
+
+
+def get_seen(url: str) -> Optional[bytes]:
+    """Seen-set serializado do feed (utils.seen.SeenSet), se houver."""
+    try:
+        row = _conn().execute("SELECT seen FROM feed_state WHERE url = ?", (url,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def save_seen(url: str, blob: bytes) -> None:
+    try:
+        _conn().execute("UPDATE feed_state SET seen = ? WHERE url = ?", (blob, url))
+    except sqlite3.Error:
+        pass
+
+
+# ==============================================================
+# 🩺 Saúde por feed + circuit breaker por host (ver feed_health)
+# ==============================================================
+
+def get_health(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        row = _conn().execute(
+            f"SELECT {', '.join(_HEALTH_COLS)} FROM feed_health WHERE url = ?", (url,)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return dict(zip(_HEALTH_COLS, row)) if row else None
+
+
+def all_health() -> Dict[str, Dict[str, Any]]:
+    try:
+        rows = _conn().execute(f"SELECT url, {', '.join(_HEALTH_COLS)} FROM feed_health").fetchall()
+    except sqlite3.Error:
+        return {}
+    return {row[0]: dict(zip(_HEALTH_COLS, row[1:])) for row in rows}
+
+
+def save_health(url: str, health: Dict[str, Any]) -> None:
+    cols = ", ".join(_HEALTH_COLS)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in _HEALTH_COLS)
+    try:
+        _conn().execute(
+            f"INSERT INTO feed_health (url, {cols}) VALUES (?{', ?' * len(_HEALTH_COLS)}) "
+            f"ON CONFLICT(url) DO UPDATE SET {updates}",
+            (url, *(health.get(c) for c in _HEALTH_COLS)),
+        )
+    except sqlite3.Error:
+        pass
+
+
+def all_breakers() -> Dict[str, Dict[str, Any]]:
+    try:
+        rows = _conn().execute(f"SELECT host, {', '.join(_BREAKER_COLS)} FROM host_breaker").fetchall()
+    except sqlite3.Error:
+        return {}
+    return {row[0]: dict(zip(_BREAKER_COLS, row[1:])) for row in rows}
+
+
+def save_breaker(host: str, breaker: Dict[str, Any]) -> None:
+    cols = ", ".join(_BREAKER_COLS)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in _BREAKER_COLS)
+    try:
+        _conn().execute(
+            f"INSERT INTO host_breaker (host, {cols}) VALUES (?{', ?' * len(_BREAKER_COLS)}) "
+            f"ON CONFLICT(host) DO UPDATE SET {updates}",
+            (host, *(breaker.get(c) for c in _BREAKER_COLS)),
+        )
+    except sqlite3.Error:
+        pass
+
+
+def claim_probe(host: str, now: float, window: float) -> bool:
+    """
+    Check-and-set do circuito numa transação IMMEDIATE: True se o host está
+    fechado, ou se o cooldown venceu e este processo ficou com o poll de teste
+    (a janela `window` é reservada a ele). Dois workers nunca testam juntos.
+    """
+    try:
+        c = _conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            row = c.execute("SELECT trips, open_until FROM host_breaker WHERE host = ?", (host,)).fetchone()
+            if not row or not row[0]:
+                ok = True
+            elif row[1] > now:
+                ok = False
+            else:
+                c.execute("UPDATE host_breaker SET open_until = ? WHERE host = ?", (now + window, host))
+                ok = True
+            c.execute("COMMIT")
+            return ok
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+    except sqlite3.Error:
+        return True
+
+
+# ==============================================================
+# 📊 Contadores (hit/miss do GET condicional)
+# ==============================================================
+
+def incr(**counters: int) -> None:
+    """Soma valores aos contadores nomeados (atômico entre processos)."""
+    if not counters:
+        return
+    try:
+        c = _conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            for name, value in counters.items():
+                c.execute(
+                    "INSERT INTO feed_counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, int(value)),
+                )
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+    except sqlite3.Error:
+        pass
+
+
+def get_counters() -> Dict[str, int]:
+    try:
+        rows = _conn().execute("SELECT name, value FROM feed_counters").fetchall()
+    except sqlite3.Error:
+        return {}
+    return {name: value for name, value in rows}
+
+
+def conditional_stats() -> Dict[str, Any]:
+    """Resumo do GET condicional: hits (304), misses (200) e economia estimada."""
+    c = get_counters()
+    hits = c.get("conditional_hits", 0)
+    misses = c.get("conditional_misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "no_validators": c.get("conditional_no_validators", 0),
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "bytes_saved": c.get("conditional_bytes_saved", 0),
+        "parse_ms_saved": c.get("conditional_parse_ms_saved", 0),
+        "bytes_downloaded": c.get("conditional_bytes_downloaded", 0),
+        "stream_parse_fallbacks": c.get("stream_parse_fallbacks", 0),
+        "entries_reused": c.get("entries_reused", 0),
+        "entries_normalized": c.get("entries_normalized", 0),
+    }
@@ -0,0 +1,207 @@
+# login_app/feed_transport.py
+"""
+Camada de transporte dos downloads de feeds.
+
+- Uma `requests.Session` por host (por processo), com pool keep-alive:
+  vários feeds do mesmo site reaproveitam a conexão TLS.
+- Timeouts de conexão e de leitura, mais um prazo total do corpo — um host
+  que pinga bytes devagar não segura a thread até o timeout do gunicorn.
+- Tamanho máximo do corpo, contado já descomprimido (gzip/deflate são
+  descomprimidos em streaming pelo urllib3, pedaço a pedaço).
+- Cache de DNS só para os hosts de feeds registrados (TTL curto); qualquer
+  outro nome continua indo direto ao resolvedor.
+- Latência por host (tempo até os headers e total), por processo.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FEED_CONNECT_TIMEOUT = float(os.getenv("RSS_CONNECT_TIMEOUT", "3.05"))
+FEED_READ_TIMEOUT = float(os.getenv("RSS_READ_TIMEOUT", "5"))
+# prazo total para baixar o corpo (s)
+FEED_BODY_TIMEOUT = float(os.getenv("RSS_BODY_TIMEOUT", "6"))
+FEED_MAX_BYTES = int(os.getenv("RSS_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+FEED_POOL_SIZE = int(os.getenv("RSS_HOST_POOL_SIZE", "4"))
+DNS_CACHE_TTL = float(os.getenv("RSS_DNS_CACHE_TTL", "300"))
+
+CHUNK_SIZE = 16 * 1024
+
+
+class FeedTooLarge(Exception):
+    pass
+
+
+class FeedTooSlow(Exception):
+    pass
+
+
+# ==============================================================
+# 🧭 Cache de DNS (apenas hosts de feeds)
+# ==============================================================
+
+_dns_hosts: set = set()
+_dns_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_dns_lock = threading.Lock()
+_orig_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    if host not in _dns_hosts:
+        return _orig_getaddrinfo(host, port, *args, **kwargs)
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    hit = _dns_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    result = _orig_getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, result)
+    return result
+
+
+def register_hosts(urls: Iterable[str]) -> None:
+    """Liga o cache de DNS para os hosts destas URLs."""
+    hosts = {(urlparse(u).hostname or "").lower() for u in urls}
+    hosts.discard("")
+    with _dns_lock:
+        _dns_hosts.update(hosts)
+        if DNS_CACHE_TTL > 0 and socket.getaddrinfo is not _cached_getaddrinfo:
+            socket.getaddrinfo = _cached_getaddrinfo
+
+
+# ==============================================================
+# 🔌 Sessões por host
+# ==============================================================
+
+_sessions: Dict[Tuple[int, str], requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_for(host: str) -> requests.Session:
+    key = (os.getpid(), host)
+    s = _sessions.get(key)
+    if s is None:
+        with _sessions_lock:
+            s = _sessions.get(key)
+            if s is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FEED_POOL_SIZE, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _sessions[key] = s
+    return s
+
+
+# ==============================================================
+# 📈 Latência por host
+# ==============================================================
+
+_EWMA_ALPHA = 0.2
+_host_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(host: str, ttfb_ms: float, total_ms: float, nbytes: int, error: bool) -> None:
+    with _stats_lock:
+        s = _host_stats.setdefault(host, {
+            "requests": 0, "errors": 0, "bytes": 0,
+            "ttfb_ms_ewma": None, "total_ms_ewma": None, "total_ms_max": 0.0,
+        })
+        s["requests"] += 1
+        s["errors"] += int(error)
+        s["bytes"] += nbytes
+        for name, v in (("ttfb_ms_ewma", ttfb_ms), ("total_ms_ewma", total_ms)):
+            prev = s[name]
+            s[name] = v if prev is None else prev + _EWMA_ALPHA * (v - prev)
+        s["total_ms_max"] = max(s["total_ms_max"], total_ms)
+
+
+def host_stats() -> Dict[str, Dict[str, Any]]:
+    """Latência/volume por host neste processo."""
+    with _stats_lock:
+        return {
+            h: {k: (round(v, 1) if isinstance(v, float) else v) for k, v in s.items()}
+            for h, s in sorted(_host_stats.items())
+        }
+
+
+# ==============================================================
+# 📥 Download
+# ==============================================================
+
+class FeedResponse:
+    """
+    Resposta em streaming. Use como context manager e leia com `iter_chunks()`;
+    os limites de tamanho e de tempo valem durante a leitura.
+    """
+
+    def __init__(self, url: str, resp: requests.Response, started: float, ttfb_ms: float, max_bytes: int, body_timeout: float):
+        self.url = url
+        self.host = (urlparse(url).hostname or "").lower()
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.bytes_read = 0
+        self._resp = resp
+        self._started = started
+        self._ttfb_ms = ttfb_ms
+        self._max_bytes = max_bytes
+        self._deadline = started + body_timeout
+        self._error = False
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        # o limite vale para o que é lido de fato: o parser incremental pode
+        # parar antes, então um Content-Length grande não é recusado de cara
+        try:
+            for chunk in self._resp.iter_content(chunk_size):
+                self.bytes_read += len(chunk)
+                if self.bytes_read > self._max_bytes:
+                    raise FeedTooLarge(f"corpo passou de {self._max_bytes} bytes")
+                if time.monotonic() > self._deadline:
+                    raise FeedTooSlow("corpo não terminou no prazo")
+                yield chunk
+        except (FeedTooLarge, FeedTooSlow, requests.RequestException):
+            self._error = True
+            raise
+
+    def close(self) -> None:
+        self._resp.close()
+        total_ms = (time.monotonic() - self._started) * 1000
+        _record(self.host, self._ttfb_ms, total_ms, self.bytes_read, self._error or self.status_code >= 400)
+
+    def __enter__(self) -> "FeedResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._error = True
+        self.close()
+
+
+def open_feed(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    connect_timeout: float = FEED_CONNECT_TIMEOUT,
+    read_timeout: float = FEED_READ_TIMEOUT,
+    body_timeout: float = FEED_BODY_TIMEOUT,
+    max_bytes: int = FEED_MAX_BYTES,
+) -> FeedResponse:
+    """GET em streaming pela sessão do host; o corpo ainda não foi lido."""
+    host = (urlparse(url).hostname or "").lower()
+    started = time.monotonic()
+    try:
+        resp = _session_for(host).get(
+            url, headers=headers, timeout=(connect_timeout, read_timeout), stream=True
+        )
+    except requests.RequestException:
+        _record(host, 0.0, (time.monotonic() - started) * 1000, 0, True)
+        raise
+    ttfb_ms = (time.monotonic() - started) * 1000
+    return FeedResponse(url, resp, started, ttfb_ms, max_bytes, body_timeout)
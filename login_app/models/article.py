@@ -0,0 +1,85 @@
+# login_app/models/article.py
+import zlib
+
+from .. import db
+
+
+def _z(text):
+    return zlib.compress(text.encode("utf-8"), 6) if text else None
+
+
+def _unz(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob else None
+
+
+class Article(db.Model):
+    """
+    Notícia coletada de RSS ou NewsAPI.
+    - `url_key`: sha1 da URL canônica → deduplicação entre fontes; única por
+      posição (category, sub, region): a mesma notícia em dois feeds/presets
+      vira uma linha em cada timeline
+    - descrição/conteúdo ficam comprimidos (zlib) para reduzir o arquivo
+    - `cluster_id`: id do primeiro artigo da mesma história (quase-duplicatas,
+      ver story_clusters); `signature` é a assinatura MinHash usada para isso
+    """
+    __tablename__ = "articles"
+    __bind_key__  = "articles"
+
+    id            = db.Column(db.Integer, primary_key=True)
+    url_key       = db.Column(db.String(40),  nullable=False)
+    url           = db.Column(db.Text,        nullable=False)
+    title         = db.Column(db.String(500), nullable=False)
+    description_z = db.Column(db.LargeBinary, nullable=True)
+    content_z     = db.Column(db.LargeBinary, nullable=True)
+    image_url     = db.Column(db.Text,        nullable=True)
+    source        = db.Column(db.String(200), nullable=False, default="")
+    origin        = db.Column(db.String(20),  nullable=False, default="rss")  # rss | newsapi
+    category      = db.Column(db.String(50),  nullable=False, default="")
+    sub           = db.Column(db.String(50),  nullable=False, default="")
+    region        = db.Column(db.String(50),  nullable=True)
+    published_at  = db.Column(db.DateTime,    nullable=False)
+    fetched_at    = db.Column(db.DateTime,    nullable=False, server_default=db.func.now())
+    signature     = db.Column(db.LargeBinary, nullable=True)
+    cluster_id    = db.Column(db.Integer,     nullable=True)
+
+    __table_args__ = (
+        # uma linha por URL e posição; região nula conta como "" (NULLs não colidem)
+        db.Index("ux_articles_placement", "url_key", "category", "sub",
+                 db.func.coalesce(region, ""), unique=True),
+        # timeline por categoria/sub (keyset: published_at DESC, id DESC)
+        db.Index("ix_articles_cat_sub_pub", "category", "sub", "published_at", "id"),
+        db.Index("ix_articles_source", "source"),
+        db.Index("ix_articles_cluster", "cluster_id", "id"),
+    )
+
+    @property
+    def description(self):
+        return _unz(self.description_z)
+
+    @description.setter
+    def description(self, value):
+        self.description_z = _z(value)
+
+    @property
+    def content(self):
+        return _unz(self.content_z)
+
+    @content.setter
+    def content(self, value):
+        self.content_z = _z(value)
+
+    def to_item(self):
+        """Mesmo formato dos itens do rss_client (title/description/url/...)."""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "url": self.url,
+            "urlToImage": self.image_url,
+            "publishedAt": self.published_at.isoformat() + "+00:00" if self.published_at else None,
+            "source": self.source,
+            "category": self.category,
+            "sub": self.sub,
+        }
+
+    def __repr__(self):
+        return f"<Article id={self.id} title={self.title!r}>"
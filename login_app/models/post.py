@@ -1,5 +1,4 @@
 # login_app/models/post.py
-from flask import url_for
 from .. import db
 
 class Post(db.Model):
@@ -13,30 +12,20 @@ class Post(db.Model):
     criado_em      = db.Column(db.DateTime,    nullable=False, server_default=db.func.now())
     atualizado_em  = db.Column(db.DateTime,    nullable=True,  onupdate=db.func.now())
     image_filename = db.Column(db.String(255), nullable=True)
+    # id do User (outro banco, sem FK); nulo para autores sem conta ("Anônimo")
+    author_id      = db.Column(db.Integer,     nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_posts_author_id", author_id, id.desc()),
+    )
 
     def to_dict(self, external: bool = True):
         """
         external=True -> gera URL absoluta (https://.../uploads/arquivo.png)
         external=False -> gera URL relativa (/uploads/arquivo.png)
         """
-        if self.image_filename:
-            img = url_for(
-                "uploads", filename=self.image_filename,
-                _external=external, _scheme="https" if external else None
-            )
-        else:
-            # compatibilidade: se por acaso existir um campo legado
-            img = getattr(self, "image_url", None) or getattr(self, "image", None)
-
-        return {
-            "id": self.id,
-            "titulo": self.titulo,
-            "conteudo": self.conteudo,
-            "autor": self.autor,
-            "image_url": img,
-            "criado_em": self.criado_em,
-            "atualizado_em": self.atualizado_em,
-        }
+        from ..serialization import post_dict, uploads_prefix
+        return post_dict(self, uploads_prefix(external))
 
     def __repr__(self):
         return f"<Post id={self.id} titulo={self.titulo!r}>"
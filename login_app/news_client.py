@@ -2,7 +2,13 @@
 # 📰 NewsTechApp — Cliente seguro da NewsAPI (PT/EN + Strict + Presets)
 # ==========================================================
 import os
-from typing import Tuple, List, Dict, Any
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from collections.abc import Mapping
+from functools import wraps
+from typing import Tuple, List, Dict, Any, Callable, Iterator, Optional, Set
 from datetime import datetime, timedelta, timezone
 
 import requests
@@ -10,32 +16,194 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+from .utils.cache import TTLCache
+from .utils.matcher import compile_keywords, fold
+from .utils.minhash import collapse as collapse_near_duplicates
+from .utils.rate_budget import BACKGROUND, INTERACTIVE, budget
+from .utils.shared_cache import make_key, shared_cache
+from .utils.urls import canonical_url
 
 load_dotenv()
 
 NEWSAPI_KEY: str | None = os.getenv("NEWSAPI_KEY")
 BASE: str = "https://newsapi.org/v2"
 
-# -------------------- Sessão global (com retries) --------------------
+log = logging.getLogger(__name__)
+
+# -------------------- Sessões HTTP (uma por worker, keep-alive) --------------------
+# Tamanho do pool de conexões por sessão (idiomas em paralelo + threads do gthread)
+NEWSAPI_POOL_SIZE = int(os.getenv("NEWSAPI_POOL_SIZE", "8"))
+
 def _build_session() -> requests.Session:
+    # sem retry no urllib3: cada tentativa gasta cota, então quem repete é o
+    # _guarded (que cobra cada uma e não insiste depois de um 429)
     s = requests.Session()
-    retry = Retry(
-        total=4,
-        backoff_factor=0.8,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=frozenset({"GET"}),
-        raise_on_status=False,
+    adapter = HTTPAdapter(
+        max_retries=Retry(total=0, raise_on_status=False),
+        pool_connections=2,
+        pool_maxsize=NEWSAPI_POOL_SIZE,
     )
-    adapter = HTTPAdapter(max_retries=retry)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
-_session: requests.Session = _build_session()
+_sessions: Dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """
+    Sessão longa (keep-alive) por processo.
+    Reaproveita TCP+TLS entre chamadas; recriada após fork do gunicorn.
+    """
+    key = os.getpid()
+    s = _sessions.get(key)
+    if s is None:
+        with _sessions_lock:
+            s = _sessions.get(key)
+            if s is None:
+                s = _build_session()
+                _sessions[key] = s
+    return s
+
+# -------------------- Fan-out concorrente (um pedido por idioma) --------------------
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _sessions_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=NEWSAPI_POOL_SIZE, thread_name_prefix="newsapi")
+                _executor_pid = os.getpid()
+    return _executor
 
-# Sessão “rápida” (sem retries) para buscas — evita “carregando eterno”
-def _build_quick_session() -> requests.Session:
-    return requests.Session()
+def _fan_out(calls: Dict[str, Callable[[float], requests.Response]], deadline: float):
+    """
+    Dispara todas as chamadas em paralelo e gera (rótulo, resposta, erro) na
+    ordem em que chegam, respeitando um prazo único para o conjunto.
+    Cada chamada recebe o prazo para usar como timeout de leitura (todas
+    começam juntas, então ninguém passa do limite do conjunto).
+    """
+    stop_at = time.monotonic() + deadline
+    ex = _get_executor()
+    futures = {ex.submit(fn, deadline): label for label, fn in calls.items()}
+    try:
+        for fut in as_completed(futures, timeout=max(0.0, stop_at - time.monotonic())):
+            label = futures[fut]
+            try:
+                yield label, fut.result(), None
+            except Exception as e:
+                yield label, None, e
+    except FuturesTimeout:
+        for fut, label in futures.items():
+            if not fut.done():
+                fut.cancel()
+                yield label, None, TimeoutError(f"sem resposta em {deadline:.1f}s")
+
+# -------------------- Cota da NewsAPI (compartilhada entre workers) --------------------
+QUOTA_NOTE = "Cota da NewsAPI esgotada"
+
+class QuotaExceeded(Exception):
+    pass
+
+class RateLimited(Exception):
+    """Token bucket sem folga agora (a cota do dia ainda existe)."""
+
+RETRY_STATUS = (500, 502, 503, 504)
+# abaixo disto de prazo restante não vale começar outra tentativa
+MIN_ATTEMPT_TIMEOUT = 1.0
+
+def _guarded(endpoint: str, priority: str, call: Callable[[float], requests.Response],
+             retries: int = 0, backoff: float = 0.3):
+    """
+    Envolve uma chamada: cada tentativa só sai se houver cota (e é cobrada);
+    5xx/erro de conexão repetem até `retries` vezes dentro do prazo; um 429
+    bloqueia o orçamento e volta na hora, sem nova tentativa.
+
+    Recusa do orçamento: cota do dia acabou → `QuotaExceeded` (quem chama
+    responde com o histórico); só o token bucket sem folga → espera o refill
+    dentro do prazo e, se não der, `RateLimited` (erro comum, sem fallback).
+    """
+    def _run(remaining: float) -> requests.Response:
+        stop_at = time.monotonic() + remaining
+        attempt = 0
+        while True:
+            if not budget.try_acquire(endpoint, priority):
+                if budget.exhausted(priority):
+                    raise QuotaExceeded(QUOTA_NOTE)
+                wait = budget.refill_wait(priority)
+                if stop_at - time.monotonic() - wait < MIN_ATTEMPT_TIMEOUT:
+                    raise RateLimited("muitas chamadas à NewsAPI agora; tente de novo em instantes")
+                time.sleep(wait)
+                continue
+            try:
+                r = call(max(MIN_ATTEMPT_TIMEOUT, stop_at - time.monotonic()))
+            except requests.ConnectionError:
+                r = None
+                if attempt >= retries:
+                    raise
+            if r is not None:
+                if r.status_code == 429:
+                    budget.record_429(r.headers.get("Retry-After"))
+                    raise QuotaExceeded(QUOTA_NOTE)  # mesmo fallback da cota esgotada
+                if r.status_code not in RETRY_STATUS or attempt >= retries:
+                    return r
+            pause = backoff * (2 ** attempt)
+            if stop_at - time.monotonic() - pause < MIN_ATTEMPT_TIMEOUT:
+                if r is None:
+                    raise requests.ConnectionError("sem conexão com a NewsAPI")
+                return r
+            time.sleep(pause)
+            attempt += 1
+    return _run
+
+def _is_quota_fallback(value) -> bool:
+    return (value[1] or "").startswith(QUOTA_NOTE)
+
+def _stored_fallback(keywords, mode: str, scope: str, page_size: int) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Sem cota: responde com o que já temos guardado (histórico de artigos
+    RSS/NewsAPI), filtrado pelas mesmas palavras-chave.
+    """
+    arts: List[Dict[str, Any]] = []
+    try:
+        from flask import has_app_context
+        if has_app_context():
+            from .article_store import recent_articles
+            for it in recent_articles():
+                if _match_keywords_local(it, keywords, mode=mode, scope=scope):
+                    src = it.get("source")
+                    arts.append(dict(it, source={"id": "", "name": src if isinstance(src, str) else ""}))
+                    if len(arts) >= page_size:
+                        break
+    except Exception:
+        arts = []
+    return arts, f"{QUOTA_NOTE}; exibindo resultados salvos."
+
+# -------------------- Cache compartilhado entre workers --------------------
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "600"))      # 10 min
+NEWS_CACHE_STALE = float(os.getenv("NEWS_CACHE_STALE", "1800"))  # serve velho por +30 min
+
+def _shared_cached(name: str):
+    """
+    Guarda (articles, error) no cache compartilhado (/data), chaveado pelos argumentos.
+    Respostas vazias/erros não são guardados.
+    """
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key("newsapi", name, list(args), sorted(kwargs.items()))
+            (arts, err), _status = shared_cache.get_or_load(
+                key,
+                lambda: fn(*args, **kwargs),
+                ttl=NEWS_CACHE_TTL,
+                stale_ttl=NEWS_CACHE_STALE,
+                cacheable=lambda v: bool(v[0]) and not _is_quota_fallback(v),
+            )
+            return arts, err
+        return wrapper
+    return deco
 
 # -------------------- Helpers --------------------
 def _safe_str(v: Any) -> str:
@@ -47,55 +215,130 @@ def _valid_url(v: Any) -> str:
     s = _safe_str(v).strip()
     return s if s.startswith("http") else ""
 
-def _normalize_articles(items: Any) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
+class NewsItem(Mapping):
+    """
+    Artigo normalizado, compacto (slots em vez de dict por artigo + dict da fonte).
+    Lê-se como o dict de antes (`a["title"]`, `a.get("source")`) e vira o
+    mesmo JSON com `to_dict()`.
+    """
+    __slots__ = ("source_id", "source_name", "author", "title", "description", "url",
+                 "urlToImage", "publishedAt", "content", "alsoCoveredBy")
+    _KEYS = ("source", "author", "title", "description", "url", "urlToImage", "publishedAt", "content")
+
+    def __init__(self, source_id: str, source_name: str, author: str, title: str, description: str,
+                 url: str, url_to_image: str, published_at: str, content: str,
+                 also_covered_by: Optional[List[Dict[str, Any]]] = None):
+        self.source_id = source_id
+        self.source_name = source_name
+        self.author = author
+        self.title = title
+        self.description = description
+        self.url = url
+        self.urlToImage = url_to_image
+        self.publishedAt = published_at
+        self.content = content
+        self.alsoCoveredBy = also_covered_by
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "source":
+            return {"id": self.source_id, "name": self.source_name}
+        if key in self._KEYS or (key == "alsoCoveredBy" and self.alsoCoveredBy is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._KEYS
+        if self.alsoCoveredBy is not None:
+            yield "alsoCoveredBy"
+
+    def __len__(self) -> int:
+        return len(self._KEYS) + (self.alsoCoveredBy is not None)
+
+    def __repr__(self) -> str:
+        return f"NewsItem({self.title!r}, {self.url!r})"
+
+    def with_coverage(self, covered: List[Dict[str, Any]]) -> "NewsItem":
+        return NewsItem(self.source_id, self.source_name, self.author, self.title, self.description,
+                        self.url, self.urlToImage, self.publishedAt, self.content, covered)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in self}
+
+
+def _dedup_key(url: str, title: str) -> str:
+    return canonical_url(url) if url else fold(title)
+
+def _normalize_dedup(items: Any, seen: Set[str]) -> Iterator[NewsItem]:
+    """
+    Uma passada: valida/normaliza cada artigo da NewsAPI e descarta os já
+    vistos (URL canônica — sem utm_*, AMP, www. — ou o título, sem URL).
+    `seen` é compartilhado entre chamadas para deduplicar entre idiomas.
+    """
     if not isinstance(items, list):
-        return out
+        return
     for it in items:
         if not isinstance(it, dict):
             continue
+        url = _valid_url(it.get("url"))
+        title = _safe_str(it.get("title")) or "(Sem título)"
+        key = _dedup_key(url, title)
+        if key in seen:
+            continue
+        seen.add(key)
         src = it.get("source") or {}
-        out.append({
-            "source": {"id": _safe_str(src.get("id")), "name": _safe_str(src.get("name"))},
-            "author": _safe_str(it.get("author")),
-            "title": _safe_str(it.get("title")) or "(Sem título)",
-            "description": _safe_str(it.get("description")),
-            "url": _valid_url(it.get("url")),
-            "urlToImage": _valid_url(it.get("urlToImage")),
-            "publishedAt": _safe_str(it.get("publishedAt")),
-            "content": _safe_str(it.get("content")),
-        })
-    return out
+        if not isinstance(src, dict):
+            src = {}
+        yield NewsItem(
+            _safe_str(src.get("id")),
+            _safe_str(src.get("name")),
+            _safe_str(it.get("author")),
+            title,
+            _safe_str(it.get("description")),
+            url,
+            _valid_url(it.get("urlToImage")),
+            _safe_str(it.get("publishedAt")),
+            _safe_str(it.get("content")),
+        )
 
-def _dedup_articles(arts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    seen = set()
-    out: List[Dict[str, Any]] = []
+def _dedup_articles(arts: List[Mapping]) -> List[Mapping]:
+    """
+    Junta listas já normalizadas (vários planos/idiomas): mesma URL canônica
+    ou título sai; quase-duplicatas viram um item com `alsoCoveredBy`.
+    """
+    seen: Set[str] = set()
+    out: List[Mapping] = []
     for a in arts:
-        key = (a.get("url") or "").lower() or (a.get("title") or "").lower()
+        key = _dedup_key(a.get("url") or "", a.get("title") or "")
         if key and key not in seen:
             seen.add(key)
             out.append(a)
-    return out
+    return collapse_near_duplicates(out)
+
+def _as_dicts(arts: List[Mapping]) -> List[Dict[str, Any]]:
+    """Forma JSON (a de sempre) para quem está fora deste módulo."""
+    return [a.to_dict() if isinstance(a, NewsItem) else a for a in arts]
+
+# janela "from" arredondada: buscas iguais no mesmo intervalo geram a mesma consulta
+SEARCH_WINDOW_BUCKET = int(os.getenv("NEWS_SEARCH_WINDOW_BUCKET", "900"))  # 15 min
+
+def _window_bucket() -> int:
+    return int(time.time()) // max(1, SEARCH_WINDOW_BUCKET)
 
 def _iso_from(hours_back: int = 168) -> str:
     # clamp para evitar ranges muito grandes/pequenos
     hours_back = max(1, min(int(hours_back), 24 * 30))
-    dt = datetime.now(timezone.utc) - timedelta(hours=hours_back)
+    now = datetime.fromtimestamp(_window_bucket() * max(1, SEARCH_WINDOW_BUCKET), timezone.utc)
+    dt = now - timedelta(hours=hours_back)
     return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 # -------------------- Strict keywords core --------------------
-def _norm(s: str) -> str:
-    return (s or "").lower()
+def _haystack(a: dict, scope: str = "title") -> str:
+    title = a.get("title") or ""
+    return title if scope == "title" else f"{title} {a.get('description') or ''}"
 
 def _match_keywords_local(a: dict, keywords: list[str], mode: str = "AND", scope: str = "title"):
-    title = _norm(a.get("title"))
-    desc  = _norm(a.get("description"))
-    hay   = title if scope == "title" else f"{title} {desc}"
-    kws   = [k.strip().lower() for k in keywords if k.strip()]
-    if not kws:
-        return True
-    hits = [(k in hay) for k in kws]
-    return all(hits) if mode.upper() == "AND" else any(hits)
+    # autômato compilado uma vez por conjunto de palavras; ignora caixa e acentos
+    return compile_keywords(keywords).matches(_haystack(a, scope), mode)
 
 def _build_query(keywords: list[str], mode: str = "AND", exact: bool = True):
     toks = []
@@ -113,6 +356,48 @@ def _build_query(keywords: list[str], mode: str = "AND", exact: bool = True):
     joiner = f" {mode.upper()} "
     return joiner.join(toks)
 
+# -------------------- Cache de buscas (por consulta normalizada) --------------------
+# TTL por ordenação: "publishedAt" muda rápido; relevância/popularidade, devagar
+SEARCH_CACHE_TTLS: Dict[str, float] = {
+    "publishedAt": float(os.getenv("NEWS_SEARCH_TTL_PUBLISHED", "300")),
+    "relevancy": float(os.getenv("NEWS_SEARCH_TTL_RELEVANCY", "1800")),
+    "popularity": float(os.getenv("NEWS_SEARCH_TTL_POPULARITY", "1800")),
+}
+# cache negativo: resultado vazio ou erro fica pouco tempo (evita martelar a API)
+SEARCH_NEGATIVE_TTL = float(os.getenv("NEWS_SEARCH_NEGATIVE_TTL", "60"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("NEWS_SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+def _result_size(value) -> int:
+    """Tamanho aproximado (bytes) de um (articles, error) — soma dos textos."""
+    arts, err = value
+    total = 64 + len(err or "")
+    for a in arts:
+        total += 120 if isinstance(a, NewsItem) else 200  # overhead do registro/dict
+        for v in a.values():
+            total += len(v) if isinstance(v, str) else 48
+    return total
+
+_search_cache = TTLCache(
+    maxsize=4096,
+    ttl=SEARCH_CACHE_TTLS["publishedAt"],
+    stale_ttl=0,
+    max_bytes=SEARCH_CACHE_MAX_BYTES,
+    sizeof=_result_size,
+)
+
+def _search_key(keywords, languages, mode, exact, scope, sort_by, page, page_size, hours_back) -> tuple:
+    """Forma canônica da busca: mesma pergunta → mesma chave, em qualquer ordem/caixa."""
+    kws = tuple(sorted({k.strip().lower() for k in keywords if k and k.strip()}))
+    langs = tuple(sorted(set(languages or ["pt"])))
+    return (
+        kws, langs, (mode or "AND").upper(), bool(exact), scope, sort_by,
+        max(int(page), 1), min(max(int(page_size), 1), 100),
+        int(hours_back), _window_bucket(),
+    )
+
+def search_cache_stats() -> Dict[str, int]:
+    return _search_cache.stats()
+
 # -------------------- Busca por palavras (rápida) --------------------
 def fetch_by_keywords_strict(
     keywords: list[str],
@@ -124,8 +409,43 @@ def fetch_by_keywords_strict(
     exact: bool = True,
     scope: str = "title",
     sort_by: str = "publishedAt",
-    request_timeout: float = 7.0,      # timeout curto por idioma
+    request_timeout: float = 8.0,      # prazo único para todos os idiomas
+    max_retries_per_lang: int = 0,     # 0 = sem retries (responsivo)
+    priority: str = INTERACTIVE,       # BACKGROUND para presets/ingestão
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Busca na NewsAPI com cache por consulta normalizada.
+    Repetições da mesma busca (ex.: "RTX", "PS5") voltam sem ida à rede.
+    Sem cota para a prioridade, responde com resultados salvos (não entra no cache).
+    """
+    if languages is not None:
+        languages = [l for l in languages if l in ("pt", "en")] or ["pt"]
+    key = _search_key(keywords, languages, mode, exact, scope, sort_by, page, page_size, hours_back)
+    ttl_ok = SEARCH_CACHE_TTLS.get(sort_by, SEARCH_CACHE_TTLS["publishedAt"])
+    (arts, err), _status = _search_cache.get_or_load(
+        key,
+        lambda: _fetch_by_keywords_uncached(
+            keywords, languages, hours_back, page_size, page, mode, exact, scope,
+            sort_by, request_timeout, max_retries_per_lang, priority,
+        ),
+        ttl=lambda v: ttl_ok if v[0] else SEARCH_NEGATIVE_TTL,
+        cacheable=lambda v: not _is_quota_fallback(v),
+    )
+    return _as_dicts(arts), err
+
+def _fetch_by_keywords_uncached(
+    keywords: list[str],
+    languages: list[str] | None = None,
+    hours_back: int = 168,
+    page_size: int = 20,
+    page: int = 1,
+    mode: str = "AND",
+    exact: bool = True,
+    scope: str = "title",
+    sort_by: str = "publishedAt",
+    request_timeout: float = 8.0,      # prazo único para todos os idiomas
     max_retries_per_lang: int = 0,     # 0 = sem retries (responsivo)
+    priority: str = INTERACTIVE,
 ) -> Tuple[List[Dict[str, Any]], str]:
     if not NEWSAPI_KEY:
         return [], "NEWSAPI_KEY não definida no .env"
@@ -141,27 +461,20 @@ def fetch_by_keywords_strict(
 
     headers = {"X-Api-Key": NEWSAPI_KEY, "User-Agent": "NewsTechApp/1.0 (+keywords-strict)"}
     fr = _iso_from(hours_back)
-    all_arts: List[Dict[str, Any]] = []
+    all_arts: List[NewsItem] = []
+    seen: Set[str] = set()
     errors: List[str] = []
     q = _build_query(keywords, mode=mode, exact=exact)
     if not q:
         return [], "Informe ao menos uma palavra-chave."
+    if budget.exhausted(priority):
+        return _stored_fallback(keywords, mode, scope, page_size)
 
-    # sessão rápida (sem retries) por padrão
-    quick = _build_quick_session()
-    if max_retries_per_lang > 0:
-        r = Retry(
-            total=max_retries_per_lang,
-            backoff_factor=0.3,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=frozenset({"GET"}),
-            raise_on_status=False,
-        )
-        adp = HTTPAdapter(max_retries=r)
-        quick.mount("https://", adp)
-        quick.mount("http://", adp)
+    # sessão do worker; retries (padrão: nenhum, responsivo) ficam no _guarded
+    session = _get_session()
+    retries = max(0, int(max_retries_per_lang))
 
-    for lang in languages:
+    def _call(lang: str):
         params = {
             "language": lang,
             "from": fr,
@@ -170,26 +483,37 @@ def fetch_by_keywords_strict(
             "page": max(int(page), 1),
         }
         params["qInTitle" if scope == "title" else "q"] = q
-
-        try:
-            r = quick.get(f"{BASE}/everything", headers=headers, params=params, timeout=request_timeout)
-            if r.status_code == 200:
+        return _guarded("everything", priority, lambda remaining: session.get(
+            f"{BASE}/everything", headers=headers, params=params, timeout=(3.05, remaining)
+        ), retries=retries)
+
+    # todos os idiomas em paralelo, sob um único prazo; junta conforme chegam
+    for lang, r, err in _fan_out({lang: _call(lang) for lang in languages}, request_timeout):
+        if err is not None:
+            errors.append(f"{lang} erro: {err}")
+        elif r.status_code == 200:
+            try:
                 raw = (r.json() or {}).get("articles") or []
-                chunk = _normalize_articles(raw)
-                # filtro local para garantir aderência às palavras
-                chunk = [a for a in chunk if _match_keywords_local(a, keywords, mode=mode, scope=scope)]
-                all_arts.extend(chunk)
-            else:
-                try:
-                    msg = r.json().get("message", "")
-                except Exception:
-                    msg = r.text[:200]
-                errors.append(f"{lang} {r.status_code}: {msg}")
-        except requests.RequestException as e:
-            errors.append(f"{lang} erro: {e}")
-
-    all_arts = _dedup_articles(all_arts)
+            except ValueError as e:
+                errors.append(f"{lang} resposta inválida: {e}")
+                continue
+            # normaliza + deduplica (entre idiomas) na mesma passada; filtro
+            # local para garantir aderência às palavras
+            all_arts.extend(
+                a for a in _normalize_dedup(raw, seen)
+                if _match_keywords_local(a, keywords, mode=mode, scope=scope)
+            )
+        else:
+            try:
+                msg = r.json().get("message", "")
+            except Exception:
+                msg = r.text[:200]
+            errors.append(f"{lang} {r.status_code}: {msg}")
+
+    all_arts = collapse_near_duplicates(all_arts)
     if not all_arts:
+        if errors and all(QUOTA_NOTE in e for e in errors):
+            return _stored_fallback(keywords, mode, scope, page_size)
         if errors:
             return [], "Nenhuma notícia encontrada. " + "; ".join(errors)
         return [], "Nenhuma notícia encontrada."
@@ -275,6 +599,7 @@ def get_subkeys_for(category: str) -> List[str]:
     cfg = PRESETS.get(category, {})
     return list(cfg.keys())
 
+@_shared_cached("preset")
 def fetch_by_preset(category: str, subkey: str, page_size: int = 24) -> Tuple[List[Dict[str, Any]], str]:
     cat = PRESETS.get(category)
     if not cat or subkey not in cat:
@@ -290,14 +615,17 @@ def fetch_by_preset(category: str, subkey: str, page_size: int = 24) -> Tuple[Li
         exact=p["exact"],
         scope=p["scope"],
         sort_by="publishedAt",
+        priority=BACKGROUND,
     )
 
 # -------------------- Top-headlines utilitário (opcional) --------------------
+@_shared_cached("top")
 def fetch_news(
     category: str = "technology",
     country: str = "br",
     page_size: int = 12,
     include_english: bool = True,
+    priority: str = INTERACTIVE,
 ):
     """
     Busca notícias top-headlines em PT e EN.
@@ -305,132 +633,274 @@ def fetch_news(
     """
     if not NEWSAPI_KEY:
         return [], "NEWSAPI_KEY não definida no .env"
+    if budget.exhausted(priority):
+        return [], f"{QUOTA_NOTE}."
 
     headers = {"X-Api-Key": NEWSAPI_KEY, "User-Agent": "NewsTechApp/1.0 (+top)"}
-    all_articles: List[Dict[str, Any]] = []
+    all_articles: List[NewsItem] = []
+    seen: Set[str] = set()
     errors: List[str] = []
+    session = _get_session()
 
-    # 🇧🇷 Notícias do Brasil
-    try:
-        r1 = _session.get(
-            f"{BASE}/top-headlines",
-            headers=headers,
-            params={"country": country, "category": category, "pageSize": page_size},
-            timeout=10,
-        )
-        if r1.status_code == 200:
-            data = r1.json()
-            articles = data.get("articles", []) or []
-            all_articles.extend(_normalize_articles(articles))
-        else:
-            errors.append(f"PT {r1.status_code}: {r1.text[:100]}")
-    except Exception as e:
-        errors.append(f"Erro PT: {e}")
+    def _call(c: str):
+        params = {"country": c, "category": category, "pageSize": page_size}
+        return _guarded("top-headlines", priority, lambda remaining: session.get(
+            f"{BASE}/top-headlines", headers=headers, params=params, timeout=(3.05, remaining)
+        ), retries=3, backoff=0.8)
 
-    # 🇺🇸 Notícias internacionais
+    # 🇧🇷 Brasil e 🇺🇸 internacional em paralelo
+    calls = {"PT": _call(country)}
     if include_english:
-        try:
-            r2 = _session.get(
-                f"{BASE}/top-headlines",
-                headers=headers,
-                params={"country": "us", "category": category, "pageSize": page_size},
-                timeout=10,
-            )
-            if r2.status_code == 200:
-                data = r2.json()
-                articles = data.get("articles", []) or []
-                all_articles.extend(_normalize_articles(articles))
-            else:
-                errors.append(f"EN {r2.status_code}: {r2.text[:100]}")
-        except Exception as e:
-            errors.append(f"Erro EN: {e}")
+        calls["EN"] = _call("us")
+
+    for label, r, err in _fan_out(calls, deadline=10):
+        if err is not None:
+            errors.append(f"Erro {label}: {err}")
+        elif r.status_code == 200:
+            try:
+                articles = r.json().get("articles", []) or []
+            except ValueError as e:
+                errors.append(f"{label} resposta inválida: {e}")
+                continue
+            all_articles.extend(_normalize_dedup(articles, seen))
+        else:
+            errors.append(f"{label} {r.status_code}: {r.text[:100]}")
 
     if not all_articles:
         return [], ("Nenhuma notícia retornada. " + "; ".join(errors) if errors else "Nenhuma notícia retornada.")
-    return _dedup_articles(all_articles), ""
+    return _as_dicts(collapse_near_duplicates(all_articles)), ""
 
 # -------------------- Categorias prontas (se quiser usar) --------------------
-def fetch_developer_news(page_size: int = 24):
-    keywords = [
-        "Python", "Flask", "Django", "FastAPI",
-        "JavaScript", "TypeScript", "Node.js", "React", "Next.js",
-        "DevOps", "Docker", "Kubernetes", "CI/CD",
-        "GitHub", "VS Code", "Copilot"
-    ]
-    return fetch_by_keywords_strict(
-        keywords=keywords,
-        languages=["pt", "en"],
-        hours_back=168,
-        page_size=page_size,
-        page=1,
-        mode="OR",
-        exact=True,
-        scope="title",
-        sort_by="publishedAt",
-        request_timeout=7.0,
-        max_retries_per_lang=0,
+# mesmas especificações dos PRESETS (o planejador abaixo trata os dois iguais)
+CATEGORY_HELPERS: Dict[str, Dict[str, Any]] = {
+    "developer": {
+        "keywords": [
+            "Python", "Flask", "Django", "FastAPI",
+            "JavaScript", "TypeScript", "Node.js", "React", "Next.js",
+            "DevOps", "Docker", "Kubernetes", "CI/CD",
+            "GitHub", "VS Code", "Copilot"
+        ],
+        "mode": "OR", "scope": "title", "exact": True, "languages": ["pt", "en"]
+    },
+    "hardware": {
+        "keywords": [
+            "GPU", "RTX", "GeForce", "Radeon", "DLSS", "FSR",
+            "NVIDIA", "AMD", "Intel", "Ryzen",
+            "CPU", "processador", "placa de vídeo",
+            "SSD", "NVMe", "PCIe 5.0", "Gen5", "notebook", "desktop"
+        ],
+        "mode": "OR", "scope": "title+desc", "exact": True, "languages": ["pt", "en"]
+    },
+    "games": {
+        "keywords": [
+            "video games", "gaming", "jogos",
+            "trailer", "gameplay", "lançamento", "pre-order", "reveal",
+            "review", "análise",
+            "PlayStation", "PS5", "Xbox Series", "Nintendo Switch", "Steam", "PC gamer"
+        ],
+        "mode": "OR", "scope": "title", "exact": True, "languages": ["pt", "en"]
+    },
+    "technology": {
+        "keywords": [
+            "tecnologia", "technology", "inovação", "startups",
+            "inteligência artificial", "AI", "machine learning", "LLM",
+            "gadgets", "smartphone", "laptop",
+            "segurança digital", "ransomware", "phishing", "vazamento"
+        ],
+        "mode": "OR", "scope": "title+desc", "exact": True, "languages": ["pt", "en"]
+    },
+}
+
+# categoria/sub reais (as mesmas do painel de PRESETS) em que cada helper é gravado
+HELPER_CATEGORIES: Dict[str, Tuple[str, str]] = {
+    "developer": ("desenvolvedores", "geral"),
+    "hardware": ("hardware", "geral"),
+    "games": ("games", "geral"),
+    "technology": ("tecnologia", "geral"),
+}
+
+def fetch_all_helpers(page_size: int = 24) -> Dict[str, Tuple[List[Dict[str, Any]], str]]:
+    """
+    As quatro categorias prontas numa atualização só, pelo planejador
+    (`fetch_planned`): poucas consultas /everything em vez de uma por helper
+    e idioma. O resultado fica no cache compartilhado; os `fetch_*_news`
+    abaixo só leem a sua parte. Retorna {helper: (articles, error)}.
+    """
+    def _load():
+        results = fetch_planned(CATEGORY_HELPERS, page_size=page_size)
+        return {name: list(v) for name, v in results.items()}
+
+    key = make_key("newsapi", "helpers", [page_size])
+    results, _status = shared_cache.get_or_load(
+        key,
+        _load,
+        ttl=NEWS_CACHE_TTL,
+        stale_ttl=NEWS_CACHE_STALE,
+        cacheable=lambda v: any(arts for arts, _err in v.values())
+        and not any(_is_quota_fallback(r) for r in v.values()),
     )
+    return {name: (arts, err) for name, (arts, err) in results.items()}
+
+def _fetch_helper(name: str, page_size: int):
+    return fetch_all_helpers(page_size).get(name, ([], "Nenhuma notícia encontrada."))
+
+def fetch_developer_news(page_size: int = 24):
+    return _fetch_helper("developer", page_size)
 
 def fetch_hardware_news(page_size: int = 24):
-    keywords = [
-        "GPU", "RTX", "GeForce", "Radeon", "DLSS", "FSR",
-        "NVIDIA", "AMD", "Intel", "Ryzen",
-        "CPU", "processador", "placa de vídeo",
-        "SSD", "NVMe", "PCIe 5.0", "Gen5", "notebook", "desktop"
-    ]
-    return fetch_by_keywords_strict(
-        keywords=keywords,
-        languages=["pt", "en"],
-        hours_back=168,
-        page_size=page_size,
-        page=1,
-        mode="OR",
-        exact=True,
-        scope="title+desc",
-        sort_by="publishedAt",
-        request_timeout=7.0,
-        max_retries_per_lang=0,
-    )
+    return _fetch_helper("hardware", page_size)
 
 def fetch_games_news(page_size: int = 24):
-    keywords = [
-        "video games", "gaming", "jogos",
-        "trailer", "gameplay", "lançamento", "pre-order", "reveal",
-        "review", "análise",
-        "PlayStation", "PS5", "Xbox Series", "Nintendo Switch", "Steam", "PC gamer"
-    ]
-    return fetch_by_keywords_strict(
-        keywords=keywords,
-        languages=["pt", "en"],
-        hours_back=168,
-        page_size=page_size,
-        page=1,
-        mode="OR",
-        exact=True,
-        scope="title",
-        sort_by="publishedAt",
-        request_timeout=7.0,
-        max_retries_per_lang=0,
-    )
+    return _fetch_helper("games", page_size)
 
 def fetch_technology_news(page_size: int = 24):
-    keywords = [
-        "tecnologia", "technology", "inovação", "startups",
-        "inteligência artificial", "AI", "machine learning", "LLM",
-        "gadgets", "smartphone", "laptop",
-        "segurança digital", "ransomware", "phishing", "vazamento"
-    ]
-    return fetch_by_keywords_strict(
-        keywords=keywords,
-        languages=["pt", "en"],
-        hours_back=168,
-        page_size=page_size,
-        page=1,
-        mode="OR",
-        exact=True,
-        scope="title+desc",
-        sort_by="publishedAt",
-        request_timeout=7.0,
-        max_retries_per_lang=0,
-    )
+    return _fetch_helper("technology", page_size)
+
+# -------------------- Planejador de consultas (vários presets → poucas chamadas) --------------------
+# limite do parâmetro q da NewsAPI (/everything)
+NEWSAPI_QUERY_MAX = int(os.getenv("NEWSAPI_QUERY_MAX", "500"))
+NEWSAPI_MAX_PAGE_SIZE = 100
 
+def plan_queries(specs: Dict[Any, Dict[str, Any]], max_len: int = NEWSAPI_QUERY_MAX) -> List[Dict[str, Any]]:
+    """
+    Junta as palavras-chave de vários presets em poucas consultas OR.
+
+    Presets só se misturam quando pedem os mesmos idiomas, escopo e "exato"
+    (senão a consulta mudaria de sentido). Palavras repetidas entre presets
+    (AMD, Copilot, LLM...) entram uma vez só. Cada consulta cabe em `max_len`.
+    Presets em modo AND não podem virar OR: seguem como consulta própria.
+
+    Retorna [{"keywords", "languages", "scope", "exact", "members"}].
+    """
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    plans: List[Dict[str, Any]] = []
+    for label, p in specs.items():
+        langs = sorted(set(p.get("languages") or ["pt"]))
+        scope = "title" if p.get("scope") == "title" else "title+desc"
+        exact = bool(p.get("exact", True))
+        if (p.get("mode") or "AND").upper() != "OR":
+            plans.append({"keywords": list(p["keywords"]), "mode": "AND", "languages": langs,
+                          "scope": scope, "exact": exact, "members": [label]})
+            continue
+        g = groups.setdefault((tuple(langs), scope, exact), {"keywords": {}, "members": []})
+        g["members"].append(label)
+        for k in p["keywords"]:
+            k = k.strip()
+            if k:
+                g["keywords"].setdefault(k.lower(), k)
+
+    for (langs, scope, exact), g in groups.items():
+        # first-fit: cada palavra entra na primeira consulta onde ainda cabe
+        chunks: List[List[str]] = []
+        for k in sorted(g["keywords"].values(), key=len, reverse=True):
+            for chunk in chunks:
+                if len(_build_query(chunk + [k], mode="OR", exact=exact)) <= max_len:
+                    chunk.append(k)
+                    break
+            else:
+                chunks.append([k])
+        for chunk in chunks:
+            plans.append({"keywords": chunk, "mode": "OR", "languages": list(langs),
+                          "scope": scope, "exact": exact, "members": g["members"]})
+    return plans
+
+def fetch_planned(
+    specs: Dict[Any, Dict[str, Any]],
+    page_size: int = 24,
+    hours_back: int = 168,
+    priority: str = BACKGROUND,
+) -> Dict[Any, Tuple[List[Dict[str, Any]], str]]:
+    """
+    Busca vários presets de uma vez: executa o plano de `plan_queries` e
+    distribui os artigos de volta a cada preset com `_match_keywords_local`
+    (mesmo modo/escopo da busca individual). Retorna {rótulo: (articles, error)}.
+
+    Sem cota, `fetch_by_keywords_strict` devolve artigos guardados (de todas
+    as categorias): esses não entram na distribuição, e o preset sem nada
+    fica com ([], erro de cota) — `_is_quota_fallback` reconhece.
+    """
+    pooled: Dict[Any, List[Dict[str, Any]]] = {label: [] for label in specs}
+    errors: Dict[Any, List[str]] = {label: [] for label in specs}
+    for plan in plan_queries(specs):
+        arts, err = fetch_by_keywords_strict(
+            keywords=plan["keywords"],
+            languages=plan["languages"],
+            hours_back=hours_back,
+            page_size=NEWSAPI_MAX_PAGE_SIZE,
+            page=1,
+            mode=plan["mode"],
+            exact=plan["exact"],
+            scope=plan["scope"],
+            sort_by="publishedAt",
+            priority=priority,
+        )
+        quota = _is_quota_fallback((arts, err))
+        for label in plan["members"]:
+            if quota:
+                errors[label].insert(0, err)  # o aviso de cota vence os demais
+                continue
+            pooled[label].extend(arts)
+            if err and not arts:
+                errors[label].append(err)
+
+    # um autômato com todas as palavras: cada artigo é lido uma vez (título e
+    # descrição separados, por causa do escopo), e cada preset só confere conjuntos
+    # (o cache é pela chave de dedup: `_dedup_articles` devolve cópias novas a cada preset)
+    matcher = compile_keywords(k for p in specs.values() for k in p["keywords"])
+    found: Dict[str, Tuple[frozenset, frozenset]] = {}
+
+    def _found(a: Mapping) -> Tuple[frozenset, frozenset]:
+        key = _dedup_key(a.get("url") or "", a.get("title") or "")
+        hit = found.get(key)
+        if hit is None:
+            in_title = {fold(k) for k in matcher.find(a.get("title") or "")}
+            in_desc = {fold(k) for k in matcher.find(a.get("description") or "")}
+            hit = found[key] = (frozenset(in_title), frozenset(in_title | in_desc))
+        return hit
+
+    out: Dict[Any, Tuple[List[Dict[str, Any]], str]] = {}
+    for label, p in specs.items():
+        kws = [fold(k) for k in compile_keywords(p["keywords"]).keywords]
+        want_all = (p.get("mode") or "AND").upper() == "AND"
+        mine = []
+        for a in _dedup_articles(pooled[label]):
+            in_title, in_any = _found(a)
+            hits = in_title if p.get("scope") == "title" else in_any
+            if (all(k in hits for k in kws) if want_all else any(k in hits for k in kws)):
+                mine.append(a)
+        mine.sort(key=lambda a: a.get("publishedAt") or "", reverse=True)
+        mine = mine[:page_size]
+        if mine:
+            out[label] = (mine, "")
+        else:
+            out[label] = ([], errors[label][0] if errors[label] else "Nenhuma notícia encontrada.")
+    return out
+
+def fetch_all_presets(page_size: int = 24, store: bool = True) -> Dict[Tuple[str, str], Tuple[List[Dict[str, Any]], str]]:
+    """
+    Atualização completa do painel (todos os PRESETS + categorias prontas)
+    usando o planejador. Com `store`, grava os artigos no histórico
+    (origin="newsapi") quando houver app context. Roda periodicamente no
+    líder da ingestão (`rss_ingest`, NEWSAPI_REFRESH_INTERVAL). Resultados
+    de fallback por falta de cota nunca chegam aqui com artigos.
+    """
+    specs: Dict[Tuple[str, str], Dict[str, Any]] = {
+        (cat, sub): p for cat, subs in PRESETS.items() for sub, p in subs.items()
+    }
+    specs.update({HELPER_CATEGORIES[name]: p for name, p in CATEGORY_HELPERS.items()})
+    results = fetch_planned(specs, page_size=page_size)
+
+    if store:
+        try:
+            from flask import has_app_context
+            if has_app_context():
+                from .article_store import upsert_articles
+                for (cat, sub), (arts, _err) in results.items():
+                    if arts:
+                        try:
+                            upsert_articles(arts, cat, sub, origin="newsapi")
+                        except Exception as e:  # um preset que falha não barra os outros
+                            log.warning("falha ao gravar preset %s/%s: %s", cat, sub, e)
+        except Exception as e:
+            log.warning("falha ao gravar presets: %s", e)
+    return results
@@ -0,0 +1,153 @@
+# login_app/parse_pool.py
+"""
+Pool de processos (opcional) para o parse dos feeds.
+
+Parse de XML, `html.unescape` e as regex de limpeza são CPU puro e seguram
+o GIL: com `gthread` vários feeds acabam enfileirados num núcleo só por
+worker. Com RSS_PARSE_PROCESSES > 0, o corpo baixado vai para um processo
+auxiliar e volta só a forma compacta dos itens (`feed_parser.pack_items`).
+
+- Corpos grandes (>= RSS_PARSE_SHM_MIN_BYTES) passam por shared_memory: uma
+  cópia para o segmento e o filho lê direto dele, sem pickle do payload.
+- Corpos pequenos vão no próprio pickle (o custo de criar o segmento não
+  compensa).
+- Contexto "forkserver": o gunicorn roda com threads, e fork de processo com
+  threads é arriscado.
+- Filho que morre (OOM, segfault num feed hostil) ou estoura
+  RSS_PARSE_TIMEOUT: o pool é descartado (processos encerrados), o próximo
+  parse cria outro, e aquele feed é lido no próprio processo.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from .feed_parser import pack_items, parse_bytes, unpack_items
+
+PARSE_PROCESSES = int(os.getenv("RSS_PARSE_PROCESSES", "0"))
+SHM_MIN_BYTES = int(os.getenv("RSS_PARSE_SHM_MIN_BYTES", str(256 * 1024)))
+PARSE_TIMEOUT = float(os.getenv("RSS_PARSE_TIMEOUT", "10"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def enabled() -> bool:
+    return PARSE_PROCESSES > 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                methods = mp.get_all_start_methods()
+                ctx = mp.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=ctx)
+                _pool_pid = pid
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Tira `pool` de uso (se ainda for o atual) e encerra seus processos."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # shutdown não interrompe um filho travado: termina os processos à mão
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        try:
+            proc.terminate()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Abre o segmento do processo pai sem registrá-lo no resource tracker: o
+    dono (e quem faz unlink) é o pai; registrado aqui, o tracker poderia
+    apagar o segmento ou avisar de "vazamento" quando o auxiliar sai.
+    Antes do 3.13 não há `track=False`, e um `unregister` depois do attach
+    não serve: os auxiliares dividem o tracker do pai, então tirariam o
+    registro dele (e o unlink do pai viraria KeyError no tracker). Por isso
+    o registro é suprimido durante a abertura (o auxiliar roda uma tarefa
+    por vez, numa thread só).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda *_args, **_kw: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _work(payload: Optional[bytes], shm_name: Optional[str], size: int, limit: int,
+          content_type: str, url: str, known_urls: Tuple[str, ...]) -> Tuple[Tuple[str, list], bool]:
+    """
+    Roda no processo auxiliar: bytes (ou segmento compartilhado) → itens compactos.
+    Entradas em `known_urls` voltam só como a URL; o processo pai completa.
+    """
+    known = {u: u for u in known_urls}
+    if shm_name is None:
+        items, fell_back = parse_bytes(payload, limit, content_type, url, known)
+        return pack_items(items), fell_back
+
+    shm = _attach(shm_name)
+    try:
+        view = shm.buf[:size]
+        try:
+            items, fell_back = parse_bytes(view, limit, content_type, url, known)
+        finally:
+            view.release()
+        return pack_items(items), fell_back
+    finally:
+        shm.close()
+
+
+def _submit(pool: ProcessPoolExecutor, body: bytes, limit: int, content_type: str, url: str,
+            known: Dict[str, dict]) -> Tuple[List[dict], bool]:
+    known_urls = tuple(known)
+    if len(body) < SHM_MIN_BYTES:
+        fut = pool.submit(_work, body, None, len(body), limit, content_type, url, known_urls)
+        packed, fell_back = fut.result(timeout=PARSE_TIMEOUT)
+        return unpack_items(packed, known), fell_back
+
+    shm = shared_memory.SharedMemory(create=True, size=len(body))
+    try:
+        shm.buf[:len(body)] = body
+        fut = pool.submit(_work, None, shm.name, len(body), limit, content_type, url, known_urls)
+        packed, fell_back = fut.result(timeout=PARSE_TIMEOUT)
+        return unpack_items(packed, known), fell_back
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def parse(body: bytes, limit: int, content_type: str = "", url: str = "",
+          known: Optional[Dict[str, dict]] = None) -> Tuple[List[dict], bool]:
+    """(items, usou_feedparser), com o parse feito no pool de processos."""
+    known = known or {}
+    pool = _get_pool()
+    try:
+        return _submit(pool, body, limit, content_type, url, known)
+    except (BrokenProcessPool, FuturesTimeout) as e:
+        log.warning("pool de parse descartado (%s: %s); parse local de %s",
+                    type(e).__name__, e, url)
+        _discard_pool(pool)
+    return parse_bytes(body, limit, content_type, url, known)
@@ -0,0 +1,83 @@
+# login_app/post_authors.py
+"""
+Autor dos posts por id (`posts.author_id`) em vez do nome gravado em `autor`.
+
+Usuários e posts vivem em bancos diferentes (sem FK): `author_id` é uma
+cópia do id do usuário autenticado, gravada na criação do post (sem login,
+fica NULL — o campo `autor` vem do cliente e não prova nada). Em bancos
+antigos, `ensure_schema(app)` cria a coluna e o índice (author_id, id DESC)
+e, só nessa migração, preenche os posts antigos casando `autor` com
+`User.username`.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from . import db
+
+log = logging.getLogger(__name__)
+
+
+def _user_ids(names) -> Dict[str, int]:
+    from .models.user import User
+    out: Dict[str, int] = {}
+    names = list(names)
+    for i in range(0, len(names), 500):
+        rows = (
+            db.session.query(User.username, db.func.min(User.id))
+            .filter(User.username.in_(names[i:i + 500]))
+            .group_by(User.username)
+        )
+        out.update({name: uid for name, uid in rows})
+    return out
+
+
+def backfill() -> int:
+    """
+    Preenche author_id dos posts antigos a partir de `autor`. Retorna quantos.
+    Só para a migração: depois dela, post sem author_id é post anônimo.
+    """
+    engine = db.engines["posts"]
+    with engine.connect() as conn:
+        pending = [r[0] for r in conn.execute(text(
+            "SELECT DISTINCT autor FROM posts WHERE author_id IS NULL"
+        ))]
+    ids = _user_ids(n for n in pending if n)
+    if not ids:
+        return 0
+    done = 0
+    with engine.begin() as conn:
+        for name, uid in ids.items():
+            done += conn.execute(
+                text("UPDATE posts SET author_id = :uid WHERE author_id IS NULL AND autor = :name"),
+                {"uid": uid, "name": name},
+            ).rowcount or 0
+    return done
+
+
+def ensure_schema(app) -> None:
+    from .models.post import Post
+    with app.app_context():
+        engine = db.engines["posts"]
+        Post.__table__.create(bind=engine, checkfirst=True)
+        added = False
+        with engine.begin() as conn:
+            cols = {row[1] for row in conn.execute(text("PRAGMA table_info(posts)"))}
+            if "author_id" not in cols:
+                try:
+                    conn.execute(text("ALTER TABLE posts ADD COLUMN author_id INTEGER"))
+                    added = True
+                except OperationalError:
+                    pass  # outro worker adicionou (e preenche) ao mesmo tempo
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_posts_author_id ON posts (author_id, id DESC)"
+            ))
+        if not added:
+            return
+        n = backfill()
+        if n:
+            log.info("[post_authors] author_id preenchido em %s posts", n)
@@ -0,0 +1,181 @@
+# login_app/post_search.py
+"""
+Busca textual dos posts com SQLite FTS5.
+
+- `posts_fts`: tabela virtual de conteúdo externo (aponta para `posts`, não
+  duplica o texto) sobre titulo/conteudo/autor, com tokenizador unicode61 sem
+  acentos — "educacao" acha "Educação".
+- Triggers mantêm o índice em dia a cada INSERT/UPDATE/DELETE em `posts`.
+- `ensure_schema(app)` cria tudo e reindexa os posts existentes na primeira
+  vez (idempotente; roda na partida). `flask posts-reindex` refaz o índice.
+- `search(q, offset, limit)`: ranking BM25 (título pesa mais) + trecho com
+  os termos destacados em <mark>; `count(q)` e `filter_query(query, q)` para
+  total e paginação por cursor.
+"""
+from __future__ import annotations
+
+import html
+import logging
+import re
+from typing import List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from . import db
+
+log = logging.getLogger(__name__)
+
+# pesos do bm25 na ordem das colunas (titulo, conteudo, autor)
+BM25_WEIGHTS = (10.0, 1.0, 3.0)
+SNIPPET_TOKENS = 24
+MAX_TERMS = 8
+
+# marcadores fora do texto normal: o trecho é escapado e só eles viram <mark>
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        titulo, conteudo, autor,
+        content='posts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, titulo, conteudo, autor)
+        VALUES (new.id, new.titulo, new.conteudo, new.autor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, titulo, conteudo, autor)
+        VALUES ('delete', old.id, old.titulo, old.conteudo, old.autor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF titulo, conteudo, autor ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, titulo, conteudo, autor)
+        VALUES ('delete', old.id, old.titulo, old.conteudo, old.autor);
+        INSERT INTO posts_fts(rowid, titulo, conteudo, autor)
+        VALUES (new.id, new.titulo, new.conteudo, new.autor);
+    END
+    """,
+)
+
+_available: Optional[bool] = None
+
+
+def available() -> bool:
+    """FTS5 instalado e índice criado (senão a rota cai no ILIKE)."""
+    return bool(_available)
+
+
+def _engine():
+    return db.engines["posts"]
+
+
+def rebuild() -> int:
+    """Reindexa todos os posts a partir da tabela `posts`. Retorna quantos."""
+    with _engine().begin() as conn:
+        conn.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+        return conn.execute(text("SELECT count(*) FROM posts")).scalar() or 0
+
+
+def ensure_schema(app) -> None:
+    """Cria tabela virtual + triggers; na primeira vez indexa os posts que já existem."""
+    global _available
+    from .models.post import Post
+    with app.app_context():
+        engine = _engine()
+        Post.__table__.create(bind=engine, checkfirst=True)
+        try:
+            with engine.begin() as conn:
+                existed = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+                )).first() is not None
+                for ddl in _DDL:
+                    conn.execute(text(ddl))
+        except OperationalError as e:
+            # SQLite sem FTS5 (ou outro worker criando ao mesmo tempo)
+            _available = False
+            log.warning("[post_search] FTS5 indisponível, busca cai no ILIKE: %s", e)
+            return
+        _available = True
+        if not existed:
+            n = rebuild()
+            log.info("[post_search] índice criado com %s posts", n)
+
+
+@click.command("posts-reindex")
+@with_appcontext
+def reindex_command():
+    """Refaz o índice de busca dos posts (FTS5)."""
+    ensure_schema(current_app)
+    click.echo(f"posts indexados: {rebuild()}")
+
+
+# ==============================================================
+# 🔎 Consulta
+# ==============================================================
+
+def match_expr(q: str) -> str:
+    """
+    Texto livre → expressão MATCH segura: cada palavra vira prefixo entre
+    aspas ("educ"*), todas obrigatórias. Operadores do usuário não passam.
+    """
+    terms = _TERM.findall(q or "")[:MAX_TERMS]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    s = html.escape(snippet or "", quote=False)
+    return s.replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+
+def count(q: str) -> int:
+    expr = match_expr(q)
+    if not expr:
+        return 0
+    with _engine().connect() as conn:
+        return conn.execute(
+            text("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH :expr"), {"expr": expr}
+        ).scalar() or 0
+
+
+def filter_query(query, q: str):
+    """Restringe uma query de Post aos que casam com `q` (mantém a ordem dela)."""
+    return query.filter(
+        text("posts.id IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH :fts_expr)")
+    ).params(fts_expr=match_expr(q) or '""')
+
+
+def search(q: str, offset: int, limit: int) -> List[Tuple[int, str, str]]:
+    """
+    [(post_id, titulo destacado, trecho destacado), ...] na ordem do ranking.
+    O total fica com `count` (a rota guarda em cache). Sem termos válidos → [].
+    """
+    expr = match_expr(q)
+    if not expr:
+        return []
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    sql = text(f"""
+        SELECT rowid,
+               highlight(posts_fts, 0, :ho, :hc),
+               snippet(posts_fts, 1, :ho, :hc, '…', :tokens)
+        FROM posts_fts
+        WHERE posts_fts MATCH :expr
+        ORDER BY bm25(posts_fts, {weights}), rowid DESC
+        LIMIT :limit OFFSET :offset
+    """)
+    with _engine().connect() as conn:
+        rows = conn.execute(sql, {
+            "expr": expr, "ho": _HL_OPEN, "hc": _HL_CLOSE, "tokens": SNIPPET_TOKENS,
+            "limit": limit, "offset": offset,
+        }).all()
+    return [(rid, _highlight(title), _highlight(snip)) for rid, title, snip in rows]
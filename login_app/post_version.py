@@ -0,0 +1,106 @@
+# login_app/post_version.py
+"""
+Versão da coleção de posts, para ETag/304 sem rodar a consulta da página.
+
+Uma linha só em `posts_meta` (banco de posts) com max(id), max(atualizado_em
+ou criado_em), quantidade de posts e um contador de escritas — tudo mantido
+por triggers em `posts`, então qualquer escrita (API, script, sqlite3) muda
+a versão. Ler a versão é um SELECT por chave primária.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from . import db
+
+_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS posts_meta (
+        id          INTEGER PRIMARY KEY CHECK (id = 1),
+        max_id      INTEGER NOT NULL DEFAULT 0,
+        max_updated TEXT,
+        n           INTEGER NOT NULL DEFAULT 0,
+        writes      INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_meta_ai AFTER INSERT ON posts BEGIN
+        UPDATE posts_meta SET
+            max_id = max(max_id, new.id),
+            max_updated = max(coalesce(max_updated, ''), coalesce(new.atualizado_em, new.criado_em, '')),
+            n = n + 1,
+            writes = writes + 1
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_meta_au AFTER UPDATE ON posts BEGIN
+        UPDATE posts_meta SET
+            max_updated = max(coalesce(max_updated, ''), coalesce(new.atualizado_em, new.criado_em, '')),
+            writes = writes + 1
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_meta_ad AFTER DELETE ON posts BEGIN
+        UPDATE posts_meta SET n = n - 1, writes = writes + 1 WHERE id = 1;
+    END
+    """,
+)
+
+
+def _engine():
+    return db.engines["posts"]
+
+
+def refresh() -> None:
+    """Recalcula a linha de versão a partir da tabela (partida/reparo)."""
+    with _engine().begin() as conn:
+        conn.execute(text("""
+            INSERT INTO posts_meta (id, max_id, max_updated, n, writes)
+            SELECT 1, coalesce(max(id), 0), max(coalesce(atualizado_em, criado_em)), count(*), 0
+            FROM posts WHERE 1
+            ON CONFLICT(id) DO UPDATE SET
+                max_id = excluded.max_id,
+                max_updated = excluded.max_updated,
+                n = excluded.n,
+                writes = posts_meta.writes + 1
+        """))
+
+
+def ensure_schema(app) -> None:
+    """Cria tabela + triggers (idempotente) e confere a linha de versão."""
+    from .models.post import Post
+    with app.app_context():
+        engine = _engine()
+        Post.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            for ddl in _DDL:
+                try:
+                    conn.execute(text(ddl))
+                except OperationalError:
+                    pass  # outro worker criou ao mesmo tempo
+        refresh()
+
+
+def current() -> str:
+    """Versão opaca da coleção; muda a cada INSERT/UPDATE/DELETE em posts."""
+    with _engine().connect() as conn:
+        row = conn.execute(text(
+            "SELECT max_id, max_updated, n, writes FROM posts_meta WHERE id = 1"
+        )).first()
+    if row is None:
+        return "0"
+    return "{}-{}-{}-{}".format(*row)
+
+
+def etag(version: str, parts: Iterable[str]) -> str:
+    """ETag forte: versão da coleção + o que mais define o corpo (URL, host)."""
+    h = hashlib.sha1(version.encode("utf-8"))
+    for p in parts:
+        h.update(b"\0" + p.encode("utf-8"))
+    return h.hexdigest()[:20]
@@ -1,11 +1,15 @@
 # login_app/routes/news.py
-from flask import Blueprint, render_template, request, jsonify
+import logging
+
+from flask import Blueprint, render_template, request, jsonify, make_response
 from markupsafe import escape
+from sqlalchemy.exc import SQLAlchemyError
 
 from login_app.routes.auth import login_required_view
 from login_app.utils.jwt_auth import login_required_api
 
 news_bp = Blueprint("news", __name__)
+log = logging.getLogger(__name__)
 
 # ========= Imports internos/externos com fallback seguro =========
 # Chat blueprint será registrado no __init__.py (não aqui)
@@ -17,14 +21,26 @@ except Exception:
 
 # RSS client
 try:
-    from ..rss_client import fetch_category_sub, list_subkeys  # se estiver dentro do pacote
+    from ..rss_client import (  # se estiver dentro do pacote
+        TIMELINE_CURSOR_PREFIX, TimelineNotFound, cursor_after, fetch_category_sub_cached,
+        keyword_filter, list_subkeys, result_cache_stats, timeline_page,
+    )
 except Exception:
     try:
         # fallback se estiver na raiz do projeto (não recomendado)
-        from rss_client import fetch_category_sub, list_subkeys  # type: ignore
+        from rss_client import (  # type: ignore
+            TIMELINE_CURSOR_PREFIX, TimelineNotFound, cursor_after, fetch_category_sub_cached,
+            keyword_filter, list_subkeys, result_cache_stats, timeline_page,
+        )
     except Exception:
-        fetch_category_sub = None
+        TIMELINE_CURSOR_PREFIX = "f."
+        TimelineNotFound = LookupError
+        cursor_after = None
+        fetch_category_sub_cached = None
+        keyword_filter = None
+        timeline_page = None
         list_subkeys = None
+        result_cache_stats = None
 
 # News search (ex: NewsAPI client)
 try:
@@ -166,17 +182,22 @@ def rss_dashboard_page():
 
 @news_bp.get("/rss/<cat>/<sub>")
 def rss_items_page(cat: str, sub: str):
-    if not fetch_category_sub:
+    if not fetch_category_sub_cached:
         return render_template("rss_list.html", cat=cat, sub=sub, articles=[], error="RSS indisponível"), 200
 
-    items, err = fetch_category_sub(cat, sub, limit=24)
-    return render_template(
+    try:
+        items, err, _feeds, cache_status = fetch_category_sub_cached(cat, sub, limit=24)
+    except TimelineNotFound as e:
+        items, err, cache_status = [], str(e), "BYPASS"
+    resp = make_response(render_template(
         "rss_list.html",
         cat=cat,
         sub=sub,
         articles=items or [],
         error=err or "",
-    )
+    ))
+    resp.headers["X-Cache"] = cache_status
+    return resp
 
 
 # =========================
@@ -191,42 +212,163 @@ def rss_list_subs_api(category: str):
 
 @news_bp.get("/api/rss/items/<category>/<subkey>")
 def rss_fetch_items_api(category: str, subkey: str):
-    if not fetch_category_sub:
-        return jsonify({"category": category, "subkey": subkey, "items": [], "error": "RSS indisponível"}), 200
-    items, err = fetch_category_sub(category, subkey, limit=12)
-    return jsonify({"category": category, "subkey": subkey, "error": err or "", "items": items or []})
+    """
+    Timeline paginada por cursor a partir do histórico de artigos.
+    Query: ?limit=12&cursor=<opaco>&region=nacional
+    Filtro opcional: ?q=rtx,ryzen&mode=OR|AND (título + descrição, sem acentos)
+    Uma notícia por história (`alsoCoveredBy` com as outras fontes); ?collapse=0 mostra todas.
+    """
+    cat = category.strip().lower()
+    sub = subkey.strip().lower()
+    limit = max(min(request.args.get("limit", 12, type=int), 50), 1)
+    cursor = (request.args.get("cursor") or "").strip() or None
+    region = (request.args.get("region") or "").strip().lower() or None
+    collapse = request.args.get("collapse", "1") != "0"
 
+    import re as _re
+    raw_q = request.args.get("q", "", type=str).strip()
+    keywords = [p.strip() for p in _re.split(r"[|,;]+", raw_q) if 2 <= len(p.strip()) <= 64][:10]
+    mode = request.args.get("mode", "OR").upper()
+    if mode not in ("AND", "OR"):
+        mode = "OR"
+    predicate = keyword_filter(keywords, mode=mode) if (keywords and keyword_filter) else None
+
+    # cursor de uma página vinda do estado dos feeds (histórico estava vazio)
+    if cursor and cursor.startswith(TIMELINE_CURSOR_PREFIX):
+        if not timeline_page:
+            return jsonify({"category": category, "subkey": subkey, "items": [], "error": "RSS indisponível"}), 200
+        try:
+            items, err, feeds, next_cursor = timeline_page(
+                category, subkey, limit=limit, region=region, cursor=cursor, predicate=predicate
+            )
+        except TimelineNotFound as e:
+            items, err, feeds, next_cursor = [], str(e), [], None
+        resp = jsonify({
+            "category": category,
+            "subkey": subkey,
+            "error": err or "",
+            "items": items,
+            "next_cursor": next_cursor,
+            "feeds": feeds,
+        })
+        resp.headers["X-Cache"] = "BYPASS"
+        return resp
 
-@news_bp.get("/rss/<cat>/<sub>/<region>")
-def rss_page_region(cat, sub, region):
-    # exemplo: /rss/tecnologia/gadgets/nacional
     try:
-        from ..rss_client import FEEDS, _parse_one  # pacote
+        from ..article_store import list_timeline
+        items, next_cursor = list_timeline(
+            cat, sub, region=region, limit=limit, cursor=cursor, predicate=predicate, collapse=collapse
+        )
+    except SQLAlchemyError:
+        log.exception("histórico de artigos indisponível (%s/%s); usando o estado dos feeds", cat, sub)
+        items, next_cursor = [], None
+
+    if items or cursor:
+        resp = jsonify({
+            "category": category,
+            "subkey": subkey,
+            "error": "",
+            "items": items,
+            "next_cursor": next_cursor,
+        })
+        resp.headers["X-Cache"] = "BYPASS"  # leitura direta do histórico indexado
+        return resp
+
+    # histórico ainda vazio: usa o último lote ingerido de cada feed
+    if not fetch_category_sub_cached:
+        return jsonify({"category": category, "subkey": subkey, "items": [], "error": "RSS indisponível"}), 200
+    try:
+        if predicate is not None:
+            # com filtro a página sai do merge (filtra antes de cortar); sem cache
+            items, err, feeds, next_cursor = timeline_page(
+                category, subkey, limit=limit, region=region, predicate=predicate
+            )
+            cache_status = "BYPASS"
+        else:
+            items, err, feeds, cache_status = fetch_category_sub_cached(category, subkey, limit=limit, region=region)
+            next_cursor = cursor_after(items[-1]) if (items and len(items) >= limit and cursor_after) else None
+    except TimelineNotFound as e:
+        items, err, feeds, cache_status, next_cursor = [], str(e), [], "BYPASS", None
+    resp = jsonify({
+        "category": category,
+        "subkey": subkey,
+        "error": err or "",
+        "items": items or [],
+        "next_cursor": next_cursor,
+        "feeds": feeds,  # status por feed (ok/error/timeout/pending)
+    })
+    resp.headers["X-Cache"] = cache_status
+    return resp
+
+
+@news_bp.get("/api/rss/stats")
+@login_required_api
+def rss_stats_api():
+    """Contadores do GET condicional (hits 304 / misses 200 / economia), do cache, por host e do registro."""
+    try:
+        from ..feed_registry import current as feed_registry
+        from ..feed_state import conditional_stats
+        from ..feed_transport import host_stats
     except Exception:
-        try:
-            from rss_client import FEEDS, _parse_one  # fallback raiz
-        except Exception:
-            return "RSS indisponível", 503
+        return jsonify({"error": "RSS indisponível"}), 200
+    return jsonify({
+        "conditional": conditional_stats(),
+        "result_cache": result_cache_stats() if result_cache_stats else {},
+        "hosts": host_stats(),  # latência por host (deste worker)
+        "registry": feed_registry().stats(),  # versão do feeds.yaml em uso neste worker
+    })
+
+
+@news_bp.get("/api/rss/health")
+@login_required_api
+def rss_health_api():
+    """Saúde por feed (novidades, falhas, latência, próximo poll) e circuitos abertos por host."""
+    try:
+        from ..feed_health import report
+    except Exception:
+        return jsonify({"error": "RSS indisponível"}), 200
+    data = report()
+    status = (request.args.get("status") or "").strip().lower()
+    if status:
+        data["feeds"] = [f for f in data["feeds"] if f["status"] == status]
+    return jsonify(data)
+
+
+@news_bp.get("/api/news/stats")
+@login_required_api
+def news_stats_api():
+    """Orçamento diário da NewsAPI (uso/reserva/bloqueio por 429) e cache de buscas."""
+    try:
+        from ..news_client import search_cache_stats
+        from ..utils.rate_budget import budget
+    except Exception:
+        return jsonify({"error": "NewsAPI indisponível"}), 200
+    return jsonify({
+        "budget": budget.stats(),
+        "search_cache": search_cache_stats(),
+    })
 
-    if cat not in FEEDS or sub not in FEEDS[cat]:
-        return f"Subcategoria '{sub}' inválida para '{cat}'", 404
 
-    region = region.lower()
-    urls = FEEDS[cat][sub].get(region)
-    if not urls:
-        return f"Região '{region}' não encontrada em {cat}/{sub}", 404
+@news_bp.get("/rss/<cat>/<sub>/<region>")
+def rss_page_region(cat, sub, region):
+    # exemplo: /rss/tecnologia/gadgets/nacional
+    if not fetch_category_sub_cached:
+        return "RSS indisponível", 503
 
-    all_items = []
-    for u in urls:
-        all_items.extend(_parse_one(u, limit=24))
+    try:
+        items, err, _feeds, cache_status = fetch_category_sub_cached(cat, sub, limit=24, region=region)
+    except TimelineNotFound as e:
+        return str(e), 404
 
-    return render_template(
+    resp = make_response(render_template(
         "rss_list.html",
         cat=cat,
-        sub=f"{sub} ({region})",
-        articles=all_items,
-        error=None,
-    )
+        sub=f"{sub} ({region.lower()})",
+        articles=items,
+        error=err,
+    ))
+    resp.headers["X-Cache"] = cache_status
+    return resp
 
 
 @news_bp.get("/assistente")
@@ -1,18 +1,22 @@
 # login_app/routes/posts_api.py
 from __future__ import annotations
 
+import base64
 import os
+import threading
 import time
-from typing import Optional
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
 
-from flask import Blueprint, request, jsonify, current_app, url_for
+from flask import Blueprint, Response, g, request, jsonify, current_app, stream_with_context
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.utils import secure_filename
 
 # ✅ imports RELATIVOS (estamos dentro do pacote login_app)
-from .. import db
+from .. import db, post_search, post_version
 from ..models.post import Post
 from ..models.user import User
+from ..serialization import POST_COLUMNS, post_dict, posts_list, uploads_prefix
 
 # Se você tem o utilitário de autenticação, importe relativo:
 try:
@@ -29,77 +33,229 @@ posts_api = Blueprint("posts_api", __name__, url_prefix="/api/posts")
 
 ALLOWED_EXTS = {"png", "jpg", "jpeg", "gif", "webp"}
 
+# totais (COUNT) guardados por versão da coleção + busca: a lista não conta a
+# tabela a cada página e o total nunca fica atrás dos itens
+POSTS_COUNT_TTL = float(os.getenv("POSTS_COUNT_TTL", "30"))
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_count_lock = threading.Lock()
+USER_STREAM_BATCH = 200
+
 
 def _allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTS
 
 
-def _build_image_url(filename: Optional[str]) -> Optional[str]:
-    """Monta URL pública da imagem usando a rota /uploads/<filename>."""
-    if not filename:
-        return None
+def _serialize_post(p) -> dict:
+    return post_dict(p, uploads_prefix())
+
+
+def encode_cursor(post_id: int) -> str:
+    return base64.urlsafe_b64encode(f"p|{post_id}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
     try:
-        return url_for("uploads", filename=filename, _external=True)
-    except RuntimeError:
-        # fora de contexto de request; retorna relativo como fallback
-        return f"/uploads/{filename}"
-
-
-def _serialize_post(p: Post) -> dict:
-    return {
-        "id": p.id,
-        "titulo": getattr(p, "titulo", None),
-        "conteudo": getattr(p, "conteudo", None),
-        "autor": getattr(p, "autor", None),
-        "image_url": _build_image_url(getattr(p, "image_filename", None)),
-        "criado_em": getattr(p, "criado_em", None),
-        "atualizado_em": getattr(p, "atualizado_em", None),
-    }
+        pad = "=" * (-len(cursor) % 4)
+        tag, _, pid = base64.urlsafe_b64decode(cursor + pad).decode("ascii").partition("|")
+        return int(pid) if tag == "p" else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _cached_total(q: str, counter: Callable[[], int]) -> int:
+    key = (g.get("posts_version") or "", q)
+    now = time.monotonic()
+    hit = _count_cache.get(key)
+    if hit and now - hit[0] < POSTS_COUNT_TTL:
+        return hit[1]
+    n = counter()
+    with _count_lock:
+        if len(_count_cache) > 256:
+            _count_cache.clear()
+        _count_cache[key] = (now, n)
+    return n
+
+
+def conditional_collection(fn):
+    """
+    GET condicional para listagens: ETag forte = versão da coleção (mantida
+    por triggers) + URL. If-None-Match igual → 304 antes de qualquer consulta
+    da página. O cliente pode guardar, mas revalida sempre (no-cache).
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            version = post_version.current()
+        except SQLAlchemyError:
+            return fn(*args, **kwargs)  # sem tabela de versão: resposta normal
+        g.posts_version = version
+        tag = post_version.etag(version, (request.host_url, request.full_path))
+        if request.if_none_match.contains(tag):
+            resp = current_app.response_class(status=304)
+        else:
+            resp = current_app.make_response(fn(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+        resp.set_etag(tag)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+    return wrapper
+
+
+def _rows():
+    """Só as colunas da resposta, como tuplas (sem objetos ORM)."""
+    return db.session.query(*POST_COLUMNS)
+
+
+def _filtered(q: str, use_fts: bool):
+    query = _rows()
+    if not q:
+        return query
+    if use_fts:
+        return post_search.filter_query(query, q)
+    # sem FTS5: busca simples (varre a tabela)
+    like = f"%{q}%"
+    return query.filter(
+        db.or_(Post.titulo.ilike(like), Post.conteudo.ilike(like), Post.autor.ilike(like))
+    )
 
 
 # -------------------------------------------------------------------
 # Rotas
 # -------------------------------------------------------------------
 @posts_api.get("/")
+@conditional_collection
 def list_posts():
-    """Lista posts mais recentes, com paginação e busca."""
+    """
+    Lista posts mais recentes, com paginação e busca.
+    - ?page=N (padrão): page/pages/total como sempre; o total vem de um
+      COUNT em cache por versão da coleção e ?total=0 dispensa até ele.
+    - ?after=<cursor> (ou ?after= na primeira página): keyset por id, sem
+      OFFSET nem COUNT (total só com ?total=1); segue com o `next_cursor`
+      da resposta (null = fim).
+    """
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 10)), 50), 1)
     q = (request.args.get("q") or "").strip()
-
-    query = Post.query
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            db.or_(Post.titulo.ilike(like), Post.conteudo.ilike(like), Post.autor.ilike(like))
-        )
-
-    pag = query.order_by(Post.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    items = [_serialize_post(p) for p in pag.items]
-
-    return jsonify(
-        {
-            "page": pag.page,
-            "pages": pag.pages,
-            "total": pag.total,
-            "items": items,
-        }
-    ), 200
+    cursor_mode = "after" in request.args
+    want_total = request.args.get("total", "0" if cursor_mode else "1") != "0"
+    use_fts = bool(q) and post_search.available()
+
+    def total_of() -> Optional[int]:
+        if not want_total:
+            return None
+        if use_fts:
+            return _cached_total(q, lambda: post_search.count(q))
+        return _cached_total(q, lambda: _filtered(q, False).order_by(None).count())
+
+    if cursor_mode:
+        return _list_after(q, per_page, use_fts, total_of)
+    if use_fts:
+        return _search_posts(q, page, per_page, total_of)
+
+    rows = (
+        _filtered(q, False)
+        .order_by(Post.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page + 1)
+        .all()
+    )
+    return _page_response(page, per_page, rows, total_of)
+
+
+def _page_response(page: Optional[int], per_page: int, rows, total_of, items_of=None, cursor: bool = False):
+    """Resposta comum; `rows` traz uma linha a mais para saber se há próxima página."""
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    total = total_of()
+    body = {
+        "page": page,
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "total": total,
+        "has_next": has_next,
+        "items": items_of(rows) if items_of else posts_list(rows),
+    }
+    if cursor:
+        body["next_cursor"] = encode_cursor(rows[-1].id) if has_next else None
+    return jsonify(body), 200
+
+
+def _list_after(q: str, per_page: int, use_fts: bool, total_of):
+    """Keyset: id < cursor ORDER BY id DESC LIMIT n+1."""
+    raw = (request.args.get("after") or "").strip()
+    query = _filtered(q, use_fts)
+    if raw:
+        after = decode_cursor(raw)
+        if after is None:
+            return jsonify({"error": "cursor inválido"}), 400
+        query = query.filter(Post.id < after)
+    rows = query.order_by(Post.id.desc()).limit(per_page + 1).all()
+    return _page_response(None, per_page, rows, total_of, cursor=True)
+
+
+def _search_posts(q: str, page: int, per_page: int, total_of):
+    """Busca via FTS5: ordem por relevância (BM25) e trechos com <mark>."""
+    hits = post_search.search(q, (page - 1) * per_page, per_page + 1)
+    posts = {p.id: p for p in _rows().filter(Post.id.in_([h[0] for h in hits]))} if hits else {}
+
+    def items(kept):
+        out = []
+        for pid, titulo_hl, trecho in kept:
+            p = posts.get(pid)
+            if p is None:
+                continue  # apagado entre as duas consultas
+            item = _serialize_post(p)
+            item["highlight"] = {"titulo": titulo_hl, "conteudo": trecho}
+            out.append(item)
+        return out
+
+    return _page_response(page, per_page, hits, total_of, items_of=items)
 
 
 @posts_api.get("/user/<int:user_id>")
+@conditional_collection
 def list_posts_by_user(user_id: int):
-    """Lista posts de um usuário específico (por username gravado no Post.autor)."""
-    user = db.session.get(User, user_id)
-    if not user:
+    """
+    Posts de um usuário (por `author_id`, índice (author_id, id DESC)).
+    - sem parâmetros: a lista inteira de sempre, mas enviada em streaming
+      (lotes de USER_STREAM_BATCH, sem carregar tudo na memória);
+    - ?after=<cursor>&per_page=N: página keyset {items, next_cursor, has_next}.
+    """
+    query = _rows().filter(Post.author_id == user_id).order_by(Post.id.desc())
+
+    if "after" in request.args or "per_page" in request.args:
+        per_page = max(min(int(request.args.get("per_page", 10)), 50), 1)
+        raw = (request.args.get("after") or "").strip()
+        if raw:
+            after = decode_cursor(raw)
+            if after is None:
+                return jsonify({"error": "cursor inválido"}), 400
+            query = query.filter(Post.id < after)
+        rows = query.limit(per_page + 1).all()
+        if not rows and not raw and not _user_exists(user_id):
+            return jsonify({"error": "Usuário não encontrado"}), 404
+        return _page_response(None, per_page, rows, lambda: None, cursor=True)
+
+    first = query.first()
+    if first is None and not _user_exists(user_id):
         return jsonify({"error": "Usuário não encontrado"}), 404
 
-    posts = (
-        Post.query.filter_by(autor=user.username)
-        .order_by(Post.id.desc())
-        .all()
-    )
-    return jsonify([_serialize_post(p) for p in posts]), 200
+    def generate():
+        dumps = current_app.json.dumps
+        prefix = uploads_prefix()
+        yield "["
+        sep = ""
+        for p in query.yield_per(USER_STREAM_BATCH):
+            yield sep + dumps(post_dict(p, prefix))
+            sep = ","
+        yield "]"
+
+    return Response(stream_with_context(generate()), status=200, mimetype="application/json")
+
+
+def _user_exists(user_id: int) -> bool:
+    # só consultado quando não há posts: o caso comum nem toca o banco de usuários
+    return db.session.get(User, user_id) is not None
 
 
 @posts_api.post("/")
@@ -155,10 +311,15 @@ def create_post():
     if not autor:
         autor = "Anônimo"
 
+    # dono do post: só o usuário autenticado (`autor` vem do cliente; sem login fica NULL)
+    user = getattr(g, "current_user", None)
+    author_id = user.id if user is not None else None
+
     post = Post(
         titulo=titulo,
         conteudo=conteudo,
         autor=autor,
+        author_id=author_id,
         image_filename=image_filename,
     )
     db.session.add(post)
@@ -1,93 +1,24 @@
 # rss_client.py
 from __future__ import annotations
+import base64
 import datetime as dt
-from typing import List, Tuple, Optional, Dict
+import heapq
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import dropwhile, islice
+from typing import Callable, Iterable, List, Tuple, Optional, Dict
+from urllib.parse import urlparse
 import feedparser
-import html
-import re
 
-# ==============================================================
-# 🌐 Fontes confiáveis com RSS (NewsTechApp)
-# ==============================================================
-
-FEEDS: Dict[str, Dict[str, List[str]]] = {
-    "hardware": {
-        "nacional": [
-            "https://canaltech.com.br/rss/hardware/",
-            #"https://adrenaline.com.br/rss/categoria/hardware",
-        ],
-        "internacional": [
-            "https://www.tomshardware.com/feeds/all",
-            "https://www.extremetech.com/feed",
-        ],
-    },
-    "games": {
-        "nacional": [
-            "https://www.theenemy.com.br/rss",
-            "https://www.gamevicio.com/rss/noticias/",
-            "https://www.theenemy.com.br/games/rss-de-volta",
-        ],
-        "internacional": [
-            "https://www.pcgamer.com/rss/",
-            "https://www.tweaktown.com/feeds/news-mf.xml",
-        ],
-        "console": [
-            "https://blog.playstation.com/feed/",
-            "https://news.xbox.com/en-us/feed/",
-            "https://store.steampowered.com/feeds/news.xml",
-        ],
-    },
-    "tecnologia": {
-        "ia": {
-            "nacional": [
-                "https://canaltech.com.br/rss/inteligencia-artificial/",
-                "https://olhardigital.com.br/feed/",
-            ],
-            "internacional": [
-                "https://www.theverge.com/rss/index.xml",
-                "https://www.theverge.com/artificial-intelligence/rss/index.xml",
-            ],
-        },
-        "seguranca": {
-            "nacional": [
-                "https://www.cisoadvisor.com.br/feed/",
-                "https://www.tecmundo.com.br/seguranca/rss",
-            ],
-            "internacional": [
-                "https://feeds.feedburner.com/TechCrunch/startups",
-                "https://krebsonsecurity.com/feed/",
-                "https://www.bleepingcomputer.com/feed/",
-            ],
-        },
-        "gadgets": {
-            "nacional": [
-                "https://www.tudocelular.com/rss/",
-                "https://tecnoblog.net/feed/",
-            ],
-            "internacional": [
-                "https://www.engadget.com/rss.xml",
-                "https://www.androidauthority.com/feed/",
-                "https://www.techrepublic.com/rssfeeds/articles/",
-            ],
-        },
-    },
-    "desenvolvedores": {
-        "nacional": [
-            "https://imasters.com.br/feed",
-            "https://www.infoq.com/br/feed",
-        ],
-        "internacional": [
-            "https://news.ycombinator.com/rss",
-            "https://stackoverflow.blog/feed/",
-        ],
-        "devops": [
-            "https://dev.to/feed/tag/devops",
-        ],
-        "ai_tools": [
-            "https://dev.to/feed/tag/machinelearning",
-        ],
-    },
-}
+from . import feed_health, feed_registry, feed_state, feed_transport, parse_pool
+from .feed_parser import FeedNotSupported, StreamingFeedParser, normalize_parsed as _normalize_entries
+from .feed_parser import parse_with_feedparser
+from .utils.cache import TTLCache
+from .utils.matcher import compile_keywords
+from .utils.shared_cache import make_key, shared_cache
 
 # ==============================================================
 # ⚙️ Config HTTP para contornar 403/Cloudflare em alguns feeds
@@ -107,144 +38,545 @@ REQUEST_HEADERS = {
     "Referer": "https://news-tech.local/",
 }
 
+# ==============================================================
+# ⚡ Fan-out concorrente (pool limitado + deadlines)
+# ==============================================================
+
+# Máximo de feeds baixados ao mesmo tempo por worker
+FETCH_MAX_WORKERS = int(os.getenv("RSS_FETCH_WORKERS", "8"))
+# Tempo máximo de um feed individual (segundos)
+FEED_TIMEOUT = float(os.getenv("RSS_FEED_TIMEOUT", "6"))
+# Prazo global de uma requisição que agrega vários feeds (segundos)
+REQUEST_DEADLINE = float(os.getenv("RSS_REQUEST_DEADLINE", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool compartilhado por processo (recriado após fork do gunicorn)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, FETCH_MAX_WORKERS),
+                    thread_name_prefix="rss-fetch",
+                )
+                _executor_pid = pid
+    return _executor
+
 # ==============================================================
 # 🧹 Utilitários
 # ==============================================================
 
 def list_subkeys(category: str) -> List[str]:
     """Lista as subchaves válidas da categoria (ou lista vazia)."""
-    return list(FEEDS.get(category, {}).keys())
+    return list(feed_registry.current().subs.get(category, ()))
 
-def _clean_text(s: Optional[str]) -> str:
-    if not s:
-        return ""
-    s = html.unescape(s)
-    s = re.sub(r"<.*?>", "", s)         # remove tags HTML
-    s = re.sub(r"\s+", " ", s).strip()  # normaliza espaços
-    return s
-
-def _extract_image(entry: dict) -> Optional[str]:
+def iter_feed_urls():
     """
-    Tenta encontrar uma imagem representativa no item RSS.
-    Prioridades:
-      - media:content / media:thumbnail
-      - enclosures image/*
-      - links rel="enclosure" / type image/*
+    Gera (categoria, sub, região, url) para cada posição do registro de feeds
+    (região None nas subs sem regiões). Uma URL pode aparecer em mais de uma.
     """
-    try:
-        # media:content
-        if "media_content" in entry and entry.media_content:
-            for media in entry.media_content:
-                url = media.get("url")
-                if url:
-                    return url
-
-        # media:thumbnail
-        if "media_thumbnail" in entry and entry.media_thumbnail:
-            url = entry.media_thumbnail[0].get("url")
-            if url:
-                return url
-
-        # enclosures (com extensões ou type image/*)
-        if "enclosures" in entry and entry.enclosures:
-            for enc in entry.enclosures:
-                url = enc.get("href") or enc.get("url")
-                typ = (enc.get("type") or "").lower()
-                if url and (typ.startswith("image/") or re.search(r"\.(jpe?g|png|gif|webp)$", url, re.I)):
-                    return url
-
-        # links com rel=enclosure e type image/*
-        if "links" in entry and entry.links:
-            for l in entry.links:
-                rel = (l.get("rel") or "").lower()
-                typ = (l.get("type") or "").lower()
-                href = l.get("href")
-                if rel == "enclosure" and href and typ.startswith("image/"):
-                    return href
-    except Exception:
-        pass
-    return None
+    for cat, sub, region, info in feed_registry.current().iter_placements():
+        yield cat, sub, region, info.url
 
 # ==============================================================
 # 🔍 Funções principais
 # ==============================================================
 
-def _safe_feed_title(parsed) -> str:
-    """Pega título do feed sem levantar exceção se faltar metadado."""
-    feed_meta = getattr(parsed, "feed", None)
-    if isinstance(feed_meta, dict):
-        return feed_meta.get("title", "RSS desconhecido")
-    return "RSS desconhecido"
+# Quantos itens guardamos por feed no estado compartilhado (reuso em 304)
+STATE_MAX_ITEMS = int(os.getenv("RSS_STATE_MAX_ITEMS", "50"))
+
+# As rotas leem só do estado ingerido; "1" volta ao download síncrono (dev/debug)
+LIVE_FETCH = os.getenv("RSS_LIVE_FETCH", "0").lower() in ("1", "true", "yes")
+
+# Parser incremental (para no limite de itens); "0" força o feedparser sempre
+STREAM_PARSE = os.getenv("RSS_STREAM_PARSE", "1").lower() in ("1", "true", "yes")
+
+def _read_items(resp: feed_transport.FeedResponse, feed_url: str, limit: int,
+                known: Optional[Dict[str, dict]] = None) -> List[dict]:
+    """
+    Lê o corpo em streaming (com os limites de tamanho/tempo do transporte).
+    Caminho rápido: StreamingFeedParser, que para em `limit` itens e fecha a
+    conexão sem baixar o resto. Se o documento não for um feed XML "limpo",
+    junta o que já foi lido com o restante e entrega ao feedparser.
+    Com RSS_PARSE_PROCESSES, baixa o corpo inteiro e o parse vai para o pool
+    de processos (libera o GIL deste worker para as outras threads).
+    `known` ({url: item} do último lote) evita normalizar de novo o que não mudou.
+    """
+    content_type = resp.headers.get("Content-Type", "")
+    chunks = resp.iter_chunks()
+    if parse_pool.enabled():
+        items, fell_back = parse_pool.parse(b"".join(chunks), limit, content_type, feed_url, known)
+        if fell_back:
+            feed_state.incr(stream_parse_fallbacks=1)
+        return items
+
+    if STREAM_PARSE:
+        parser = StreamingFeedParser(limit, known)
+        seen: List[bytes] = []
+        try:
+            for chunk in chunks:
+                seen.append(chunk)
+                if parser.feed(chunk):
+                    break
+            return parser.finish()
+        except FeedNotSupported:
+            feed_state.incr(stream_parse_fallbacks=1)
+            body = b"".join(seen) + b"".join(chunks)
+    else:
+        body = b"".join(chunks)
+    return parse_with_feedparser(body, limit, content_type, feed_url, known)
+
+class FeedHTTPError(RuntimeError):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
 
 def _parse_one(feed_url: str, limit: int = 24) -> List[dict]:
-    """Analisa um único feed RSS e retorna itens normalizados."""
-    parsed = feedparser.parse(feed_url, request_headers=REQUEST_HEADERS)
-    items: List[dict] = []
-
-    for e in getattr(parsed, "entries", [])[:limit]:
-        title = _clean_text(getattr(e, "title", ""))
-        desc = _clean_text(getattr(e, "summary", "") or getattr(e, "description", ""))
-        link = getattr(e, "link", "")
-        image = _extract_image(e)
-
-        # Data: tenta published_parsed, cai para updated_parsed
-        pub_dt = None
-        tm = getattr(e, "published_parsed", None) or getattr(e, "updated_parsed", None)
-        if tm:
-            pub_dt = dt.datetime(*tm[:6], tzinfo=dt.timezone.utc)
-
-        items.append({
-            "title": title or "(sem título)",
-            "description": desc or None,
-            "url": link,
-            "urlToImage": image,
-            "publishedAt": pub_dt.isoformat() if pub_dt else None,
-            "source": _safe_feed_title(parsed),
-        })
+    """
+    Analisa um único feed RSS e retorna itens normalizados.
+    Respeita o circuit breaker do host e registra o resultado (itens novos,
+    latência ou erro) em feed_health, que decide o próximo poll.
+    """
+    if not feed_health.acquire(feed_url):
+        raise feed_health.CircuitOpen(f"circuito aberto para {urlparse(feed_url).hostname}")
+    t0 = time.perf_counter()
+    try:
+        items, new_items = _download(feed_url, limit)
+    except Exception as e:
+        feed_health.record_failure(feed_url, str(e) or type(e).__name__,
+                                   (time.perf_counter() - t0) * 1000, getattr(e, "status", None))
+        raise
+    feed_health.record_success(feed_url, new_items, (time.perf_counter() - t0) * 1000)
     return items
 
-def fetch_category_sub(category: str, subkey: str, limit: int = 24) -> Tuple[List[dict], Optional[str]]:
+def _download(feed_url: str, limit: int) -> Tuple[List[dict], int]:
     """
-    Retorna (items, error).
-    - Valida categoria/sub.
-    - Faz merge das entradas dos RSS configurados.
-    - Tenta carregar imagens e sanitiza textos.
+    Baixa e normaliza um feed; retorna (itens, quantos são novos).
+    Usa GET condicional (ETag/Last-Modified): em 304 devolve os itens salvos
+    no estado compartilhado sem baixar nem parsear o documento de novo.
+    """
+    state = feed_state.get_state(feed_url)
+    headers = dict(REQUEST_HEADERS)
+    if state and state["etag"]:
+        headers["If-None-Match"] = state["etag"]
+    if state and state["modified"]:
+        headers["If-Modified-Since"] = state["modified"]
+
+    t0 = time.perf_counter()
+    with feed_transport.open_feed(feed_url, headers=headers, body_timeout=FEED_TIMEOUT) as resp:
+        status = resp.status_code
+
+        if status == 304 and state and state["items"] is not None:
+            feed_state.touch_state(feed_url)
+            feed_state.incr(
+                conditional_hits=1,
+                conditional_bytes_saved=state["body_bytes"],
+                conditional_parse_ms_saved=state["parse_ms"],
+            )
+            return state["items"][:limit], 0
+
+        if status >= 400:
+            raise FeedHTTPError(status)
+
+        known = {it["url"]: it for it in (state["items"] or []) if it.get("url")} if state else {}
+        items = _read_items(resp, feed_url, max(limit, STATE_MAX_ITEMS), known)
+        bytes_read = resp.bytes_read
+        new_etag = resp.headers.get("ETag")
+        new_modified = resp.headers.get("Last-Modified")
+        try:
+            body_bytes = int(resp.headers.get("Content-Length") or bytes_read)
+        except ValueError:
+            body_bytes = bytes_read
+    parse_ms = int((time.perf_counter() - t0) * 1000)
+
+    _stamp_and_sort(items)
+    reused = sum(1 for it in items if it.get("url") in known)
+    counters = {
+        "conditional_misses": 1,
+        "conditional_bytes_downloaded": bytes_read,
+        "entries_reused": reused,
+        "entries_normalized": len(items) - reused,
+    }
+    if not new_etag and not new_modified:
+        counters["conditional_no_validators"] = 1
+    feed_state.incr(**counters)
+    feed_state.save_state(feed_url, new_etag, new_modified, items, body_bytes, parse_ms)
+
+    return items[:limit], len(items) - reused
+
+def fetch_feeds(
+    urls: List[str],
+    limit: int = 24,
+    deadline: Optional[float] = None,
+    feed_timeout: Optional[float] = None,
+    grouped: bool = False,
+) -> Tuple[list, List[dict]]:
+    """
+    Baixa vários feeds em paralelo e retorna (items, feeds).
+    - `grouped`: items vem como uma lista por feed (na ordem de `urls`).
+    - `deadline`: prazo global (s) para a chamada inteira.
+    - `feed_timeout`: prazo (s) de cada feed, contado a partir do início do download.
+    Feeds que falham ou estouram o prazo não derrubam os demais: entram em `feeds`
+    com status "error"/"timeout"/"circuit_open" e os itens dos que responderam são devolvidos.
+    """
+    deadline = REQUEST_DEADLINE if deadline is None else float(deadline)
+    feed_timeout = FEED_TIMEOUT if feed_timeout is None else float(feed_timeout)
+
+    t0 = time.monotonic()
+    hard_stop = t0 + deadline
+    started: Dict[str, float] = {}
+    results: Dict[str, dict] = {}
+
+    def _task(u: str) -> List[dict]:
+        started[u] = time.monotonic()
+        return _parse_one(u, limit)
+
+    executor = _get_executor()
+    futures = {executor.submit(_task, u): u for u in urls}
+    pending = set(futures)
+
+    def _expire(f, status: str, msg: str, now: float) -> None:
+        u = futures[f]
+        f.cancel()  # só tem efeito se ainda não começou
+        st = started.get(u)
+        results[u] = {
+            "url": u, "status": status, "error": msg, "items": 0,
+            "elapsed_ms": int((now - (st or t0)) * 1000),
+        }
+
+    while pending:
+        now = time.monotonic()
+
+        # feeds que já estouraram o próprio timeout
+        for f in list(pending):
+            st = started.get(futures[f])
+            if st is not None and now - st >= feed_timeout:
+                pending.discard(f)
+                _expire(f, "timeout", f"sem resposta em {feed_timeout:.1f}s", now)
+        if not pending or now >= hard_stop:
+            break
+
+        # acorda no próximo prazo relevante (global ou de algum feed em andamento)
+        wake = hard_stop
+        waiting_start = False
+        for f in pending:
+            st = started.get(futures[f])
+            if st is None:
+                waiting_start = True
+            else:
+                wake = min(wake, st + feed_timeout)
+        timeout = max(0.0, wake - now)
+        if waiting_start:
+            timeout = min(timeout, 0.1)
+
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for f in done:
+            u = futures[f]
+            elapsed = int((time.monotonic() - started.get(u, t0)) * 1000)
+            try:
+                items = f.result()
+                results[u] = {"url": u, "status": "ok", "error": None,
+                              "items": len(items), "elapsed_ms": elapsed, "_items": items}
+            except feed_health.CircuitOpen as ex:
+                results[u] = {"url": u, "status": "circuit_open", "error": str(ex),
+                              "items": 0, "elapsed_ms": elapsed}
+            except Exception as ex:
+                results[u] = {"url": u, "status": "error", "error": str(ex),
+                              "items": 0, "elapsed_ms": elapsed}
+
+    now = time.monotonic()
+    for f in pending:
+        _expire(f, "timeout", f"prazo global de {deadline:.1f}s excedido", now)
+
+    per_feed: List[List[dict]] = []
+    feeds: List[dict] = []
+    for u in urls:
+        meta = results[u]
+        per_feed.append(meta.pop("_items", []))
+        feeds.append(meta)
+    if grouped:
+        return per_feed, feeds
+    return [it for items in per_feed for it in items], feeds
+
+def read_feeds(urls: List[str], limit: Optional[int] = 24, grouped: bool = False) -> Tuple[list, List[dict]]:
+    """
+    Lê os itens já ingeridos (estado compartilhado) sem tocar na rede.
+    Mesmo formato de retorno de `fetch_feeds`; feeds ainda não sincronizados
+    aparecem com status "pending". `limit=None` devolve o lote inteiro.
     """
+    now = time.time()
+    per_feed: List[List[dict]] = []
+    feeds: List[dict] = []
+    for u in urls:
+        state = feed_state.get_state(u)
+        if not state or state["items"] is None:
+            feeds.append({"url": u, "status": "pending", "error": "feed ainda não sincronizado",
+                          "items": 0, "age_s": None})
+            continue
+        items = state["items"] if limit is None else state["items"][:limit]
+        per_feed.append(items)
+        checked = state["checked_at"] or state["fetched_at"] or now
+        feeds.append({"url": u, "status": "ok", "error": None,
+                      "items": len(items), "age_s": int(now - checked)})
+    if grouped:
+        return per_feed, feeds
+    return [it for items in per_feed for it in items], feeds
+
+# ==============================================================
+# 🔀 Timeline: merge k-way dos feeds (top-k + cursor)
+# ==============================================================
+
+def _epoch(published_at: Optional[str]) -> int:
+    if not published_at:
+        return 0
+    try:
+        d = dt.datetime.fromisoformat(published_at)
+    except ValueError:
+        return 0
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=dt.timezone.utc)
+    return int(d.timestamp())
+
+def _stamp_and_sort(items: List[dict]) -> None:
+    """
+    Grava `publishedTs` (epoch inteiro) em cada item e deixa o lote em ordem
+    decrescente — feito uma vez, ao salvar o feed, e não a cada leitura.
+    """
+    for it in items:
+        if "publishedTs" not in it:
+            it["publishedTs"] = _epoch(it.get("publishedAt"))
+    items.sort(key=_order_key, reverse=True)
+
+def _order_key(it: dict) -> Tuple[int, str]:
+    ts = it.get("publishedTs")
+    if ts is None:  # lotes gravados antes do publishedTs
+        ts = it["publishedTs"] = _epoch(it.get("publishedAt"))
+    return ts, it.get("url") or ""
+
+def _is_sorted(items: List[dict]) -> bool:
+    keys = [_order_key(it) for it in items]
+    return all(a >= b for a, b in zip(keys, keys[1:]))
+
+# prefixo que separa estes cursores dos do histórico (article_store)
+TIMELINE_CURSOR_PREFIX = "f."
+
+def encode_timeline_cursor(key: Tuple[int, str]) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return TIMELINE_CURSOR_PREFIX + base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def cursor_after(item: dict) -> str:
+    """Cursor para a página que começa depois de `item`."""
+    return encode_timeline_cursor(_order_key(item))
+
+def decode_timeline_cursor(cursor: str) -> Optional[Tuple[int, str]]:
+    if not cursor or not cursor.startswith(TIMELINE_CURSOR_PREFIX):
+        return None
+    body = cursor[len(TIMELINE_CURSOR_PREFIX):]
+    try:
+        ts, url = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+        return int(ts), str(url)
+    except (ValueError, TypeError):
+        return None
+
+def merge_timeline(
+    per_feed: Iterable[List[dict]],
+    limit: int,
+    after: Optional[Tuple[int, str]] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+) -> Tuple[List[dict], Optional[Tuple[int, str]]]:
+    """
+    Merge preguiçoso (heapq.merge) de listas já em ordem decrescente: só os
+    `limit` primeiros itens são produzidos, então o custo acompanha o tamanho
+    da página e não o total de itens. `after` (chave do último item da página
+    anterior) pula o que já foi entregue. `predicate` filtra antes de cortar
+    a página (páginas cheias, cursor só quando há mais). Retorna (itens,
+    chave para a próxima página ou None).
+    """
+    lists = []
+    for items in per_feed:
+        if not items:
+            continue
+        if not _is_sorted(items):  # estado antigo, de antes do publishedTs
+            items = sorted(items, key=_order_key, reverse=True)
+        if after is not None:
+            items = dropwhile(lambda it: _order_key(it) >= after, items)
+        lists.append(items)
+
+    merged = heapq.merge(*lists, key=_order_key, reverse=True)
+    if predicate is not None:
+        merged = filter(predicate, merged)
+    page = list(islice(merged, limit + 1))
+    if len(page) > limit:
+        page = page[:limit]
+        return page, _order_key(page[-1])
+    return page, None
+
+class TimelineNotFound(LookupError):
+    """Categoria, subcategoria ou região que não existe no feeds.yaml (as rotas respondem 404)."""
+
+def _feeds_error(feeds: List[dict], has_items: bool) -> Optional[str]:
+    """Resume as falhas por feed numa mensagem curta (ou None se tudo ok)."""
+    failed = [f for f in feeds if f["status"] != "ok"]
+    if not failed:
+        return None
+    if all(f["status"] == "pending" for f in failed) and not has_items:
+        return "Feeds ainda não sincronizados; tente novamente em instantes."
+    hosts = ", ".join(urlparse(f["url"]).netloc or f["url"] for f in failed)
+    if has_items:
+        return f"Alguns feeds não responderam: {hosts}"
+    return f"Nenhum feed respondeu: {hosts}"
+
+def timeline_page(
+    category: str,
+    subkey: str,
+    limit: int = 24,
+    region: Optional[str] = None,
+    cursor: Optional[str] = None,
+    deadline: Optional[float] = None,
+    live: Optional[bool] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+) -> Tuple[List[dict], Optional[str], List[dict], Optional[str]]:
+    """
+    Retorna (items, error, feeds, next_cursor).
+    - Valida categoria/sub (e região, se informada): inexistente levanta
+      `TimelineNotFound`, com a mensagem para o usuário.
+    - Por padrão lê apenas o que a ingestão em background já gravou
+      (`live=False`); com `live=True` baixa os RSS em paralelo, dentro do prazo global.
+    - `feeds` traz o status de cada feed (ok/error/timeout/pending).
+    - `cursor` (opaco, vindo de `next_cursor`) continua de onde a página parou.
+    - `predicate` (ex.: `keyword_filter`) filtra antes da paginação.
+    """
+    if live is None:
+        live = LIVE_FETCH
     try:
         cat = category.strip().lower()
         sub = subkey.strip().lower()
-        if cat not in FEEDS:
-            return [], f"Categoria inválida: {cat}"
-        if sub not in FEEDS[cat]:
-            return [], f"Subcategoria inválida: {sub} (válidas: {', '.join(list_subkeys(cat))})"
+        registry = feed_registry.current()
+        if cat not in registry.subs:
+            raise TimelineNotFound(f"Categoria inválida: {cat}")
+        if sub not in registry.subs[cat]:
+            raise TimelineNotFound(f"Subcategoria inválida: {sub} (válidas: {', '.join(registry.subs[cat])})")
 
-        urls = FEEDS[cat][sub]
-        all_items: List[dict] = []
+        # sem região: todas as regiões da sub (tabela já compilada, sem percorrer árvore)
+        reg = region.strip().lower() if region else None
+        urls = registry.urls(cat, sub, reg)
+        if not urls:
+            raise TimelineNotFound(f"Região '{reg}' não encontrada em {cat}/{sub}")
 
-        for u in urls:
-            try:
-                all_items.extend(_parse_one(u, limit))
-            except Exception as ex:
-                # Continua nas demais fontes, preservando a origem com erro
-                all_items.append({
-                    "title": f"[Falha ao ler feed] {u}",
-                    "description": str(ex),
-                    "url": u,
-                    "urlToImage": None,
-                    "publishedAt": None,
-                    "source": "rss-client",
-                })
-
-        # Ordena por data (desc); itens sem data vão pro fim
-        def _key(x):
-            p = x.get("publishedAt")
-            try:
-                return dt.datetime.fromisoformat(p) if p else dt.datetime.min.replace(tzinfo=dt.timezone.utc)
-            except Exception:
-                return dt.datetime.min.replace(tzinfo=dt.timezone.utc)
+        after = None
+        if cursor:
+            after = decode_timeline_cursor(cursor)
+            if after is None:
+                return [], "Cursor inválido.", [], None
 
-        all_items.sort(key=_key, reverse=True)
-        return all_items[:limit], None
+        if live:
+            per_feed, feeds = fetch_feeds(list(urls), max(limit, STATE_MAX_ITEMS), deadline=deadline, grouped=True)
+        else:
+            per_feed, feeds = read_feeds(list(urls), None, grouped=True)
+        items, next_key = merge_timeline(per_feed, limit, after, predicate)
+        next_cursor = encode_timeline_cursor(next_key) if next_key else None
+        return items, _feeds_error(feeds, bool(items)), feeds, next_cursor
 
+    except TimelineNotFound:
+        raise
     except Exception as e:
-        return [], f"Erro inesperado no RSS: {e}"
+        return [], f"Erro inesperado no RSS: {e}", [], None
+
+def fetch_category_sub_detailed(
+    category: str,
+    subkey: str,
+    limit: int = 24,
+    region: Optional[str] = None,
+    deadline: Optional[float] = None,
+    live: Optional[bool] = None,
+) -> Tuple[List[dict], Optional[str], List[dict]]:
+    """Primeira página da timeline: (items, error, feeds)."""
+    items, error, feeds, _next = timeline_page(category, subkey, limit, region, deadline=deadline, live=live)
+    return items, error, feeds
+
+# ==============================================================
+# 🗃️ Cache de resultados (TTL + LRU + stale-while-revalidate)
+# ==============================================================
+
+RESULT_CACHE_TTL = float(os.getenv("RSS_CACHE_TTL", "60"))
+RESULT_CACHE_STALE = float(os.getenv("RSS_CACHE_STALE", "300"))
+RESULT_CACHE_SIZE = int(os.getenv("RSS_CACHE_SIZE", "256"))
+
+_result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, stale_ttl=RESULT_CACHE_STALE)
+
+def _has_items(result) -> bool:
+    return bool(result[0])
+
+def fetch_category_sub_cached(
+    category: str,
+    subkey: str,
+    limit: int = 24,
+    region: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str], List[dict], str]:
+    """
+    Igual a `fetch_category_sub_detailed`, mas passando por dois níveis de cache:
+    o do processo (TTLCache) e, num miss, o compartilhado entre workers (/data).
+    Retorna (items, error, feeds, cache_status) — status HIT/STALE/MISS/COALESCED;
+    se o processo errou mas o cache compartilhado acertou, vem "SHARED-<status>".
+    Resultados sem itens não ficam no cache (ex.: feeds ainda não sincronizados).
+    Categoria/sub/região inexistente levanta `TimelineNotFound`.
+    """
+    key = (
+        category.strip().lower(),
+        subkey.strip().lower(),
+        (region or "").strip().lower() or None,
+        int(limit),
+    )
+    shared_status: List[str] = []
+
+    def _load_shared():
+        value, st = shared_cache.get_or_load(
+            make_key("rss", *key),
+            lambda: fetch_category_sub_detailed(category, subkey, limit, region=region),
+            ttl=RESULT_CACHE_TTL,
+            stale_ttl=RESULT_CACHE_STALE,
+            cacheable=_has_items,
+        )
+        shared_status.append(st)
+        return tuple(value)
+
+    (items, error, feeds), status = _result_cache.get_or_load(key, _load_shared, cacheable=_has_items)
+    if status == "MISS" and shared_status and shared_status[0] != "MISS":
+        status = f"SHARED-{shared_status[0]}"
+    return items, error, feeds, status
+
+def keyword_filter(keywords: List[str], mode: str = "OR", scope: str = "title+desc") -> Optional[Callable[[dict], bool]]:
+    """
+    Predicado para filtrar itens por palavras-chave (sem caixa/acentos, uma
+    passada por item). None quando não há palavras — nada a filtrar.
+    """
+    matcher = compile_keywords(keywords)
+    if not len(matcher):
+        return None
+
+    def _pred(item: dict) -> bool:
+        title = item.get("title") or ""
+        hay = title if scope == "title" else f"{title} {item.get('description') or ''}"
+        return matcher.matches(hay, mode)
+    return _pred
+
+def result_cache_stats() -> Dict[str, int]:
+    return _result_cache.stats()
+
+def fetch_category_sub(category: str, subkey: str, limit: int = 24) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retorna (items, error).
+    - Valida categoria/sub.
+    - Faz merge das entradas dos RSS configurados (já ingeridas em background).
+    - Tenta carregar imagens e sanitiza textos.
+    """
+    try:
+        items, error, _feeds, _status = fetch_category_sub_cached(category, subkey, limit)
+    except TimelineNotFound as e:
+        return [], str(e)
+    return items, error
@@ -0,0 +1,265 @@
+# login_app/rss_ingest.py
+"""
+Ingestão de RSS em background.
+
+Percorre o registro de feeds (feeds.yaml) em intervalos regulares e grava
+os itens normalizados no estado compartilhado (feed_state) e no histórico de
+artigos (bind "articles"). As rotas web leem só desses armazenamentos e
+nunca falam com os feeds de origem.
+O líder também refaz, de tempos em tempos, o painel de presets da NewsAPI
+(NEWSAPI_REFRESH_INTERVAL) pelo planejador de consultas.
+
+Modos (RSS_INGEST_MODE):
+  - "worker"  (padrão): cada worker do gunicorn tenta virar líder via lock de
+               arquivo em /data; só o eleito faz polling. Se ele morrer, o
+               lock é liberado e outro worker assume.
+  - "process": nada roda nos workers; use um processo dedicado
+               (`python -m login_app.rss_ingest`), ex. no procfile/start.sh.
+  - "off":     desliga a ingestão automática.
+
+Uso pela linha de comando:
+    python -m login_app.rss_ingest --once      # uma rodada e sai
+    python -m login_app.rss_ingest             # loop contínuo (processo dedicado)
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import feed_health, feed_state, rss_client
+from .utils.paths import resolve_data_path
+from .utils.seen import SeenSet
+
+INGEST_MODE = os.getenv("RSS_INGEST_MODE", "worker").lower()
+# frequência das rodadas (s); cada rodada só baixa os feeds vencidos (feed_health)
+INGEST_INTERVAL = int(os.getenv("RSS_INGEST_INTERVAL", "60"))
+INGEST_DEADLINE = float(os.getenv("RSS_INGEST_DEADLINE", "90"))
+INGEST_FEED_TIMEOUT = float(os.getenv("RSS_INGEST_FEED_TIMEOUT", "20"))
+LOCK_PATH = os.getenv("RSS_INGEST_LOCK", "/data/rss_ingest.lock")
+# atualização planejada dos presets da NewsAPI pelo líder (s); "0" desliga
+NEWSAPI_REFRESH_INTERVAL = int(os.getenv("NEWSAPI_REFRESH_INTERVAL", "10800"))
+
+log = logging.getLogger("rss_ingest")
+
+
+# ==============================================================
+# 🔁 Uma rodada de ingestão
+# ==============================================================
+
+def _store_articles(app) -> int:
+    """
+    Copia os itens do estado compartilhado para o histórico de artigos.
+    Cada feed guarda um seen-set das URLs já gravadas: só o que é novo vai
+    ao banco, em vez de reconsultar o lote inteiro a cada rodada. Um feed
+    pode estar em várias posições (cat/sub/região): o seen-set só é salvo
+    depois que o lote entrou em todas elas.
+    """
+    from .article_store import upsert_articles
+
+    placements: Dict[str, List[Tuple[str, str, Optional[str]]]] = {}
+    for cat, sub, region, url in rss_client.iter_feed_urls():
+        placements.setdefault(url, []).append((cat, sub, region))
+
+    added = 0
+    with app.app_context():
+        for url, where in placements.items():
+            state = feed_state.get_state(url)
+            if not state or not state["items"]:
+                continue
+            seen = SeenSet.from_bytes(feed_state.get_seen(url))
+            fresh = [it for it in state["items"] if it.get("url") not in seen]
+            if not fresh:
+                continue
+            stored = True
+            for cat, sub, region in where:
+                try:
+                    added += upsert_articles(fresh, cat, sub, region, origin="rss")
+                except SQLAlchemyError:
+                    stored = False  # não marca como visto: a próxima rodada tenta de novo
+            if not stored:
+                continue
+            seen.update(it.get("url") for it in fresh)
+            feed_state.save_seen(url, seen.to_bytes())
+    return added
+
+
+def run_once(app=None, force: bool = False) -> dict:
+    """
+    Baixa os feeds cujo próximo poll já venceu (agenda adaptativa de
+    feed_health; hosts com circuito aberto ficam de fora) e atualiza o estado
+    compartilhado. `force` baixa todos. Com `app`, também grava os artigos
+    novos no bind "articles".
+    """
+    configured = sorted({u for _cat, _sub, _region, u in rss_client.iter_feed_urls()})
+    urls = configured if force else feed_health.due(configured)
+    t0 = time.monotonic()
+    _items, feeds = rss_client.fetch_feeds(
+        urls,
+        rss_client.STATE_MAX_ITEMS,
+        deadline=INGEST_DEADLINE,
+        feed_timeout=INGEST_FEED_TIMEOUT,
+    ) if urls else ([], [])
+    failed = [f for f in feeds if f["status"] != "ok"]
+    summary = {
+        "feeds": len(configured),
+        "polled": len(urls),
+        "ok": len(urls) - len(failed),
+        "failed": len(failed),
+        "elapsed_ms": int((time.monotonic() - t0) * 1000),
+        "errors": {f["url"]: f["error"] for f in failed},
+        "stored": _store_articles(app) if app is not None else 0,
+    }
+    feed_state.incr(ingest_runs=1, ingest_feed_failures=len(failed))
+    if urls:
+        log.info("ingestão RSS: %s/%s feeds ok (%s configurados) em %sms",
+                 summary["ok"], summary["polled"], summary["feeds"], summary["elapsed_ms"])
+    return summary
+
+
+def refresh_presets(app) -> int:
+    """
+    Atualização completa do painel da NewsAPI (`fetch_all_presets`, poucas
+    consultas pelo planejador) gravada no histórico. Retorna quantos presets
+    vieram com artigos. Sem NEWSAPI_KEY não faz nada.
+    """
+    from . import news_client
+    if not news_client.NEWSAPI_KEY:
+        return 0
+    with app.app_context():
+        results = news_client.fetch_all_presets()
+    filled = sum(1 for arts, _err in results.values() if arts)
+    log.info("presets NewsAPI: %s/%s com artigos", filled, len(results))
+    return filled
+
+
+# ==============================================================
+# 🗳️ Eleição de líder (lock de arquivo entre processos)
+# ==============================================================
+
+class LeaderLock:
+    """Lock exclusivo não-bloqueante; quem segura o arquivo é o líder."""
+
+    def __init__(self, path: str = LOCK_PATH):
+        self.path = resolve_data_path(path)
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+
+def run_forever(app=None, interval: int = INGEST_INTERVAL, stop: Optional[threading.Event] = None) -> None:
+    """
+    Loop de ingestão. Só executa rodadas enquanto for líder; os demais
+    processos ficam tentando assumir o lock a cada intervalo.
+    """
+    stop = stop or threading.Event()
+    lock = LeaderLock()
+    next_presets = 0.0
+    if app is not None:
+        from . import article_store, db
+        try:
+            with app.app_context():
+                db.create_all(bind_key="articles")  # idempotente; garante a tabela
+            article_store.ensure_schema(app)  # chave/colunas novas em bancos antigos
+        except Exception:
+            log.exception("não foi possível criar a tabela de artigos")
+    try:
+        while not stop.is_set():
+            if lock.try_acquire():
+                try:
+                    run_once(app)
+                except Exception:
+                    log.exception("falha na rodada de ingestão RSS")
+                if app is not None and NEWSAPI_REFRESH_INTERVAL > 0 and time.monotonic() >= next_presets:
+                    next_presets = time.monotonic() + NEWSAPI_REFRESH_INTERVAL
+                    try:
+                        refresh_presets(app)
+                    except Exception:
+                        log.exception("falha na atualização dos presets NewsAPI")
+            stop.wait(max(5, int(interval)))
+    finally:
+        lock.release()
+
+
+# ==============================================================
+# 🧵 Modo "worker": thread daemon iniciada no primeiro request
+# ==============================================================
+
+_started_pid: Optional[int] = None
+_start_lock = threading.Lock()
+
+
+def start_in_worker(app) -> bool:
+    """Inicia o loop numa thread daemon (uma vez por processo). Retorna True se iniciou."""
+    global _started_pid
+    if INGEST_MODE != "worker":
+        return False
+    pid = os.getpid()
+    if _started_pid == pid:
+        return False
+    with _start_lock:
+        if _started_pid == pid:
+            return False
+        _started_pid = pid
+    t = threading.Thread(target=run_forever, args=(app,), name="rss-ingest", daemon=True)
+    t.start()
+    return True
+
+
+# ==============================================================
+# 💻 CLI
+# ==============================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ingestão de feeds RSS do NewsTechApp")
+    parser.add_argument("--once", action="store_true", help="executa uma rodada e sai")
+    parser.add_argument("--all", action="store_true", help="com --once, ignora a agenda e baixa todos os feeds")
+    parser.add_argument("--interval", type=int, default=INGEST_INTERVAL,
+                        help="segundos entre rodadas no modo contínuo")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    from . import article_store, create_app, db
+    app = create_app()
+
+    if args.once:
+        with app.app_context():
+            db.create_all(bind_key="articles")
+        article_store.ensure_schema(app)
+        print(json.dumps(run_once(app, force=args.all), ensure_ascii=False, indent=2))
+        return 0
+
+    run_forever(app, args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
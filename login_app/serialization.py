@@ -0,0 +1,139 @@
+# login_app/serialization.py
+"""
+Serialização das respostas da API num lugar só.
+
+- `POST_COLUMNS`: só as colunas que a API devolve; consultas com
+  `db.session.query(*POST_COLUMNS)` trazem tuplas (Row), sem montar o objeto
+  ORM nem rastrear estado por linha.
+- `uploads_prefix()`: "https://host/uploads/" resolvido uma vez por request
+  (em vez de um url_for por post). Absoluto sai sempre em https, como o
+  `Post.to_dict` de antes (atrás do proxy o request chega em http).
+- `post_dict(p, prefix)`: mesmo dict para Row e para o modelo `Post`
+  (`Post.to_dict` e as rotas usam este).
+- `FastJSONProvider`: provider JSON do Flask com orjson (opcional; sem ele
+  usa o json da stdlib). Datetimes saem em ISO-8601 nos dois casos; os sem
+  fuso são UTC (é o que o SQLite grava) e ganham "+00:00". Antes saíam no
+  formato HTTP-date do provider padrão ("Wed, 01 Jan 2025 12:00:00 GMT").
+"""
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from flask import g, has_request_context, url_for
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem ela, json da stdlib
+    orjson = None
+
+from .models.post import Post
+
+POST_COLUMNS = (
+    Post.id,
+    Post.titulo,
+    Post.conteudo,
+    Post.autor,
+    Post.author_id,
+    Post.image_filename,
+    Post.criado_em,
+    Post.atualizado_em,
+)
+
+_PLACEHOLDER = "_"
+
+
+# ==============================================================
+# 🖼️ Prefixo das imagens
+# ==============================================================
+
+def uploads_prefix(external: bool = True) -> str:
+    """Prefixo da rota /uploads/<arquivo>, calculado uma vez por request."""
+    if not has_request_context():
+        return "/uploads/"
+    key = "_uploads_prefix_ext" if external else "_uploads_prefix_rel"
+    prefix = g.get(key)
+    if prefix is None:
+        url = url_for("uploads", filename=_PLACEHOLDER, _external=external,
+                      _scheme="https" if external else None)
+        prefix = url[: -len(_PLACEHOLDER)]
+        setattr(g, key, prefix)
+    return prefix
+
+
+def image_url(filename: Optional[str], prefix: str) -> Optional[str]:
+    return prefix + quote(filename) if filename else None
+
+
+# ==============================================================
+# 📝 Posts
+# ==============================================================
+
+def post_dict(p: Any, prefix: str) -> Dict[str, Any]:
+    """Forma pública do post; `p` é um `Post` ou uma Row de POST_COLUMNS."""
+    return {
+        "id": p.id,
+        "titulo": p.titulo,
+        "conteudo": p.conteudo,
+        "autor": p.autor,
+        "author_id": p.author_id,
+        "image_url": image_url(p.image_filename, prefix),
+        "criado_em": p.criado_em,
+        "atualizado_em": p.atualizado_em,
+    }
+
+
+def posts_list(rows: Iterable[Any], external: bool = True) -> List[Dict[str, Any]]:
+    prefix = uploads_prefix(external)
+    return [post_dict(p, prefix) for p in rows]
+
+
+# ==============================================================
+# ⚡ Provider JSON
+# ==============================================================
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    orjson no lugar do json da stdlib (mesmas chaves ordenadas do padrão).
+    Tipos que o orjson não conhece passam pelo `default` do provider padrão.
+    """
+
+    def _options(self) -> int:
+        opts = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        return opts
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs or orjson is None:  # indent/separators etc.: o caminho padrão respeita
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs or orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        return self._app.response_class(self._dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        # o orjson já cobre datetime; isto vale para o caminho da stdlib (indent)
+        if isinstance(o, dt.datetime):
+            return (o if o.tzinfo else o.replace(tzinfo=dt.timezone.utc)).isoformat()
+        if isinstance(o, dt.date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+def init_app(app) -> None:
+    app.json = FastJSONProvider(app)
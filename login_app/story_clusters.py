@@ -0,0 +1,185 @@
+# login_app/story_clusters.py
+"""
+Agrupamento incremental de notícias quase iguais (mesma história contada
+por fontes diferentes — RSS e NewsAPI).
+
+Cada artigo novo ganha uma assinatura MinHash (título + início da descrição)
+e é comparado, via índice LSH em memória, só com os vizinhos candidatos:
+custo constante por item. Achou parecido → herda o `cluster_id` do vizinho;
+senão abre um grupo novo (`cluster_id` = o próprio id).
+
+O índice vive no processo e é sincronizado pelo maior id já visto: antes de
+agrupar, carrega só os artigos gravados por outros processos desde a última
+vez (e, na primeira vez, a janela STORY_CLUSTER_WINDOW_H). Artigos antigos
+sem assinatura são agrupados nessa mesma passada.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+
+from . import db
+from .models.article import Article
+from .utils import minhash
+
+CLUSTER_THRESHOLD = float(os.getenv("STORY_CLUSTER_THRESHOLD", str(minhash.DEFAULT_THRESHOLD)))
+CLUSTER_WINDOW_H = int(os.getenv("STORY_CLUSTER_WINDOW_H", "72"))
+CLUSTER_INDEX_SIZE = int(os.getenv("STORY_CLUSTER_INDEX_SIZE", "50000"))
+# quantas outras fontes anexar a cada representante
+MAX_ALSO_COVERED = 8
+
+log = logging.getLogger(__name__)
+
+_index: Optional[minhash.LSHIndex] = None
+_index_pid: Optional[int] = None
+_last_id = 0
+_lock = threading.Lock()
+
+
+def _get_index() -> minhash.LSHIndex:
+    global _index, _index_pid, _last_id
+    pid = os.getpid()
+    if _index is None or _index_pid != pid:
+        _index = minhash.LSHIndex(threshold=CLUSTER_THRESHOLD, capacity=CLUSTER_INDEX_SIZE)
+        _index_pid = pid
+        _last_id = 0
+    return _index
+
+
+def _place(index: minhash.LSHIndex, a: Article) -> bool:
+    """Calcula assinatura/grupo de `a` (se faltar) e o coloca no índice. True se mudou."""
+    changed = False
+    sig = minhash.from_bytes(a.signature)
+    if sig is None and a.cluster_id is None:
+        sig = minhash.signature(a.title, a.description)
+        if sig is not None:
+            a.signature = minhash.to_bytes(sig)
+        changed = True
+    if a.cluster_id is None:
+        hit = index.query(sig) if sig is not None else None
+        a.cluster_id = hit[1] if hit is not None else a.id
+        changed = True
+    if sig is not None:
+        index.add(a.id, sig, a.cluster_id)
+    return changed
+
+
+def _sync(index: minhash.LSHIndex, skip: Iterable[int] = ()) -> None:
+    """Traz para o índice o que outros processos gravaram desde o último id visto."""
+    global _last_id
+    q = Article.query.filter(Article.id > _last_id)
+    skip = list(skip)
+    if skip:
+        q = q.filter(Article.id.notin_(skip))
+    if _last_id == 0:
+        since = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None) - dt.timedelta(hours=CLUSTER_WINDOW_H)
+        q = q.filter(Article.fetched_at >= since)
+    changed = 0
+    for a in q.order_by(Article.id).yield_per(500):
+        changed += _place(index, a)
+        _last_id = max(_last_id, a.id)
+    if changed:
+        db.session.flush()  # o commit é de quem chamou (upsert_articles)
+
+
+def discard() -> None:
+    """
+    Esquece o índice do processo (o próximo `assign` recarrega a janela do
+    banco). Para quando a transação que chamou `assign` é desfeita: o índice
+    teria ids e grupos que não foram gravados.
+    """
+    global _index, _index_pid, _last_id
+    with _lock:
+        _index, _index_pid, _last_id = None, None, 0
+
+
+def assign(articles: Iterable[Article]) -> int:
+    """
+    Agrupa artigos recém-inseridos (já com id, ou seja, após flush).
+    Só faz flush: roda dentro da transação de quem chamou, que decide o commit.
+    Retorna quantos entraram num grupo já existente.
+    """
+    global _last_id
+    articles = sorted(articles, key=lambda x: x.id)
+    joined = 0
+    with _lock:
+        index = _get_index()
+        _sync(index, skip=[a.id for a in articles])
+        for a in articles:
+            _place(index, a)
+            joined += a.cluster_id != a.id
+            _last_id = max(_last_id, a.id)
+    return joined
+
+
+def also_covered(rows: List[Article]) -> Dict[int, List[dict]]:
+    """
+    {id do artigo exibido: outras fontes da mesma história}, numa consulta só
+    para a página inteira. O limite é por grupo (janela ROW_NUMBER), então um
+    grupo grande não tira espaço dos outros.
+    """
+    clusters = {a.cluster_id for a in rows if a.cluster_id is not None}
+    if not clusters:
+        return {}
+    # a mesma URL pode estar em várias timelines (uma linha por posição):
+    # conta uma vez e nunca como "outra fonte" de um artigo exibido
+    shown_keys = {a.url_key for a in rows}
+    newest_first = (Article.published_at.desc(), Article.id.desc())
+    per_url = (
+        db.session.query(
+            Article.cluster_id, Article.source, Article.url, Article.title, Article.published_at, Article.id,
+            func.row_number().over(
+                partition_by=(Article.cluster_id, Article.url_key), order_by=newest_first
+            ).label("dup"),
+        )
+        .filter(Article.cluster_id.in_(clusters), Article.url_key.notin_(shown_keys))
+        .subquery()
+    )
+    ranked = (
+        db.session.query(
+            per_url.c.cluster_id, per_url.c.source, per_url.c.url, per_url.c.title,
+            func.row_number().over(
+                partition_by=per_url.c.cluster_id,
+                order_by=(per_url.c.published_at.desc(), per_url.c.id.desc()),
+            ).label("rn"),
+        )
+        .filter(per_url.c.dup == 1)
+        .subquery()
+    )
+    members = (
+        db.session.query(ranked.c.cluster_id, ranked.c.source, ranked.c.url, ranked.c.title)
+        .filter(ranked.c.rn <= MAX_ALSO_COVERED)
+        .order_by(ranked.c.cluster_id, ranked.c.rn)
+        .all()
+    )
+    by_cluster: Dict[int, List[dict]] = {}
+    for cid, source, url, title in members:
+        by_cluster.setdefault(cid, []).append({"source": source, "url": url, "title": title})
+    return {a.id: by_cluster[a.cluster_id] for a in rows if a.cluster_id in by_cluster}
+
+
+def ensure_schema(app) -> None:
+    """
+    Garante as colunas/índice de agrupamento em bancos de artigos criados
+    antes delas (idempotente; a tabela inteira vem do create_all).
+    """
+    with app.app_context():
+        engine = db.engines["articles"]
+        Article.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            cols = {row[1] for row in conn.execute(text("PRAGMA table_info(articles)"))}
+            for name, ddl in (("signature", "BLOB"), ("cluster_id", "INTEGER")):
+                if name not in cols:
+                    try:
+                        conn.execute(text(f"ALTER TABLE articles ADD COLUMN {name} {ddl}"))
+                    except OperationalError:
+                        pass  # outro worker adicionou ao mesmo tempo
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_articles_cluster ON articles (cluster_id, id)"
+            ))
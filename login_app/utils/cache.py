@@ -0,0 +1,166 @@
+# login_app/utils/cache.py
+"""
+Cache em memória (por processo) com TTL + LRU, stale-while-revalidate
+e single-flight.
+
+- Entradas frescas (< ttl) são servidas direto ("HIT").
+- Entradas vencidas mas dentro de `stale_ttl` são servidas na hora ("STALE")
+  enquanto UMA thread em background recarrega o valor.
+- Misses concorrentes para a mesma chave viram uma única chamada ao loader:
+  o primeiro busca ("MISS"), os demais esperam o resultado ("COALESCED").
+- Opcionalmente limita a memória (`max_bytes` + `sizeof`), despejando por LRU.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+HIT = "HIT"
+MISS = "MISS"
+STALE = "STALE"
+COALESCED = "COALESCED"
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+TTL = Union[float, Callable[[Any], float]]
+
+
+class TTLCache:
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 60.0,
+        stale_ttl: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._sizeof = sizeof or (lambda _v: 0)
+        self._bytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, float, int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {HIT: 0, MISS: 0, STALE: 0, COALESCED: 0, "evictions": 0, "refresh_errors": 0}
+
+    # ---------- internos ----------
+    def _pop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def _store(self, key: Hashable, value: Any, ttl: float, size: int) -> None:
+        """Grava e aplica LRU (por quantidade e por bytes). Chamar com o lock adquirido."""
+        now = time.monotonic()
+        self._pop(key)
+        self._data[key] = (value, now + ttl, now + ttl + self.stale_ttl, size)
+        self._bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+        ):
+            old_key = next(iter(self._data))
+            self._pop(old_key)
+            self._stats["evictions"] += 1
+
+    def _load(self, key, loader, flight, ttl: TTL, cacheable) -> None:
+        try:
+            value = loader()
+            flight.value = value
+            if cacheable is None or cacheable(value):
+                ttl_v = ttl(value) if callable(ttl) else ttl
+                size = self._sizeof(value) if self.max_bytes is not None else 0
+                if ttl_v > 0:
+                    with self._lock:
+                        self._store(key, value, ttl_v, size)
+        except Exception as e:  # repassa o erro para quem está esperando
+            flight.error = e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _refresh_in_background(self, key, loader, flight, ttl, cacheable) -> None:
+        def _run():
+            self._load(key, loader, flight, ttl, cacheable)
+            if flight.error is not None:
+                with self._lock:
+                    self._stats["refresh_errors"] += 1
+
+        threading.Thread(target=_run, name="cache-refresh", daemon=True).start()
+
+    # ---------- API ----------
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[TTL] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        wait_timeout: Optional[float] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Retorna (valor, status) — status é HIT, STALE, MISS ou COALESCED.
+        `ttl` pode ser um número ou uma função do valor carregado (ex.: TTL curto
+        para respostas vazias). `cacheable(valor)` pode recusar resultados.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, fresh_until, stale_until, _size = entry
+                if now < fresh_until:
+                    self._data.move_to_end(key)
+                    self._stats[HIT] += 1
+                    return value, HIT
+                if now < stale_until:
+                    self._data.move_to_end(key)
+                    self._stats[STALE] += 1
+                    if key not in self._inflight:
+                        flight = _Flight()
+                        self._inflight[key] = flight
+                        self._refresh_in_background(key, loader, flight, ttl, cacheable)
+                    return value, STALE
+                self._pop(key)
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._stats[MISS] += 1
+            else:
+                self._stats[COALESCED] += 1
+
+        if leader:
+            self._load(key, loader, flight, ttl, cacheable)
+        elif not flight.event.wait(wait_timeout):
+            # quem buscava demorou demais: busca por conta própria
+            return loader(), MISS
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value, MISS if leader else COALESCED
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._bytes = 0
+            else:
+                self._pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._data), maxsize=self.maxsize, bytes=self._bytes)
@@ -4,7 +4,7 @@ import jwt
 from typing import Optional, Dict, Any
 from flask import current_app
 from functools import wraps
-from flask import session, jsonify, g
+from flask import session, jsonify, g, request
 # imports de tipos
 from typing import Optional
 
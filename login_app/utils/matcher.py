@@ -0,0 +1,111 @@
+# login_app/utils/matcher.py
+"""
+Busca de várias palavras-chave num texto em uma única passada (Aho-Corasick).
+
+- Sem diferença de caixa nem de acento: "inteligencia" casa com "Inteligência"
+  (casefold + remoção de diacríticos nos dois lados).
+- Mesma semântica de `k in texto`: casa substrings, sem exigir palavra inteira.
+- `find(texto)` devolve quais palavras apareceram; `matches(texto, "AND"|"OR")`
+  responde direto.
+
+O autômato é montado uma vez por conjunto de palavras (`compile_keywords`
+guarda os mais usados), então checar o mesmo artigo contra vários presets
+não repete trabalho.
+"""
+from __future__ import annotations
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+def fold(text: str) -> str:
+    """Forma normalizada para comparação: casefold e sem acentos."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+class KeywordMatcher:
+    __slots__ = ("keywords", "_goto", "_fail", "_out")
+
+    def __init__(self, keywords: Iterable[str]):
+        # mantém a ordem e descarta vazios/repetidos (após normalizar)
+        seen: Dict[str, str] = {}
+        for k in keywords:
+            f = fold((k or "").strip())
+            if f and f not in seen:
+                seen[f] = k.strip()
+        self.keywords: Tuple[str, ...] = tuple(seen.values())
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[FrozenSet[int]] = [frozenset()]
+        for idx, word in enumerate(seen):
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(frozenset())
+                state = nxt
+            self._out[state] = self._out[state] | {idx}
+        self._fail = [0] * len(self._goto)
+        self._build_failures()
+
+    def _build_failures(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find_indexes(self, text: str) -> FrozenSet[int]:
+        """Índices (em `keywords`) das palavras presentes no texto."""
+        goto, fail, out = self._goto, self._fail, self._out
+        total = len(self.keywords)
+        found = set()
+        state = 0
+        for ch in fold(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+                if len(found) == total:
+                    break
+        return frozenset(found)
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Palavras (como foram informadas) presentes no texto."""
+        return frozenset(self.keywords[i] for i in self.find_indexes(text))
+
+    def matches(self, text: str, mode: str = "AND") -> bool:
+        if not self.keywords:
+            return True
+        found = self.find_indexes(text)
+        if (mode or "AND").upper() == "AND":
+            return len(found) == len(self.keywords)
+        return bool(found)
+
+
+@lru_cache(maxsize=512)
+def _compile(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def compile_keywords(keywords: Iterable[str]) -> KeywordMatcher:
+    """Matcher (reaproveitado) para o conjunto de palavras."""
+    return _compile(tuple(keywords))
@@ -0,0 +1,193 @@
+# login_app/utils/minhash.py
+"""
+Assinaturas MinHash + índice LSH para achar notícias quase iguais.
+
+- `signature(title, description)`: conjunto de palavras (sem caixa/acentos,
+  sem stopwords) do título + início da descrição → NUM_PERM mínimos.
+- `similarity(a, b)`: fração de mínimos iguais ≈ Jaccard dos conjuntos.
+- `LSHIndex`: assinaturas cortadas em BANDS faixas; duas notícias viram
+  candidatas se coincidirem numa faixa inteira. Cada balde guarda no máximo
+  `bucket_size` chaves e o índice no máximo `capacity` — busca e inserção
+  em tempo constante, independente do tamanho do histórico.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import struct
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .matcher import fold
+
+NUM_PERM = 64
+BANDS = 32  # 32 faixas x 2 linhas: candidato quase certo a partir de Jaccard ~0.35
+# similaridade mínima para juntar: a mesma história recontada fica em ~0.5-0.65;
+# histórias vizinhas do mesmo assunto (RTX 5090 x RX 9070) chegam a ~0.35-0.4
+DEFAULT_THRESHOLD = 0.45
+ROWS = NUM_PERM // BANDS
+DESC_TOKENS = 30
+MIN_TOKENS = 4
+
+_MERSENNE = (1 << 61) - 1
+_MAX32 = (1 << 32) - 1
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+
+
+def _perms() -> List[Tuple[int, int]]:
+    out = []
+    for i in range(NUM_PERM):
+        d = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", d)
+        out.append(((a % (_MERSENNE - 1)) + 1, b % _MERSENNE))
+    return out
+
+
+_PERMS = _perms()
+
+_WORD = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    # pt
+    "que com para por uma como mais mas dos das nos nas pelo pela sobre entre sem ser sao esta "
+    "este essa esse isso ate apos tem vai seu sua seus suas ele ela eles elas foi sera ja nao "
+    # en
+    "the and for with from that this are was were will has have its into about after over "
+    "new how why what when you your our not but can now".split()
+)
+
+
+def tokens(title: Optional[str], description: Optional[str] = None) -> frozenset:
+    words = _WORD.findall(fold(title or ""))
+    words += _WORD.findall(fold(description or ""))[:DESC_TOKENS]
+    return frozenset(w for w in words if (len(w) >= 3 or w.isdigit()) and w not in _STOPWORDS)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def signature(title: Optional[str], description: Optional[str] = None) -> Optional[Tuple[int, ...]]:
+    """Assinatura MinHash; None se o texto tem palavras de menos para comparar."""
+    toks = tokens(title, description)
+    if len(toks) < MIN_TOKENS:
+        return None
+    hashes = [_token_hash(t) for t in toks]
+    return tuple(
+        min((a * h + b) % _MERSENNE for h in hashes) & _MAX32
+        for a, b in _PERMS
+    )
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def to_bytes(sig: Tuple[int, ...]) -> bytes:
+    return _PACK.pack(*sig)
+
+
+def from_bytes(blob: Optional[bytes]) -> Optional[Tuple[int, ...]]:
+    if not blob or len(blob) != _PACK.size:
+        return None
+    return _PACK.unpack(blob)
+
+
+# ==============================================================
+# 🗂️ Índice LSH
+# ==============================================================
+
+class LSHIndex:
+    """Chave → (assinatura, grupo). `query` devolve o vizinho mais parecido acima do limiar."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bucket_size: int = 16, capacity: int = 50000):
+        self.threshold = threshold
+        self.bucket_size = bucket_size
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], deque] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @staticmethod
+    def _bands(sig: Tuple[int, ...]):
+        for i in range(BANDS):
+            yield i, sig[i * ROWS:(i + 1) * ROWS]
+
+    def add(self, key: Hashable, sig: Tuple[int, ...], group: Any = None) -> None:
+        if key in self._entries:
+            return
+        self._entries[key] = (sig, key if group is None else group)
+        for band in self._bands(sig):
+            bucket = self._buckets.get(band)
+            if bucket is None:
+                bucket = self._buckets[band] = deque(maxlen=self.bucket_size)
+            bucket.append(key)
+        if len(self._entries) > self.capacity:
+            old, (old_sig, _g) = self._entries.popitem(last=False)
+            for band in self._bands(old_sig):
+                bucket = self._buckets.get(band)
+                if bucket is not None and not any(k in self._entries for k in bucket):
+                    del self._buckets[band]
+
+    def query(self, sig: Tuple[int, ...]) -> Optional[Tuple[Hashable, Any, float]]:
+        """(chave, grupo, similaridade) do candidato mais parecido, ou None."""
+        best = None
+        checked = set()
+        for band in self._bands(sig):
+            for key in self._buckets.get(band, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue  # expulso por capacidade
+                sim = similarity(sig, entry[0])
+                if sim >= self.threshold and (best is None or sim > best[2]):
+                    best = (key, entry[1], sim)
+        return best
+
+
+# ==============================================================
+# 🧺 Agrupamento de uma lista em memória (ex.: resultado da NewsAPI)
+# ==============================================================
+
+def _source_name(item: Dict[str, Any]) -> str:
+    src = item.get("source")
+    if isinstance(src, dict):
+        src = src.get("name")
+    return src or ""
+
+
+def _with_coverage(item: Any, covered: List[Dict[str, Any]]) -> Any:
+    # registros compactos (news_client.NewsItem) sabem se copiar; dicts viram cópia
+    if hasattr(item, "with_coverage"):
+        return item.with_coverage(covered)
+    return {**item, "alsoCoveredBy": covered}
+
+
+def collapse(items: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Mantém o primeiro item de cada grupo de quase-duplicatas (na ordem
+    recebida); o representante volta como cópia com `alsoCoveredBy` (as
+    outras fontes). Os itens de entrada não são alterados.
+    """
+    index = LSHIndex(threshold=threshold, capacity=max(1, len(items)))
+    out: List[Dict[str, Any]] = []
+    covered: Dict[int, List[Dict[str, Any]]] = {}
+    for n, item in enumerate(items):
+        sig = signature(item.get("title"), item.get("description"))
+        if sig is not None:
+            hit = index.query(sig)
+            if hit is not None:
+                covered.setdefault(hit[1], []).append(
+                    {"source": _source_name(item), "url": item.get("url"), "title": item.get("title")}
+                )
+                index.add(n, sig, hit[1])  # membros também atraem os próximos
+                continue
+            index.add(n, sig, len(out))
+        out.append(item)
+    return [_with_coverage(it, covered[i]) if i in covered else it for i, it in enumerate(out)]
@@ -0,0 +1,15 @@
+# login_app/utils/paths.py
+import os
+import tempfile
+
+
+def resolve_data_path(path: str) -> str:
+    """Usa o diretório pedido (/data); em dev cai para o diretório temporário."""
+    folder = os.path.dirname(path) or "."
+    try:
+        os.makedirs(folder, exist_ok=True)
+        if os.access(folder, os.W_OK):
+            return path
+    except OSError:
+        pass
+    return os.path.join(tempfile.gettempdir(), os.path.basename(path))
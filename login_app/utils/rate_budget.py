@@ -0,0 +1,211 @@
+# login_app/utils/rate_budget.py
+"""
+Orçamento de chamadas à NewsAPI compartilhado entre os workers.
+
+- Cota diária (UTC) + token bucket para suavizar rajadas.
+- Prioridades: tráfego interativo (/buscar-chat) pode usar a cota inteira;
+  tarefas em background (presets, ingestão) param antes, deixando uma
+  reserva para os usuários.
+- Gasto por endpoint/prioridade registrado por dia.
+- Depois de um 429, bloqueia todas as chamadas até o Retry-After (ou o
+  próximo dia UTC, se a origem não disser).
+
+Estado em SQLite no /data; cada decisão é uma transação IMMEDIATE, então
+dois processos nunca gastam o mesmo token.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .paths import resolve_data_path
+
+log = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+BUDGET_DB_PATH = os.getenv("NEWSAPI_BUDGET_DB", "/data/newsapi_budget.db")
+DAILY_LIMIT = int(os.getenv("NEWSAPI_DAILY_LIMIT", "100"))
+# fração da cota diária que o background não pode tocar
+INTERACTIVE_RESERVE = float(os.getenv("NEWSAPI_INTERACTIVE_RESERVE", "0.3"))
+BURST = float(os.getenv("NEWSAPI_BURST", "10"))
+REFILL_PER_SEC = float(os.getenv("NEWSAPI_REFILL_PER_SEC", "0.5"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS budget_state (
+    id             INTEGER PRIMARY KEY CHECK (id = 1),
+    day            TEXT NOT NULL,
+    used           INTEGER NOT NULL DEFAULT 0,
+    tokens         REAL NOT NULL,
+    updated_at     REAL NOT NULL,
+    blocked_until  REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS budget_spend (
+    day       TEXT NOT NULL,
+    endpoint  TEXT NOT NULL,
+    priority  TEXT NOT NULL,
+    calls     INTEGER NOT NULL DEFAULT 0,
+    denied    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, endpoint, priority)
+);
+"""
+
+
+def _today() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d")
+
+
+def _next_utc_midnight() -> float:
+    now = dt.datetime.now(dt.timezone.utc)
+    tomorrow = (now + dt.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+
+class RateBudget:
+    def __init__(
+        self,
+        path: str = BUDGET_DB_PATH,
+        daily_limit: int = DAILY_LIMIT,
+        reserve: float = INTERACTIVE_RESERVE,
+        burst: float = BURST,
+        refill_per_sec: float = REFILL_PER_SEC,
+    ):
+        self.path = path
+        self.daily_limit = int(daily_limit)
+        self.reserve = max(0.0, min(float(reserve), 1.0))
+        self.burst = float(burst)
+        self.refill_per_sec = float(refill_per_sec)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        c = getattr(self._local, "conn", None)
+        if c is None or getattr(self._local, "pid", None) != pid:
+            c = sqlite3.connect(resolve_data_path(self.path), timeout=10, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.executescript(_SCHEMA)
+            c.execute(
+                "INSERT OR IGNORE INTO budget_state (id, day, used, tokens, updated_at) VALUES (1, ?, 0, ?, ?)",
+                (_today(), self.burst, time.time()),
+            )
+            self._local.conn = c
+            self._local.pid = pid
+        return c
+
+    def _limits(self, priority: str):
+        """(teto diário, tokens mínimos que devem sobrar) para a prioridade."""
+        if priority == BACKGROUND:
+            return int(self.daily_limit * (1.0 - self.reserve)), self.burst / 2
+        return self.daily_limit, 0.0
+
+    def _count(self, c, day: str, endpoint: str, priority: str, column: str) -> None:
+        c.execute(
+            f"INSERT INTO budget_spend (day, endpoint, priority, {column}) VALUES (?, ?, ?, 1) "
+            f"ON CONFLICT(day, endpoint, priority) DO UPDATE SET {column} = {column} + 1",
+            (day, endpoint, priority),
+        )
+
+    def try_acquire(self, endpoint: str, priority: str = INTERACTIVE, cost: int = 1) -> bool:
+        """Reserva `cost` chamadas se houver cota/tokens para a prioridade."""
+        now = time.time()
+        today = _today()
+        try:
+            c = self._conn()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                day, used, tokens, updated_at, blocked_until = c.execute(
+                    "SELECT day, used, tokens, updated_at, blocked_until FROM budget_state WHERE id = 1"
+                ).fetchone()
+                if day != today:
+                    day, used = today, 0
+                tokens = min(self.burst, tokens + (now - updated_at) * self.refill_per_sec)
+
+                daily_cap, min_tokens = self._limits(priority)
+                ok = (
+                    now >= blocked_until
+                    and used + cost <= daily_cap
+                    and tokens - cost >= min_tokens
+                )
+                if ok:
+                    used += cost
+                    tokens -= cost
+                c.execute(
+                    "UPDATE budget_state SET day = ?, used = ?, tokens = ?, updated_at = ? WHERE id = 1",
+                    (day, used, tokens, now),
+                )
+                self._count(c, today, endpoint, priority, "calls" if ok else "denied")
+                c.execute("COMMIT")
+                return ok
+            except Exception:
+                c.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # se o controle falhar, não derruba a busca do usuário
+            log.warning("rate budget indisponível: %s", e)
+            return priority == INTERACTIVE
+
+    def record_429(self, retry_after: Optional[str] = None) -> None:
+        """A origem recusou por limite: bloqueia até o Retry-After ou o próximo dia UTC."""
+        until = _next_utc_midnight()
+        try:
+            if retry_after:
+                until = time.time() + float(retry_after)
+        except ValueError:
+            pass
+        try:
+            self._conn().execute(
+                "UPDATE budget_state SET blocked_until = MAX(blocked_until, ?) WHERE id = 1", (until,)
+            )
+        except sqlite3.Error as e:
+            log.warning("rate budget: falha ao registrar 429: %s", e)
+
+    def refill_wait(self, priority: str = INTERACTIVE, cost: int = 1) -> float:
+        """Segundos até o token bucket ter `cost` tokens livres para a prioridade."""
+        _, min_tokens = self._limits(priority)
+        missing = cost + min_tokens - self.stats().get("tokens", self.burst)
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_per_sec if self.refill_per_sec > 0 else float("inf")
+
+    def exhausted(self, priority: str = INTERACTIVE) -> bool:
+        """True se a prioridade não tem mais cota hoje (ou está bloqueada por 429)."""
+        s = self.stats()
+        daily_cap, _ = self._limits(priority)
+        return s["blocked"] or s["used"] >= daily_cap
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            c = self._conn()
+            day, used, tokens, updated_at, blocked_until = c.execute(
+                "SELECT day, used, tokens, updated_at, blocked_until FROM budget_state WHERE id = 1"
+            ).fetchone()
+            today = _today()
+            if day != today:
+                used = 0
+            rows = c.execute(
+                "SELECT endpoint, priority, calls, denied FROM budget_spend WHERE day = ?", (today,)
+            ).fetchall()
+        except sqlite3.Error:
+            return {"used": 0, "daily_limit": self.daily_limit, "blocked": False, "spend": []}
+        now = time.time()
+        return {
+            "day": today,
+            "used": used,
+            "daily_limit": self.daily_limit,
+            "background_limit": self._limits(BACKGROUND)[0],
+            "tokens": round(min(self.burst, tokens + (now - updated_at) * self.refill_per_sec), 2),
+            "blocked": now < blocked_until,
+            "blocked_until": blocked_until if now < blocked_until else None,
+            "spend": [
+                {"endpoint": e, "priority": p, "calls": n, "denied": d} for e, p, n, d in rows
+            ],
+        }
+
+
+budget = RateBudget()
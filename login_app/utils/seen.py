@@ -0,0 +1,109 @@
+# login_app/utils/seen.py
+"""
+Conjunto compacto de IDs já vistos (por feed).
+
+- Janela exata com os IDs mais recentes (hash de 8 bytes cada): sem falso
+  positivo para o que o feed costuma repetir a cada poll.
+- Bloom filter rotativo (duas gerações) para a memória longa: quando a
+  geração atual enche, a anterior é descartada — o tamanho fica fixo e IDs
+  muito antigos acabam "esquecidos" em vez de saturar o filtro.
+
+Serializa para bytes (`to_bytes` / `from_bytes`) para morar no SQLite.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import struct
+from collections import deque
+from typing import Iterable, Optional
+
+_HEADER = struct.Struct("<BIIBII")  # versão, bits, capacidade, k, itens na geração, tamanho da janela
+_VERSION = 1
+
+
+def _hash(value: str) -> bytes:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+
+class SeenSet:
+    def __init__(self, capacity: int = 2048, error_rate: float = 0.001, window: int = 256):
+        self.capacity = max(1, int(capacity))
+        bits = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.bits = (bits + 7) // 8 * 8
+        self.k = max(1, round(self.bits / self.capacity * math.log(2)))
+        self._cur = bytearray(self.bits // 8)
+        self._prev = bytearray(self.bits // 8)
+        self._count = 0
+        self._window: deque = deque(maxlen=max(1, int(window)))
+        self._window_set = set()
+
+    # ---------- bloom ----------
+    def _positions(self, digest: bytes):
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        for i in range(self.k):
+            yield (h1 + i * h2) % self.bits
+
+    @staticmethod
+    def _test(bitmap: bytearray, positions) -> bool:
+        return all(bitmap[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    # ---------- API ----------
+    def __contains__(self, value: str) -> bool:
+        if not value:
+            return False
+        digest = _hash(value)
+        if digest[:8] in self._window_set:
+            return True
+        pos = list(self._positions(digest))
+        return self._test(self._cur, pos) or self._test(self._prev, pos)
+
+    def add(self, value: str) -> None:
+        if not value:
+            return
+        digest = _hash(value)
+        short = digest[:8]
+        if short not in self._window_set:
+            if len(self._window) == self._window.maxlen:
+                self._window_set.discard(self._window[0])
+            self._window.append(short)
+            self._window_set.add(short)
+
+        pos = list(self._positions(digest))
+        if self._test(self._cur, pos):
+            return
+        if self._count >= self.capacity:
+            self._prev, self._cur = self._cur, bytearray(self.bits // 8)
+            self._count = 0
+        for p in pos:
+            self._cur[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def update(self, values: Iterable[str]) -> None:
+        for v in values:
+            self.add(v)
+
+    # ---------- serialização ----------
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_VERSION, self.bits, self.capacity, self.k, self._count, self._window.maxlen)
+        return header + bytes(self._cur) + bytes(self._prev) + b"".join(self._window)
+
+    @classmethod
+    def from_bytes(cls, blob: Optional[bytes], **defaults) -> "SeenSet":
+        """Reconstrói; blob vazio/inválido → conjunto novo."""
+        if not blob or len(blob) < _HEADER.size:
+            return cls(**defaults)
+        version, bits, capacity, k, count, window = _HEADER.unpack_from(blob)
+        size = bits // 8
+        if version != _VERSION or len(blob) < _HEADER.size + 2 * size:
+            return cls(**defaults)
+        s = cls.__new__(cls)
+        s.capacity, s.bits, s.k, s._count = capacity, bits, k, count
+        off = _HEADER.size
+        s._cur = bytearray(blob[off:off + size])
+        s._prev = bytearray(blob[off + size:off + 2 * size])
+        rest = blob[off + 2 * size:]
+        s._window = deque((rest[i:i + 8] for i in range(0, len(rest) - 7, 8)), maxlen=window)
+        s._window_set = set(s._window)
+        return s
@@ -0,0 +1,255 @@
+# login_app/utils/shared_cache.py
+"""
+Cache compartilhado entre processos (workers do gunicorn), sem serviço externo.
+
+- Armazenamento: SQLite (WAL) no volume persistente /data — cada gravação é
+  uma transação, então leitores nunca veem valor pela metade.
+- Valores: JSON compacto, comprimido com zlib quando passa de ~1 KB.
+- Limite por tamanho: ao passar de `max_bytes`, remove as entradas menos
+  acessadas recentemente.
+- Single-flight entre processos: lock de arquivo (fcntl) por chave; só um
+  processo recarrega uma chave por vez, os outros esperam e reaproveitam.
+
+Obs.: como é JSON, tuplas voltam como listas.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .cache import COALESCED, HIT, MISS, STALE
+from .paths import resolve_data_path
+
+log = logging.getLogger(__name__)
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_DB", "/data/shared_cache.db")
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_COMPRESS_MIN = 1024
+_TOUCH_EVERY = 30.0  # s — evita uma escrita por leitura só para atualizar o LRU
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key          TEXT PRIMARY KEY,
+    value        BLOB NOT NULL,
+    compressed   INTEGER NOT NULL DEFAULT 0,
+    size         INTEGER NOT NULL,
+    expires_at   REAL NOT NULL,
+    stale_until  REAL NOT NULL,
+    accessed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed_at);
+"""
+
+
+def _encode(value: Any) -> Tuple[bytes, int]:
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) >= _COMPRESS_MIN:
+        return zlib.compress(raw, 6), 1
+    return raw, 0
+
+
+def _decode(blob: bytes, compressed: int) -> Any:
+    if compressed:
+        blob = zlib.decompress(blob)
+    return json.loads(blob)
+
+
+class _KeyLock:
+    """Lock exclusivo entre processos para uma chave (arquivo + flock)."""
+
+    def __init__(self, folder: str, key: str):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        self.path = os.path.join(folder, f"{name}.lock")
+        self.fd: Optional[int] = None
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """timeout=0 → tentativa única; None → espera indefinidamente."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.fd = fd
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(0.05)
+
+    def release(self) -> None:
+        if self.fd is not None:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self.fd)
+                self.fd = None
+
+
+class SharedCache:
+    def __init__(self, path: str = SHARED_CACHE_PATH, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self._local = threading.local()
+        self._lock_dir: Optional[str] = None
+
+    # ---------- conexão / locks ----------
+    def _conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        c = getattr(self._local, "conn", None)
+        if c is None or getattr(self._local, "pid", None) != pid:
+            c = sqlite3.connect(resolve_data_path(self.path), timeout=10, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            c.executescript(_SCHEMA)
+            self._local.conn = c
+            self._local.pid = pid
+        return c
+
+    def _key_lock(self, key: str) -> _KeyLock:
+        if self._lock_dir is None:
+            folder = os.path.join(os.path.dirname(resolve_data_path(self.path)), "cache_locks")
+            os.makedirs(folder, exist_ok=True)
+            self._lock_dir = folder
+        return _KeyLock(self._lock_dir, key)
+
+    # ---------- leitura / escrita ----------
+    def get(self, key: str) -> Tuple[Any, Optional[str]]:
+        """Retorna (valor, estado) — estado "fresh", "stale" ou None (ausente/expirado)."""
+        try:
+            c = self._conn()
+            row = c.execute(
+                "SELECT value, compressed, expires_at, stale_until, accessed_at FROM cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None, None
+            blob, compressed, expires_at, stale_until, accessed_at = row
+            now = time.time()
+            if now >= stale_until:
+                return None, None
+            if now - accessed_at > _TOUCH_EVERY:
+                c.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return _decode(blob, compressed), ("fresh" if now < expires_at else "stale")
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            log.warning("shared cache: falha ao ler %s: %s", key, e)
+            return None, None
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        blob, compressed = _encode(value)
+        now = time.time()
+        try:
+            c = self._conn()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                c.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, compressed, size, expires_at, stale_until, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, blob, compressed, len(blob), now + ttl, now + ttl + stale_ttl, now),
+                )
+                self._evict(c, now)
+                c.execute("COMMIT")
+            except Exception:
+                c.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            log.warning("shared cache: falha ao gravar %s: %s", key, e)
+
+    def _evict(self, c: sqlite3.Connection, now: float) -> None:
+        """Remove expirados e, se ainda acima do limite, os menos acessados."""
+        c.execute("DELETE FROM cache WHERE stale_until <= ?", (now,))
+        total = c.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * 0.9)  # folga para não despejar a cada set
+        freed = 0
+        victims = []
+        for key, size in c.execute("SELECT key, size FROM cache ORDER BY accessed_at ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        c.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+
+    # ---------- get-or-load com single-flight entre processos ----------
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float = 0.0,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        lock_timeout: float = 15.0,
+    ) -> Tuple[Any, str]:
+        """
+        Retorna (valor, status) — HIT, STALE, MISS ou COALESCED (outro processo
+        carregou enquanto esperávamos o lock).
+        """
+        value, state = self.get(key)
+        if state == "fresh":
+            return value, HIT
+        if state == "stale":
+            self._refresh_in_background(key, loader, ttl, stale_ttl, cacheable)
+            return value, STALE
+
+        lock = self._key_lock(key)
+        got = lock.acquire(timeout=lock_timeout)
+        try:
+            if got:
+                value, state = self.get(key)
+                if state == "fresh":
+                    return value, COALESCED
+            value = loader()
+            if cacheable is None or cacheable(value):
+                self.set(key, value, ttl, stale_ttl)
+            return value, MISS
+        finally:
+            if got:
+                lock.release()
+
+    def _refresh_in_background(self, key, loader, ttl, stale_ttl, cacheable) -> None:
+        lock = self._key_lock(key)
+        if not lock.acquire(timeout=0):
+            return  # outro processo/thread já está recarregando
+
+        def _run():
+            try:
+                value = loader()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, ttl, stale_ttl)
+            except Exception as e:
+                log.warning("shared cache: refresh de %s falhou: %s", key, e)
+            finally:
+                lock.release()
+
+        threading.Thread(target=_run, name="shared-cache-refresh", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            n, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        except sqlite3.Error:
+            n, total = 0, 0
+        return {"entries": n, "bytes": total, "max_bytes": self.max_bytes}
+
+
+shared_cache = SharedCache()
+
+
+def make_key(*parts: Any) -> str:
+    """Chave estável a partir de partes simples (str/int/None/listas)."""
+    return json.dumps(parts, ensure_ascii=False, separators=(",", ":"), default=str)
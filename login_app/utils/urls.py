@@ -0,0 +1,85 @@
+# login_app/utils/urls.py
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# parâmetros de rastreamento/campanha: não mudam o conteúdo da página
+_TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "hsctatracking",
+    "ref", "ref_src", "ref_url", "referrer", "source", "cmpid", "ocid", "smid",
+    "soc_src", "soc_trk", "share", "shared", "s_cid", "wt.mc_id", "rss", "feed",
+    "amp", "outputtype",
+})
+_TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "at_", "ga_")
+_AMP_CACHE = re.compile(r"^/[a-z]/(?:s/)?(?P<rest>.+)$")  # /c/s/host/path (Google AMP cache)
+
+
+def _is_tracking(name: str) -> bool:
+    n = name.lower()
+    return n in _TRACKING_PARAMS or n.startswith(_TRACKING_PREFIXES)
+
+
+def _strip_amp_path(path: str) -> str:
+    # /noticia/amp, /amp/noticia, /noticia.amp.html, /noticia/amp.html
+    segs = [s for s in path.split("/") if s]
+    segs = [s for s in segs if s.lower() not in ("amp", "amp.html")]
+    if segs:
+        last = segs[-1]
+        for suffix in (".amp.html", ".amp"):
+            if last.lower().endswith(suffix):
+                segs[-1] = last[: -len(suffix)] + (".html" if suffix == ".amp.html" else "")
+    return "/" + "/".join(segs)
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """
+    Forma canônica de uma URL de notícia, usada como chave de deduplicação.
+    - esquema/host em minúsculas, sem porta padrão e sem "www."/"m."/"amp."
+    - sem parâmetros de rastreamento (utm_*, fbclid, gclid, ...); os demais
+      em ordem alfabética
+    - links AMP (cache do Google, caminho /amp, ?amp=1) voltam à página normal
+    - remove fragmento (#...) e a barra final do caminho
+    """
+    s = (url or "").strip()
+    if not s:
+        return ""
+    try:
+        parts = urlsplit(s)
+        host = (parts.hostname or "").lower()
+        port = parts.port if parts.port not in (None, 80, 443) else None
+    except ValueError:
+        return s
+
+    path = parts.path
+    if host.endswith(".cdn.ampproject.org"):
+        m = _AMP_CACHE.match(path)
+        if m:
+            inner = urlsplit("https://" + unquote(m.group("rest")))
+            host, port, path = (inner.hostname or host).lower(), None, inner.path
+            if inner.query:
+                parts = parts._replace(query=inner.query)
+
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    netloc = f"{host}:{port}" if port else host
+
+    path = _strip_amp_path(path).rstrip("/") or "/"
+    query = ""
+    if parts.query:
+        kept = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k))
+        query = urlencode(kept)
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_key(url: Optional[str]) -> str:
+    """Hash (sha1 hex) da URL canônica — chave compacta para índice único."""
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
@@ -40,6 +40,14 @@ PY
   fi
 fi
 
+# ===== Ingestão RSS =====
+# Padrão (RSS_INGEST_MODE=worker): um worker do gunicorn é eleito e faz o polling.
+# Com RSS_INGEST_MODE=process a ingestão roda num processo dedicado.
+if [ "${RSS_INGEST_MODE:-worker}" = "process" ]; then
+  echo "Iniciando ingestão RSS em processo dedicado..."
+  python3 -m login_app.rss_ingest &
+fi
+
 echo "Iniciando servidor Gunicorn..."
 cd /app
 # Usa a factory do Flask direto no Gunicorn (não precisa de wsgi.py)
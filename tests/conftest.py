@@ -0,0 +1,64 @@
+# tests/conftest.py
+"""
+Apps mínimas para os testes: só os bancos e blueprints que cada teste usa,
+em arquivos SQLite temporários (nada em /data).
+"""
+import pytest
+from flask import Flask
+
+from login_app import db, serialization
+
+
+def _db_config(tmp_path):
+    # todas as binds: os modelos de qualquer módulo importado entram no mesmo metadata
+    return dict(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}",
+        SQLALCHEMY_BINDS={
+            "posts": f"sqlite:///{tmp_path / 'posts.db'}",
+            "articles": f"sqlite:///{tmp_path / 'articles.db'}",
+        },
+    )
+
+
+@pytest.fixture
+def posts_app(tmp_path):
+    from login_app import post_authors, post_search, post_version
+    from login_app.routes.posts_api import posts_api
+
+    app = Flask("tests_posts")
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY="test",
+        **_db_config(tmp_path),
+    )
+    db.init_app(app)
+    serialization.init_app(app)
+    app.add_url_rule("/uploads/<path:filename>", "uploads", lambda filename: "")
+    app.register_blueprint(posts_api)
+    with app.app_context():
+        db.create_all()
+    post_search.ensure_schema(app)
+    post_authors.ensure_schema(app)
+    post_version.ensure_schema(app)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def articles_app(tmp_path):
+    from login_app import article_store, story_clusters
+
+    story_clusters.discard()
+    app = Flask("tests_articles")
+    app.config.update(**_db_config(tmp_path))
+    db.init_app(app)
+    article_store.ensure_schema(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    story_clusters.discard()
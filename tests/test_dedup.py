@@ -0,0 +1,117 @@
+# tests/test_dedup.py
+"""URL canônica, quase-duplicatas (MinHash) e cursores das timelines de notícias."""
+import datetime as dt
+
+import pytest
+
+from login_app import article_store, rss_client
+from login_app.news_client import _dedup_articles
+from login_app.utils import minhash
+from login_app.utils.urls import canonical_url
+
+# -------------------- URL canônica --------------------
+
+@pytest.mark.parametrize("url", [
+    "https://www.tecmundo.com.br/hardware/123-rtx-5090/?utm_source=rss&utm_medium=feed",
+    "http://tecmundo.com.br/hardware/123-rtx-5090#comentarios",
+    "https://m.tecmundo.com.br/hardware/123-rtx-5090/amp",
+    "https://www-tecmundo-com-br.cdn.ampproject.org/c/s/www.tecmundo.com.br/hardware/123-rtx-5090/amp",
+    "HTTPS://TECMUNDO.COM.BR:443/hardware/123-rtx-5090?fbclid=abc",
+])
+def test_canonical_url_variants_collapse(url):
+    assert canonical_url(url) == "https://tecmundo.com.br/hardware/123-rtx-5090"
+
+
+def test_canonical_url_keeps_content_params_sorted():
+    assert canonical_url("https://x.com/busca?q=rtx&page=2&utm_campaign=a") == "https://x.com/busca?page=2&q=rtx"
+    assert canonical_url("https://x.com/a?id=1") != canonical_url("https://x.com/a?id=2")
+
+
+# -------------------- quase-duplicatas --------------------
+
+RTX_A = {"title": "NVIDIA anuncia RTX 5090 com 32 GB de memória GDDR7",
+         "description": "Nova placa de vídeo da NVIDIA chega em janeiro por US$ 1.999 com arquitetura Blackwell",
+         "url": "https://a.com/rtx-5090", "source": {"name": "A"}}
+RTX_B = {"title": "RTX 5090 é oficial: NVIDIA revela placa com 32 GB GDDR7",
+         "description": "A NVIDIA anunciou a RTX 5090, placa com arquitetura Blackwell que chega em janeiro por US$ 1.999",
+         "url": "https://b.com/nvidia-rtx-5090", "source": {"name": "B"}}
+RADEON = {"title": "AMD anuncia Radeon RX 9070 com 16 GB de memória",
+          "description": "Nova placa de vídeo da AMD chega em março com arquitetura RDNA 4",
+          "url": "https://c.com/rx-9070", "source": {"name": "C"}}
+
+
+def test_same_story_collapses_with_coverage():
+    out = minhash.collapse([RTX_A, RTX_B, RADEON])
+    assert [it["url"] for it in out] == [RTX_A["url"], RADEON["url"]]
+    assert out[0]["alsoCoveredBy"] == [{"source": "B", "url": RTX_B["url"], "title": RTX_B["title"]}]
+    assert "alsoCoveredBy" not in RTX_A  # entrada não é alterada
+
+
+def test_neighbouring_stories_stay_apart():
+    sim = minhash.similarity(minhash.signature(RTX_A["title"], RTX_A["description"]),
+                             minhash.signature(RADEON["title"], RADEON["description"]))
+    assert sim < minhash.DEFAULT_THRESHOLD
+
+
+def test_dedup_articles_drops_tracking_and_amp_copies():
+    copy = dict(RTX_A, url="https://www.a.com/rtx-5090/amp?utm_source=x", source={"name": "A (AMP)"})
+    out = _dedup_articles([RTX_A, copy, RADEON])
+    assert [it["url"] for it in out] == [RTX_A["url"], RADEON["url"]]
+    assert "alsoCoveredBy" not in out[0]
+
+
+# -------------------- timeline dos feeds (merge + cursor) --------------------
+
+def _feed(prefix, n, start):
+    return [{"title": f"{prefix} {i}", "url": f"https://{prefix}/{i}", "publishedTs": start - i} for i in range(n)]
+
+
+def test_timeline_cursor_roundtrip():
+    key = (1735689600, "https://a/1")
+    assert rss_client.decode_timeline_cursor(rss_client.encode_timeline_cursor(key)) == key
+    assert rss_client.decode_timeline_cursor("f.lixo") is None
+    assert rss_client.decode_timeline_cursor("sem-prefixo") is None
+
+
+def test_merge_timeline_pages_with_filter_are_full():
+    feeds = [_feed("a", 40, 1000), _feed("b", 40, 999)]
+    wanted = lambda it: it["title"].endswith("0") or it["title"].endswith("5")  # noqa: E731
+    pages, after = [], None
+    while True:
+        page, after = rss_client.merge_timeline(feeds, 3, after, wanted)
+        pages.append([it["url"] for it in page])
+        if after is None:
+            break
+    flat = [u for p in pages for u in p]
+    assert all(len(p) == 3 for p in pages[:-1])
+    assert len(flat) == len(set(flat)) == 16
+
+
+# -------------------- histórico (article_store) --------------------
+
+def _item(i, minutes):
+    return {"title": f"Notícia número {i} sobre assunto {i * 7}", "url": f"https://s.com/n/{i}",
+            "description": f"descrição exclusiva {i}",
+            "publishedAt": (dt.datetime(2025, 1, 1) + dt.timedelta(minutes=minutes)).isoformat() + "+00:00",
+            "source": "s"}
+
+
+def test_article_cursor_roundtrip():
+    when = dt.datetime(2025, 1, 1, 12, 30)
+    assert article_store.decode_cursor(article_store.encode_cursor(when, 7)) == (when, 7)
+    assert article_store.decode_cursor("???") is None
+
+
+def test_timeline_keyset_pages_and_placements(articles_app):
+    items = [_item(i, i) for i in range(12)]
+    assert article_store.upsert_articles(items, "hardware", "gpus") == 12
+    assert article_store.upsert_articles(items, "hardware", "gpus") == 0  # idempotente
+    assert article_store.upsert_articles(items[:2], "games", "pc") == 2   # mesma URL, outra posição
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = article_store.list_timeline("hardware", "gpus", limit=5, cursor=cursor, collapse=False)
+        seen.extend(it["url"] for it in page)
+        if cursor is None:
+            break
+    assert seen == [f"https://s.com/n/{i}" for i in range(11, -1, -1)]
@@ -0,0 +1,110 @@
+# tests/test_posts_api.py
+"""Listagem de /api/posts: cursor keyset, ETag/304 e busca FTS5."""
+from login_app import db, post_search
+from login_app.models.post import Post
+from login_app.routes.posts_api import decode_cursor, encode_cursor
+
+
+def _add_posts(app, n, **fields):
+    with app.app_context():
+        db.session.add_all(
+            Post(titulo=f"Post {i}", conteudo=f"conteúdo {i}", autor="ana", **fields) for i in range(n)
+        )
+        db.session.commit()
+
+
+# -------------------- cursor --------------------
+
+def test_cursor_roundtrip_and_garbage():
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert decode_cursor("não é cursor") is None
+    assert decode_cursor(encode_cursor(42).swapcase()) is None
+
+
+def test_keyset_pages_cover_every_post_once(posts_app):
+    _add_posts(posts_app, 23)
+    client = posts_app.test_client()
+    seen, cursor, pages = [], "", 0
+    while cursor is not None:
+        body = client.get(f"/api/posts/?after={cursor}&per_page=10").get_json()
+        seen.extend(item["id"] for item in body["items"])
+        assert body["has_next"] == (body["next_cursor"] is not None)
+        cursor, pages = body["next_cursor"], pages + 1
+    assert pages == 3
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == 23
+
+
+def test_keyset_rejects_invalid_cursor(posts_app):
+    resp = posts_app.test_client().get("/api/posts/?after=xx!")
+    assert resp.status_code == 400
+
+
+# -------------------- ETag / 304 --------------------
+
+def test_etag_revalidates_until_the_collection_changes(posts_app):
+    _add_posts(posts_app, 3)
+    client = posts_app.test_client()
+    first = client.get("/api/posts/")
+    tag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/api/posts/", headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == tag
+
+    # outra URL (página/busca) tem outra ETag
+    assert client.get("/api/posts/?page=2").headers["ETag"] != tag
+
+    _add_posts(posts_app, 1)
+    changed = client.get("/api/posts/", headers={"If-None-Match": tag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != tag
+
+
+def test_etag_changes_on_update_and_delete(posts_app):
+    _add_posts(posts_app, 2)
+    client = posts_app.test_client()
+    tags = [client.get("/api/posts/").headers["ETag"]]
+    with posts_app.app_context():
+        post = db.session.get(Post, 1)
+        post.titulo = "editado"
+        db.session.commit()
+    tags.append(client.get("/api/posts/").headers["ETag"])
+    with posts_app.app_context():
+        db.session.delete(db.session.get(Post, 2))
+        db.session.commit()
+    tags.append(client.get("/api/posts/").headers["ETag"])
+    assert len(set(tags)) == 3
+
+
+# -------------------- busca (FTS5) --------------------
+
+def test_match_expr_quotes_terms_and_drops_operators():
+    assert post_search.match_expr('educação OR "x" NEAR(a b) -y*') == (
+        '"educação"* "OR"* "x"* "NEAR"* "a"* "b"* "y"*'
+    )
+    assert post_search.match_expr('"";:()') == ""
+
+
+def test_search_ignores_accents_and_escapes_highlight(posts_app):
+    with posts_app.app_context():
+        db.session.add_all([
+            Post(titulo="Educação <b>pública</b>", conteudo="texto", autor="ana"),
+            Post(titulo="Outro assunto", conteudo="nada a ver", autor="bia"),
+        ])
+        db.session.commit()
+    assert post_search.available()
+    body = posts_app.test_client().get("/api/posts/?q=educacao").get_json()
+    assert body["total"] == 1
+    hl = body["items"][0]["highlight"]["titulo"]
+    assert hl.startswith("<mark>Educação</mark>")
+    assert "&lt;b&gt;" in hl and "<b>" not in hl
+
+
+def test_search_with_only_operators_returns_nothing(posts_app):
+    _add_posts(posts_app, 2)
+    resp = posts_app.test_client().get('/api/posts/?q=")(*"')
+    assert resp.status_code == 200
+    assert resp.get_json()["items"] == []
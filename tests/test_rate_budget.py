@@ -0,0 +1,84 @@
+# tests/test_rate_budget.py
+"""Contabilidade do orçamento da NewsAPI e como as recusas chegam ao cliente."""
+import pytest
+
+from login_app import news_client
+from login_app.utils.rate_budget import BACKGROUND, INTERACTIVE, RateBudget
+
+
+@pytest.fixture
+def make_budget(tmp_path):
+    def _make(**kw):
+        kw.setdefault("daily_limit", 10)
+        kw.setdefault("reserve", 0.3)
+        kw.setdefault("burst", 100)
+        kw.setdefault("refill_per_sec", 0)
+        return RateBudget(str(tmp_path / "budget.db"), **kw)
+    return _make
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_daily_cap_and_background_reserve(make_budget):
+    b = make_budget()
+    assert all(b.try_acquire("everything", BACKGROUND) for _ in range(7))
+    assert not b.try_acquire("everything", BACKGROUND)  # 30% ficam para os usuários
+    assert b.exhausted(BACKGROUND) and not b.exhausted(INTERACTIVE)
+    assert all(b.try_acquire("top-headlines", INTERACTIVE) for _ in range(3))
+    assert not b.try_acquire("top-headlines", INTERACTIVE)
+
+    s = b.stats()
+    assert s["used"] == 10 and s["background_limit"] == 7
+    spend = {(r["endpoint"], r["priority"]): (r["calls"], r["denied"]) for r in s["spend"]}
+    assert spend == {("everything", BACKGROUND): (7, 1), ("top-headlines", INTERACTIVE): (3, 1)}
+
+
+def test_bucket_denial_is_not_exhaustion(make_budget):
+    b = make_budget(daily_limit=100, burst=2, refill_per_sec=4)
+    assert b.try_acquire("everything") and b.try_acquire("everything")
+    assert not b.try_acquire("everything")
+    assert not b.exhausted(INTERACTIVE)
+    assert 0 < b.refill_wait(INTERACTIVE) <= 0.25
+    # background precisa deixar metade do burst no bucket
+    assert b.refill_wait(BACKGROUND) > b.refill_wait(INTERACTIVE)
+
+
+def test_record_429_blocks_everyone(make_budget):
+    b = make_budget()
+    b.record_429("60")
+    assert b.stats()["blocked"] and b.exhausted(INTERACTIVE)
+    assert not b.try_acquire("everything", INTERACTIVE)
+
+
+def test_guarded_waits_for_bucket_then_calls(make_budget, monkeypatch):
+    b = make_budget(daily_limit=100, burst=1, refill_per_sec=20)
+    monkeypatch.setattr(news_client, "budget", b)
+    calls = []
+    run = news_client._guarded("everything", INTERACTIVE, lambda t: calls.append(t) or FakeResponse())
+    assert run(10).status_code == 200
+    assert run(10).status_code == 200  # segunda espera o refill em vez de virar "cota esgotada"
+    assert len(calls) == 2
+
+
+def test_guarded_rate_limited_when_no_time_to_wait(make_budget, monkeypatch):
+    b = make_budget(daily_limit=100, burst=1, refill_per_sec=0.01)
+    monkeypatch.setattr(news_client, "budget", b)
+    run = news_client._guarded("everything", INTERACTIVE, lambda t: FakeResponse())
+    run(5)
+    with pytest.raises(news_client.RateLimited):
+        run(5)
+
+
+def test_guarded_quota_and_429_use_fallback(make_budget, monkeypatch):
+    b = make_budget(daily_limit=1)
+    monkeypatch.setattr(news_client, "budget", b)
+    run = news_client._guarded("everything", INTERACTIVE, lambda t: FakeResponse(429, {"Retry-After": "30"}))
+    with pytest.raises(news_client.QuotaExceeded):
+        run(5)
+    assert b.stats()["blocked"]
+    with pytest.raises(news_client.QuotaExceeded):
+        run(5)  # bloqueado: nem chega a chamar